@@ -5,6 +5,13 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Jonli dashboard voqealari (/api/dashboard/stream/, SSE) uzoq ochiq turadigan ulanishlar,
+shuning uchun ASGI server bilan ishga tushiring, masalan:
+    uvicorn backend.asgi:application --host 0.0.0.0 --port 8000
+Voqealar brokeri jarayon ichida (dormitory/events.py) - bitta worker ishlating.
+O'qish endpointlarining async variantlari (/api/async/..., dormitory/async_views.py) ham faqat
+ASGI ostida worker thread ini band qilmaydi; WSGI (gunicorn) bilan solishtirish: manage.py bench_http.
 """
 
 import os
@@ -14,3 +21,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# talabalar typeahead indeksi so'rovlarni kutmasdan fon thread ida quriladi (dormitory/typeahead.py)
+from dormitory import typeahead  # noqa: E402
+
+typeahead.index.start()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -81,7 +82,8 @@ REST_FRAMEWORK = {
         # 'rest_framework.renderers.BrowsableAPIRenderer',  # kerak bo'lsa yoqing
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication + token ichidagi rollar/ruxsatlar (dormitory/tokens.py)
+        'dormitory.tokens.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -123,7 +125,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 LANGUAGE_CODE = 'en-us'
 
-TIME_ZONE = 'UTC'
+TIME_ZONE = 'Asia/Tashkent'  # yotoqxonaning mahalliy kuni shu mintaqa bo'yicha hisoblanadi
 
 USE_I18N = True
 
@@ -158,3 +160,56 @@ SWAGGER_SETTINGS = {
     },
     'USE_SESSION_AUTH': False,
 }
+
+# Faolliklar ro'yxati (ActivityListCreate) sahifa hajmi
+ACTIVITY_PAGE_SIZE = 100
+ACTIVITY_MAX_PAGE_SIZE = 1000
+
+# Talabalar typeahead indeksi (dormitory/typeahead.py) qayta qurilish davri, sekund
+TYPEAHEAD_MAX_AGE = 600
+# Paket holida faolliklar qabul qilish (ActivityBulkCreate) - bir so'rovdagi maksimal yozuvlar
+ACTIVITY_BULK_MAX_EVENTS = 5000
+# Faollik vaqti (mijoz yuboradi) server vaqtidan qancha oldinda bo'lishi mumkin, sekund
+ACTIVITY_MAX_CLOCK_SKEW = 300
+# Ochilish/yopilish vaqti keshi (dormitory/schedule.py) boshqa jarayonlarda yangilanish davri, sekund
+SCHEDULE_MAX_AGE = 60
+
+# Kesh (dormitory/caching.py - Bino va Xonalar sahifasi javoblari). Standart - jarayon ichidagi locmem;
+# bir nechta worker bo'lsa REDIS_URL=redis://host:6379/0 bilan umumiy Redis ishlating (redis paketi kerak)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dormitory',
+    }
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+# Keshlangan javoblarning yashash muddati, sekund (versiya oshirilmasa ham shundan keyin yangilanadi)
+ROOMS_CACHE_TIMEOUT = 300
+# Dashboard so'nggi faolliklar lentasi (dormitory/feed.py): xotirada saqlanadigan yozuvlar soni (?recent= chegarasi)
+# va boshqa jarayonlardagi yozuvlar yetib kelishi uchun qayta yuklash davri, sekund
+RECENT_ACTIVITY_FEED_SIZE = 100
+RECENT_ACTIVITY_MAX_AGE = 60
+# Jonli dashboard voqealari (dormitory/events.py, /api/dashboard/stream/): har bir ulanish navbati hajmi,
+# hisoblagichlarni yuborish oralig'i va keepalive, sekund
+EVENTS_QUEUE_SIZE = 100
+EVENTS_COUNTERS_INTERVAL = 1.0
+EVENTS_KEEPALIVE = 15
+# Foydalanuvchi rollari/ruxsatlari keshi (dormitory/authz.py): jarayon ichidagi LRU hajmi, uning yozuviga versiyasiz
+# ishoniladigan muddat (boshqa worker dagi o'zgarishlar ko'pi bilan shuncha kechikadi) va umumiy keshdagi muddat, sekund
+AUTHZ_LOCAL_CACHE_SIZE = 1024
+AUTHZ_LOCAL_TTL = 5
+AUTHZ_CACHE_TIMEOUT = 3600
+# JWT: access/refresh tokenlarga rollar, ruxsatlar bitmap i va ruxsatlar versiyasi yoziladi (dormitory/tokens.py)
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'dormitory.tokens.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'dormitory.tokens.ClaimsTokenRefreshSerializer',
+}
+# Rollar -> ruxsatlar sinxronizatsiyasi (dormitory/jobs.py): navbat orqali fon rejimida, o'zgarishlar
+# PERMISSION_SYNC_DELAY sekund ichida birlashtiriladi va PERMISSION_SYNC_BATCH_SIZE talik paketlarda bajariladi
+PERMISSION_SYNC_DEFERRED = True
+PERMISSION_SYNC_DELAY = 2.0
+PERMISSION_SYNC_BATCH_SIZE = 500
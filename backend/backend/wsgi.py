@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# talabalar typeahead indeksi so'rovlarni kutmasdan fon thread ida quriladi (dormitory/typeahead.py)
+from dormitory import typeahead  # noqa: E402
+
+typeahead.index.start()
@@ -9,7 +9,7 @@ class BuildingAdmin(admin.ModelAdmin):
 
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
-	list_display = ('number', 'building', 'floor', 'capacity', 'status')
+	list_display = ('number', 'building', 'floor', 'capacity', 'occupied', 'status')
 	list_filter = ('building', 'floor', 'status')
 	search_fields = ('number',)
 
@@ -21,7 +21,7 @@ class StudentAdmin(admin.ModelAdmin):
 
 @admin.register(Activity)
 class ActivityAdmin(admin.ModelAdmin):
-	list_display = ('student', 'action', 'time')
+	list_display = ('student', 'action', 'time', 'received_at')
 	list_filter = ('action', 'time')
 	search_fields = ('student__last_name', 'student__first_name')
 
@@ -0,0 +1,152 @@
+"""
+Semestr boshida talabalarni xonalarga ommaviy joylashtirish.
+
+Bo'sh joylar (capacity - occupied) va xonadagi fakultet/guruh tarkibi bitta-ikkita so'rovda
+xotiraga yuklanadi, reja xotirada tuziladi va bitta tranzaksiyada bulk_update bilan yoziladi -
+har bir talaba uchun alohida PUT va sig'imni qayta o'qish yo'q.
+
+Qoidalar:
+- bir guruh (fakultet + guruh) talabalari imkon qadar birga: avval shu guruhdan talaba
+  yashaydigan xonalar, keyin eng ko'p bo'sh joyi bor xonalar (guruh kam xonaga bo'linadi);
+- floors berilsa, ro'yxatdagi qavatlar shu tartibda afzal, qolganlari ulardan keyin;
+- buildings berilsa, faqat shu binolar xonalari.
+"""
+import heapq
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from student.models import Student
+from . import dashboard, occupancy, typeahead
+from .feed import feed
+from .models import Room
+
+
+def _group_key(department, group):
+    return ((department or '').strip().lower(), (group or '').strip().lower())
+
+
+def _free_rooms(buildings=None):
+    qs = Room.objects.filter(occupied__lt=F('capacity'))
+    if buildings:
+        qs = qs.filter(building_id__in=buildings)
+    return qs
+
+
+def _load_rooms(buildings=None, lock=False):
+    # room_id -> [bo'sh joy, bino, qavat, raqam]
+    qs = _free_rooms(buildings)
+    if lock:
+        qs = qs.select_for_update()
+    rows = qs.values_list('id', 'capacity', 'occupied', 'building_id', 'floor', 'number')
+    return {pk: [capacity - occupied, building_id, floor, number]
+            for pk, capacity, occupied, building_id, floor, number in rows}
+
+
+def _load_affinity(buildings=None):
+    # guruh -> Counter(room_id -> shu guruhdan yashayotganlar soni), faqat bo'sh joyi bor xonalar
+    affinity = defaultdict(Counter)
+    rooms = _free_rooms(buildings).values('id')
+    rows = Student.objects.filter(room_id__in=rooms).values_list('room_id', 'department', 'group')
+    for room_id, department, group in rows.iterator():
+        affinity[_group_key(department, group)][room_id] += 1
+    return affinity
+
+
+def _load_students(student_ids=None, lock=False):
+    qs = Student.objects.filter(room__isnull=True, working_status=True)
+    if student_ids is not None:
+        qs = qs.filter(pk__in=student_ids)
+    if lock:
+        qs = qs.select_for_update()
+    return list(qs.order_by('pk').values_list('id', 'department', 'group'))
+
+
+def plan(students, rooms, affinity, floors=None):
+    """
+    students: [(pk, department, group), ...]; rooms: room_id -> [bo'sh joy, bino, qavat, raqam] (o'zgartiriladi).
+    ([(student_pk, room_id), ...], [joylashmagan student_pk, ...]) qaytaradi.
+    """
+    floor_rank = {floor: i for i, floor in enumerate(floors or ())}
+    default_rank = len(floor_rank)
+
+    def heap_key(room_id):
+        free, building_id, floor, _ = rooms[room_id]
+        return (floor_rank.get(floor, default_rank), -free, building_id, room_id)
+
+    # eng bo'sh xona yuqorida; eskirgan yozuvlar (free o'zgargan) olinganda tashlab yuboriladi
+    heap = [heap_key(room_id) for room_id in rooms]
+    heapq.heapify(heap)
+
+    groups = defaultdict(list)
+    for pk, department, group in students:
+        groups[_group_key(department, group)].append(pk)
+
+    assignments, unassigned = [], []
+    # katta guruhlar birinchi - ular uchun yaxlit xonalar ko'proq
+    for key in sorted(groups, key=lambda k: (-len(groups[k]), k)):
+        members = groups[key]
+        mates = affinity[key]
+        i = 0
+        # 1) shu guruh allaqachon yashayotgan xonalar (ko'p guruhdoshi borlari birinchi)
+        for room_id, _ in sorted(mates.items(), key=lambda item: (-item[1], item[0])):
+            room = rooms.get(room_id)
+            if i >= len(members):
+                break
+            if room is None or room[0] <= 0:
+                continue
+            take = min(room[0], len(members) - i)
+            for pk in members[i:i + take]:
+                assignments.append((pk, room_id))
+            room[0] -= take
+            mates[room_id] += take
+            i += take
+            heapq.heappush(heap, heap_key(room_id))
+        # 2) qolganlari eng ko'p bo'sh joyli (afzal qavatdagi) xonalarga
+        while i < len(members) and heap:
+            entry = heapq.heappop(heap)
+            room_id = entry[-1]
+            room = rooms[room_id]
+            if room[0] <= 0 or entry != heap_key(room_id):
+                continue
+            take = min(room[0], len(members) - i)
+            for pk in members[i:i + take]:
+                assignments.append((pk, room_id))
+            room[0] -= take
+            mates[room_id] += take
+            i += take
+            if room[0] > 0:
+                heapq.heappush(heap, heap_key(room_id))
+        unassigned.extend(members[i:])
+    return assignments, unassigned
+
+
+def allocate(student_ids=None, buildings=None, floors=None, dry_run=False):
+    """
+    Xonasiz faol talabalarni (yoki student_ids dagilarni) bo'sh joylarga joylashtiradi.
+    {'assignments': [(student_pk, room_id, room_number), ...], 'unassigned': [pk, ...]} qaytaradi.
+    dry_run=True bo'lsa faqat reja qaytariladi, bazaga yozilmaydi.
+    """
+    with transaction.atomic():
+        # reja tuzilayotganda xonalar va talabalar boshqa so'rovlar tomonidan o'zgarmasin
+        rooms = _load_rooms(buildings, lock=not dry_run)
+        students = _load_students(student_ids, lock=not dry_run)
+        assignments, unassigned = plan(students, rooms, _load_affinity(buildings), floors)
+        if assignments and not dry_run:
+            now = timezone.now()
+            Student.objects.bulk_update(
+                [Student(pk=pk, room_id=room_id, updated_at=now) for pk, room_id in assignments],
+                ['room', 'updated_at'], batch_size=1000,
+            )
+            # bulk_update signal yubormaydi - bandlik, dashboard va typeahead shu yerda
+            occupancy.apply_moves([(None, room_id) for _, room_id in assignments])
+            dashboard.bump(assigned_students=len(assignments))
+            moved = list(assignments)
+            transaction.on_commit(lambda: typeahead.index.set_student_rooms(moved))
+            transaction.on_commit(feed.invalidate)  # lentadagi xona raqamlari
+    return {
+        'assignments': [(pk, room_id, rooms[room_id][3]) for pk, room_id in assignments],
+        'unassigned': unassigned,
+    }
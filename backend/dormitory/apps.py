@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DormitoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dormitory'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (signallarni ro'yxatdan o'tkazish)
@@ -0,0 +1,247 @@
+"""
+O'qish ko'p bo'ladigan endpointlarning async (ASGI) variantlari: /api/async/...
+
+Javoblar views.py dagilar bilan bir xil (umumiy filterlar, serializerlar, ETag/304), lekin
+so'rovlar Django async ORM orqali (afirst, acount, aaggregate, async for) bajariladi va sekin
+so'rov worker thread ini band qilmaydi. Dashboard snapshotini qayta hisoblashdagi mustaqil
+aggregate lar asyncio.gather bilan yuboriladi (dashboard.acompute_metrics).
+
+Faqat ASGI ostida (`uvicorn backend.asgi:application`) foyda beradi; WSGI da har bir async view
+alohida event loop da bajariladi. Solishtirish: `python manage.py bench_http`.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.http import HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .models import Building
+from .serializers import (
+	BuildingSerializer,
+	BuildingSummarySerializer,
+	RoomListSerializer,
+	StudentSerializer,
+	ActivitySerializer,
+)
+from .dashboard import aget_snapshot
+from .feed import feed
+from . import authz, caching, conditional, events
+from .tokens import ClaimsJWTAuthentication
+from .pagination import KeysetPagination, PagePagination, InvalidCursor
+from .views import (
+	ActivityListCreate,
+	InvalidParameter,
+	RoomListCreate,
+	StudentListCreate,
+	dashboard_data,
+	recent_limit_param,
+)
+
+
+# ---------- Autentifikatsiya ----------
+def _jwt_user(request, allow_query_token=False):
+	header = request.headers.get('Authorization') or ''
+	if not header and allow_query_token and request.GET.get('token'):
+		# EventSource sarlavha yubora olmaydi - token ?token= orqali ham qabul qilinadi
+		header = f"Bearer {request.GET['token']}"
+	auth = ClaimsJWTAuthentication()
+	raw_token = auth.get_raw_token(header.encode())
+	if raw_token is None:
+		return None
+	try:
+		return auth.get_user(auth.get_validated_token(raw_token))
+	except (InvalidToken, AuthenticationFailed):
+		return None
+
+
+async def _authorize(request, perm=None, allow_query_token=False):
+	"""(user, None) yoki (None, 401/403 javobi) - DRF IsAuthenticated/HasRequiredDjangoPerms o'rnida."""
+	user = await sync_to_async(_jwt_user)(request, allow_query_token)
+	if user is None:
+		return None, JsonResponse({'error': 'Autentifikatsiya talab qilinadi'}, status=status.HTTP_401_UNAUTHORIZED)
+	if perm and not await sync_to_async(authz.has_perms)(user, [perm]):
+		return None, JsonResponse({'error': "Ruxsat yo'q"}, status=status.HTTP_403_FORBIDDEN)
+	return user, None
+
+
+def _bad_request(exc):
+	return JsonResponse({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+async def _serialize(serializer_class, objects, **kwargs):
+	# serializer worker thread da: SerializerMethodField yoki bog'langan obyekt so'rov yuborsa
+	# async kontekstda SynchronousOnlyOperation bo'lmasin
+	return await sync_to_async(lambda: serializer_class(objects, many=True, **kwargs).data)()
+
+
+async def _results(serializer_class, page, meta, **kwargs):
+	return {'results': await _serialize(serializer_class, page, **kwargs), **meta}
+
+
+# ---------- Dashboard ----------
+@require_safe
+async def dashboard(request):
+	"""DashboardView ning async varianti."""
+	_, error = await _authorize(request, 'dormitory.can_view_dashboard')
+	if error:
+		return error
+	# snapshot (eskirgan bo'lsa 4 ta aggregate gather bilan) va so'nggi faolliklar lentasi parallel
+	snapshot, recent_activities = await asyncio.gather(
+		aget_snapshot(), feed.arecent(recent_limit_param(request)),
+	)
+	return JsonResponse(dashboard_data(snapshot, recent_activities))
+
+
+@require_safe
+async def bino_xonalar(request):
+	"""BinoXonalarView ning async varianti (kesh yozuvlari umumiy)."""
+	_, error = await _authorize(request)
+	if error:
+		return error
+	building_id = request.GET.get('building')
+	status_param = request.GET.get('status')
+	available = bool(request.GET.get('available'))
+
+	async def build_buildings():
+		buildings = [b async for b in Building.objects.all().annotate(rooms_total=Count('rooms'))]
+		return list(await _serialize(BuildingSummarySerializer, buildings))
+
+	async def build_rooms():
+		rooms = [r async for r in RoomListCreate.build_queryset(request.GET)]
+		return list(await _serialize(RoomListSerializer, rooms))
+
+	(buildings_data, buildings_etag), (rooms_data, rooms_etag) = await asyncio.gather(
+		caching.aget_or_build(caching.ROOMS, ['buildings'], build_buildings),
+		caching.aget_or_build(caching.ROOMS, ['rooms', building_id or '', status_param or '', int(available)], build_rooms),
+	)
+
+	etag = caching.make_etag([buildings_etag, rooms_etag])
+	if caching.etag_matches(request, etag):
+		response = HttpResponseNotModified()
+		response['ETag'] = etag
+		return response
+	return JsonResponse({'buildings': buildings_data, 'rooms': rooms_data}, headers={'ETag': etag})
+
+
+# ---------- Ro'yxatlar ----------
+@require_safe
+async def building_list(request):
+	"""BuildingListCreate.get ning async varianti."""
+	_, error = await _authorize(request)
+	if error:
+		return error
+	buildings = Building.objects.all()
+
+	async def build():
+		return await _serialize(BuildingSerializer, [b async for b in buildings])
+
+	return await conditional.arespond(request, await conditional.afor_querysets(buildings), build)
+
+
+@require_safe
+async def room_list(request):
+	"""RoomListCreate.get ning async varianti."""
+	_, error = await _authorize(request)
+	if error:
+		return error
+	qs = RoomListCreate.build_queryset(request.GET)
+
+	async def build():
+		return await _serialize(RoomListSerializer, [r async for r in qs])
+
+	validators = await conditional.afor_querysets(qs, related=('building',))
+	return await conditional.arespond(request, validators, build)
+
+
+@require_safe
+async def student_list(request):
+	"""StudentListCreate.get ning async varianti."""
+	_, error = await _authorize(request)
+	if error:
+		return error
+	try:
+		qs, order_by, fields = StudentListCreate.build_queryset(request.GET)
+	except InvalidParameter as exc:
+		return _bad_request(exc)
+
+	if request.GET.get('page'):
+		pagination = PagePagination(StudentListCreate.PAGE_SIZE, StudentListCreate.MAX_PAGE_SIZE)
+		page, meta = await pagination.apaginate_queryset(request, qs.order_by(*order_by))
+		return await conditional.arespond(request, conditional.for_objects(page, meta['count']), lambda: _results(
+			StudentSerializer, page, meta, fields=fields,
+		))
+
+	try:
+		keyset = KeysetPagination(order_by, StudentListCreate.PAGE_SIZE, StudentListCreate.MAX_PAGE_SIZE)
+		page, next_cursor = await keyset.apaginate_queryset(request, qs)
+	except InvalidCursor as exc:
+		return _bad_request(exc)
+	return await conditional.arespond(request, conditional.for_objects(page, next_cursor), lambda: _results(
+		StudentSerializer, page, {'next': next_cursor}, fields=fields,
+	))
+
+
+@require_safe
+async def activity_list(request):
+	"""ActivityListCreate.get ning async varianti."""
+	_, error = await _authorize(request)
+	if error:
+		return error
+	try:
+		qs = ActivityListCreate.build_queryset(request.GET)
+		page, next_cursor = await ActivityListCreate.pagination.apaginate_queryset(request, qs)
+	except (InvalidParameter, InvalidCursor) as exc:
+		return _bad_request(exc)
+	return await conditional.arespond(request, conditional.for_objects(page, next_cursor), lambda: _results(
+		ActivitySerializer, page, {'next': next_cursor},
+	))
+
+
+# ---------- Jonli voqealar (SSE) ----------
+def _sse(event, data):
+	return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def activity_stream(request):
+	"""
+	Dashboard uchun jonli voqealar (text/event-stream, ASGI ostida): 'activity' - yangi faollik,
+	'counters' - o'zgargan dashboard hisoblagichlari. Token: Authorization: Bearer <access> yoki ?token=<access>.
+	Ulanish ochilganda birinchi voqea - joriy hisoblagichlar (jarayonda hali o'qilmagan bo'lsa snapshotdan
+	bitta SELECT); keyin faqat xotiradagi navbat o'qiladi (events.py), bazaga murojaat yo'q.
+	"""
+	_, error = await _authorize(request, 'dormitory.can_view_dashboard', allow_query_token=True)
+	if error:
+		return error
+
+	subscription = events.broker.subscribe()
+	keepalive = getattr(settings, 'EVENTS_KEEPALIVE', 15)
+
+	async def stream():
+		try:
+			yield 'retry: 3000\n\n'
+			counters = events.broker.counters
+			if counters is None:
+				counters = await sync_to_async(events.broker.load_counters)()
+			if counters is not None:
+				yield _sse('counters', counters)
+			while True:
+				try:
+					event, data = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+				except asyncio.TimeoutError:
+					yield ': keepalive\n\n' # proxy/brauzer ulanishni uzmasligi uchun
+					continue
+				yield _sse(event, data)
+		finally:
+			subscription.close()
+
+	response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+	response['Cache-Control'] = 'no-cache'
+	response['X-Accel-Buffering'] = 'no' # nginx buferlamasin
+	return response
@@ -0,0 +1,166 @@
+"""
+Foydalanuvchi rollari va ruxsatlarining keshlangan to'plami (permissions.py uchun).
+
+user.has_perm har bir so'rovda foydalanuvchi va guruh ruxsatlarini, rol tekshiruvlari esa
+UserProfile.roles ni bazadan o'qiydi. Bu yerda har bir foydalanuvchi uchun bir marta yig'ilgan
+Grants (rol kodlari + "app_label.codename" ruxsatlar) jarayon ichidagi LRU va umumiy keshda
+(settings.CACHES['default']) saqlanadi - issiq yo'lda bazaga so'rov yo'q.
+
+Kalit ikki versiyaga bog'liq: umumiy (rol kodi, guruh ruxsatlari o'zgarsa) va foydalanuvchining
+o'zi (rollari yoki shaxsiy ruxsatlari o'zgarsa). Versiyalar bazada (AuthzVersion, F() bilan oshiriladi,
+models.py, signals.py) - barcha worker lar bir xil versiyani ko'radi. Jarayon ichidagi yozuvga
+AUTHZ_LOCAL_TTL sekund versiyasiz ishoniladi, keyin versiyalar bitta so'rov bilan tekshiriladi; shu
+jarayondagi o'zgarishlar yozuvni darhol o'chiradi. is_active/is_superuser keshlanmaydi - request.user dan olinadi.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import AuthzVersion, Role
+
+DEFAULT_LOCAL_SIZE = 1024
+DEFAULT_LOCAL_TTL = 5
+DEFAULT_TIMEOUT = 3600
+NAMESPACE = 'authz'
+GLOBAL_SCOPE = '*'
+BUMP_BATCH_SIZE = 500
+
+Grants = namedtuple('Grants', ['roles', 'perms'])
+EMPTY = Grants(frozenset(), frozenset())
+
+
+def _user_scope(user_pk):
+    return f'user:{user_pk}'
+
+
+def versions(user_pk):
+    """(umumiy versiya, foydalanuvchi versiyasi) - bazadan, bitta so'rov."""
+    scope = _user_scope(user_pk)
+    rows = dict(AuthzVersion.objects.filter(scope__in=(GLOBAL_SCOPE, scope)).values_list('scope', 'version'))
+    return rows.get(GLOBAL_SCOPE, 0), rows.get(scope, 0)
+
+
+def _bump(scopes, user_pks=None):
+    # Versiyalar shu tranzaksiya ichida oshadi: boshqa worker lar yangisini commit bilan birga ko'radi.
+    # Shu jarayondagi yozuvlar darhol va commit dan keyin yana o'chiriladi - oradagi parallel so'rov
+    # eski ruxsatlarni AUTHZ_LOCAL_TTL ga qo'yib qo'ygan bo'lsa ham.
+    for i in range(0, len(scopes), BUMP_BATCH_SIZE):
+        batch = scopes[i:i + BUMP_BATCH_SIZE]
+        if AuthzVersion.objects.filter(scope__in=batch).update(version=F('version') + 1) < len(batch):
+            AuthzVersion.objects.bulk_create([AuthzVersion(scope=scope, version=1) for scope in batch], ignore_conflicts=True)
+    local.discard(user_pks)
+    transaction.on_commit(lambda: local.discard(user_pks))
+
+
+def bump_users(user_pks):
+    user_pks = set(user_pks)
+    if not user_pks:
+        return
+    _bump([_user_scope(pk) for pk in user_pks], user_pks)
+
+
+def bump_all():
+    _bump([GLOBAL_SCOPE])
+
+
+def load(user_pk):
+    """Bazadan: ikki so'rov (rollar; shaxsiy va guruh ruxsatlari - ModelBackend bilan bir xil manba)."""
+    roles = Role.objects.filter(users__user_id=user_pk).values_list('code', flat=True)
+    fields = ('content_type__app_label', 'codename')
+    perms = Permission.objects.filter(user__pk=user_pk).order_by().values_list(*fields).union(
+        Permission.objects.filter(group__user__pk=user_pk).order_by().values_list(*fields)
+    )
+    return Grants(frozenset(roles), frozenset(f"{app_label}.{codename}" for app_label, codename in perms))
+
+
+class GrantsCache:
+    """
+    Jarayon ichidagi LRU: user_pk -> (versiyalar, Grants, tekshirilgan vaqt); AUTHZ_LOCAL_TTL dan keyin
+    versiyalar qayta tekshiriladi, eskirgan bo'lsa umumiy keshdan, so'ng bazadan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    @property
+    def size(self):
+        return getattr(settings, 'AUTHZ_LOCAL_CACHE_SIZE', DEFAULT_LOCAL_SIZE)
+
+    def get(self, user_pk):
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(user_pk)
+            if item is not None and now - item[2] < getattr(settings, 'AUTHZ_LOCAL_TTL', DEFAULT_LOCAL_TTL):
+                self._items.move_to_end(user_pk)
+                return item[1]
+
+        current = versions(user_pk)
+        if item is not None and item[0] == current:
+            with self._lock:
+                self._items[user_pk] = (current, item[1], now)
+                self._items.move_to_end(user_pk)
+            return item[1]
+
+        key = ':'.join(['dormitory', NAMESPACE, str(user_pk), *(str(v) for v in current)])
+        grants = cache.get(key)
+        if grants is None:
+            grants = load(user_pk)
+            cache.set(key, grants, getattr(settings, 'AUTHZ_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+        with self._lock:
+            self._items[user_pk] = (current, grants, now)
+            self._items.move_to_end(user_pk)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        return grants
+
+    def discard(self, user_pks=None):
+        """Berilgan foydalanuvchilar yozuvlari; None - hammasi (umumiy versiya oshganda)."""
+        with self._lock:
+            if user_pks is None:
+                self._items.clear()
+            for user_pk in user_pks or ():
+                self._items.pop(user_pk, None)
+
+    def clear(self):
+        self.discard()
+
+
+local = GrantsCache()
+
+
+def grants(user):
+    """Foydalanuvchining Grants i (bitta so'rov ichida user obyektida ham eslab qolinadi)."""
+    if not user or not user.is_authenticated:
+        return EMPTY
+    cached = getattr(user, '_authz_grants', None)
+    if cached is None:
+        cached = user._authz_grants = local.get(user.pk)
+    return cached
+
+
+def has_perms(user, perms):
+    # ModelBackend qoidalari: faol bo'lmagan foydalanuvchida ruxsat yo'q, faol superuser da hammasi bor
+    if not user or not user.is_authenticated or not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+    return set(perms) <= grants(user).perms
+
+
+def has_any_role(user, codes):
+    if not user or not user.is_authenticated:
+        return False
+    return user.is_superuser or not grants(user).roles.isdisjoint(codes)
+
+
+def has_all_roles(user, codes):
+    if not user or not user.is_authenticated:
+        return False
+    return user.is_superuser or set(codes) <= grants(user).roles
@@ -0,0 +1,102 @@
+"""
+Kam o'zgaradigan sahifa javoblari (binolar kartalari, xonalar jadvali) uchun kesh.
+
+Kalitlar nom fazosi (namespace) versiyasini o'z ichiga oladi: Building/Room saqlanganda yoki talaba
+xonasi o'zgarganda versiya oshiriladi (tranzaksiya commit bo'lgandan keyin) va eski kalitlar shunchaki
+ishlatilmay qoladi - kalitlarni qidirib o'chirish kerak emas. Backend - settings.CACHES['default']
+(standart locmem; bir nechta worker uchun REDIS_URL bilan Redis).
+
+Har bir keshlangan javob bilan uning ETag i saqlanadi, shuning uchun If-None-Match mos kelsa
+javob serializatsiyasiz 304 bo'ladi.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.http import parse_etags, quote_etag
+
+DEFAULT_TIMEOUT = 300
+ROOMS = 'rooms'
+
+
+def _version_key(namespace):
+    return f'dormitory:{namespace}:version'
+
+
+def version(namespace):
+    # Boshlang'ich qiymat vaqtdan olinadi: versiya kaliti keshdan chiqib ketsa ham
+    # eski (1, 2, ...) versiyali yozuvlar qayta ishlatilmaydi
+    key = _version_key(namespace)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, int(time.time() * 1000), None)
+        value = cache.get(key)
+    return value
+
+
+async def aversion(namespace):
+    key = _version_key(namespace)
+    value = await cache.aget(key)
+    if value is None:
+        await cache.aadd(key, int(time.time() * 1000), None)
+        value = await cache.aget(key)
+    return value
+
+
+def bump(*namespaces):
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            version(namespace)
+
+
+def bump_on_commit(*namespaces):
+    # commit dan oldin oshirilsa, parallel so'rov eski ma'lumotni yangi versiya bilan keshlab qo'yishi mumkin
+    transaction.on_commit(lambda: bump(*namespaces))
+
+
+def make_etag(data):
+    raw = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # zaif (W/) va kuchli ETag lar If-None-Match da teng solishtiriladi
+    return '*' in etags or etag.removeprefix('W/') in {e.removeprefix('W/') for e in etags}
+
+
+def _key(namespace, current, parts):
+    return ':'.join(['dormitory', namespace, str(current), *(str(p) for p in parts)])
+
+
+def get_or_build(namespace, parts, build):
+    """
+    (data, etag): parts (filter parametrlari) bo'yicha keshdan, bo'lmasa build() natijasi keshga yoziladi.
+    """
+    key = _key(namespace, version(namespace), parts)
+    cached = cache.get(key)
+    if cached is None:
+        data = build()
+        cached = (data, make_etag(data))
+        cache.set(key, cached, getattr(settings, 'ROOMS_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+    return cached
+
+
+async def aget_or_build(namespace, parts, build):
+    """get_or_build ning async varianti: build - korutina funksiya."""
+    key = _key(namespace, await aversion(namespace), parts)
+    cached = await cache.aget(key)
+    if cached is None:
+        data = await build()
+        cached = (data, make_etag(data))
+        await cache.aset(key, cached, getattr(settings, 'ROOMS_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+    return cached
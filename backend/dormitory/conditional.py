@@ -0,0 +1,115 @@
+"""
+Shartli GET (ETag / Last-Modified): o'zgarmagan ro'yxat yoki obyekt uchun serializatsiyasiz 304.
+
+Validatorlar arzon: ro'yxat uchun bitta aggregate (max(updated_at), count) so'rovi yoki allaqachon
+o'qilgan sahifa obyektlarining (pk, updated_at) qiymatlari; ETag ularga va so'rov manziliga
+(filterlar, sahifa, fields) bog'liq. count o'chirilgan qatorlarni ham sezadi.
+
+If-Modified-Since faqat bitta obyekt uchun hisobga olinadi: ro'yxatdan qator o'chirilsa
+max(updated_at) o'zgarmaydi, shuning uchun ro'yxatlar faqat ETag bilan solishtiriladi.
+"""
+import asyncio
+import hashlib
+import inspect
+
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .caching import etag_matches
+
+
+def _stamps(related):
+    stamps = {'last': Max('updated_at')}
+    stamps.update({name: Max(f'{name}__updated_at') for name in related})
+    return stamps
+
+
+def _validators(rows, stamps):
+    parts, last_modified = [], None
+    for values in rows:
+        parts.append(tuple(values[name] for name in ('count', *stamps)))
+        for name in stamps:
+            if values[name] and (last_modified is None or values[name] > last_modified):
+                last_modified = values[name]
+    return parts, last_modified
+
+
+def for_querysets(*querysets, related=()):
+    """
+    (validator kaliti, last_modified): har bir queryset uchun bitta aggregate so'rovi.
+    related - javobga kiradigan FK lar (masalan 'building' -> building_name), ularning updated_at i shu so'rovda.
+    """
+    stamps = _stamps(related)
+    return _validators([qs.aggregate(count=Count('pk'), **stamps) for qs in querysets], stamps)
+
+
+async def afor_querysets(*querysets, related=()):
+    """for_querysets ning async varianti (aggregate lar asyncio.gather bilan)."""
+    stamps = _stamps(related)
+    rows = await asyncio.gather(*(qs.aaggregate(count=Count('pk'), **stamps) for qs in querysets))
+    return _validators(rows, stamps)
+
+
+def for_objects(objects, *extra):
+    """
+    (validator kaliti, last_modified): allaqachon o'qilgan obyektlar bo'yicha, so'rovsiz.
+    extra - javobga kiradigan, obyektlardan kelib chiqmaydigan qiymatlar (umumiy son va h.k.).
+    """
+    parts = [(obj.pk, obj.updated_at) for obj in objects]
+    last_modified = max((updated_at for _, updated_at in parts), default=None)
+    return [*parts, extra], last_modified
+
+
+def _etag(request, key):
+    raw = repr((request.get_full_path(), key))
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def _not_modified(request, etag, last_modified, single):
+    if request.headers.get('If-None-Match'):
+        return etag_matches(request, etag)
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+    return single and since is not None and last_modified is not None and int(last_modified.timestamp()) <= since
+
+
+def evaluate(request, validators, single=False):
+    """(javob sarlavhalari, 304 qaytarish kerakmi) - respond va arespond uchun umumiy."""
+    key, last_modified = validators
+    etag = _etag(request, key)
+    # no-cache: brauzer Last-Modified bo'yicha taxminiy keshlamasin, har safar tekshirsin
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.timestamp())
+    return headers, _not_modified(request, etag, last_modified, single)
+
+
+def respond(request, validators, build, single=False):
+    """
+    validators: for_querysets/for_objects natijasi; build() - javob ma'lumoti (faqat 304 bo'lmasa chaqiriladi).
+    single=True - bitta obyekt (If-Modified-Since ham hisobga olinadi).
+    """
+    headers, not_modified = evaluate(request, validators, single)
+    if not_modified:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(build(), headers=headers)
+
+
+def respond_object(request, obj, build):
+    return respond(request, for_objects([obj]), build, single=True)
+
+
+async def arespond(request, validators, build, single=False):
+    """respond ning oddiy Django async view lar uchun varianti; build() qiymat yoki korutina qaytarishi mumkin."""
+    headers, not_modified = evaluate(request, validators, single)
+    if not_modified:
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+    data = build()
+    if inspect.isawaitable(data):
+        data = await data
+    return JsonResponse(data, safe=False, headers=headers)
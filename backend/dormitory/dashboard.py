@@ -0,0 +1,229 @@
+"""
+Dashboard ko'rsatkichlari: hisoblash va DashboardSnapshot jadvalini yuritish.
+
+DashboardView har so'rovda o'nlab COUNT/Subquery bajarmasligi uchun ko'rsatkichlar
+bitta qatorda saqlanadi. Signallar (signals.py) hisoblagichlarni F() orqali
+o'zgartiradi, vaqtga bog'liq ko'rsatkichlar (24 soat, kunlik) esa snapshot
+eskirganda to'liq qayta hisoblanadi.
+
+a* funksiyalar - ASGI (async_views.py) uchun async ORM variantlari.
+"""
+import asyncio
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from student.models import Student, StudentPaymentStory
+from . import events
+from .models import Activity, Building, DashboardSnapshot, StudentPresence
+from .utils import local_day_bounds, local_day_filter
+
+SNAPSHOT_PK = 1
+# To'liq qayta hisoblashlar orasidagi maksimal vaqt (sekund). 24 soatlik oynadagi ko'rsatkichlar shu bilan yangilanadi
+DEFAULT_MAX_AGE = 300
+
+
+def _max_age():
+    return getattr(settings, 'DASHBOARD_SNAPSHOT_MAX_AGE', DEFAULT_MAX_AGE)
+
+
+# ---------- Alohida ko'rsatkichlar ----------
+def _last_payment():
+    last_pay_sq = StudentPaymentStory.objects.filter(student=OuterRef('pk')).order_by()\
+        .values('student').annotate(latest=Max('date')).values('latest')[:1]
+    return Subquery(last_pay_sq)
+
+
+def _pending_q(today):
+    # oxirgi to'lov 30 kundan eski yoki umuman yo'q (last_payment annotatsiyasi bilan)
+    return Q(last_payment__isnull=True) | Q(last_payment__lt=today - timedelta(days=30))
+
+
+def _expiring_q(today):
+    # 7 kun ichida tugaydigan shartnomalar
+    return Q(contract_end__gte=today, contract_end__lte=today + timedelta(days=7))
+
+
+def students_inside():
+    # oxirgi harakati 'in' yoki 'late_in' bo'lganlar (StudentPresence, indekslangan filtr)
+    return StudentPresence.objects.filter(is_inside=True).count()
+
+
+def pending_payments(today):
+    return Student.objects.annotate(last_payment=_last_payment()).filter(_pending_q(today)).count()
+
+
+def _expiring_students(today):
+    # 7 kun ichida tugaydigan shartnomalar (maks 10 ta)
+    return Student.objects.filter(_expiring_q(today)).order_by('contract_end')[:10]
+
+
+def _expiring_entry(s):
+    return {
+        'student_id': s.student_id,
+        'full_name': f"{s.last_name} {s.first_name}",
+        'contract_end': s.contract_end.isoformat(),
+    }
+
+
+def expiring_list(today):
+    return [_expiring_entry(s) for s in _expiring_students(today)]
+
+
+async def aexpiring_list(today):
+    return [_expiring_entry(s) async for s in _expiring_students(today)]
+
+
+def expiring_contracts(today):
+    # (soni, ro'yxat (maks 10 ta))
+    return Student.objects.filter(_expiring_q(today)).count(), expiring_list(today)
+
+
+def today_activity_counts(today):
+    # bugungi faolliklar va kechikib kirganlar soni - bitta so'rov
+    values = Activity.objects.filter(**local_day_filter('time', today)).aggregate(
+        total=Count('pk'), late=Count('pk', filter=Q(action='late_in')),
+    )
+    return values['total'], values['late']
+
+
+def _metric_aggregates(today, now):
+    """
+    [(queryset, aggregate argumentlari), ...] - bir-biridan mustaqil so'rovlar: talabalar, binolar/xonalar, faolliklar.
+    Alohida COUNT lar o'rniga shartli Count(filter=...) ishlatiladi.
+    """
+    day_start, day_end = local_day_bounds(today)
+    since_24h = now - timedelta(hours=24)
+    return [
+        (Student.objects.annotate(last_payment=_last_payment()), dict(
+            total_students=Count('pk'),
+            assigned_students=Count('pk', filter=Q(room__isnull=False)),
+            students_inside=Count('pk', filter=Q(presence__is_inside=True)),
+            pending_payments=Count('pk', filter=_pending_q(today)),
+            expiring_contracts_7_days=Count('pk', filter=_expiring_q(today)),
+        )),
+        # xonasiz bino ham sanaladi (LEFT JOIN), har bir xona bitta binoga tegishli
+        (Building.objects.all(), dict(
+            total_buildings=Count('pk', distinct=True),
+            total_rooms=Count('rooms'),
+            total_capacity=Sum('rooms__capacity'),
+        )),
+        # bugungi va oxirgi 24 soatdagi faolliklar - time indeksi bo'yicha bitta oraliq
+        (Activity.objects.filter(time__gte=min(day_start, since_24h)), dict(
+            today_activity_count=Count('pk', filter=Q(time__gte=day_start, time__lt=day_end)),
+            late_today_count=Count('pk', filter=Q(time__gte=day_start, time__lt=day_end, action='late_in')),
+            active_students_24h=Count('student', distinct=True, filter=Q(time__gte=since_24h)),
+        )),
+    ]
+
+
+def _metrics(today, aggregates, expiring):
+    values = {'day': today}
+    for row in aggregates:
+        values.update(row)
+    values['total_capacity'] = values['total_capacity'] or 0
+    values['expiring_contracts'] = expiring
+    return values
+
+
+def compute_metrics():
+    """
+    Barcha ko'rsatkichlarni bazadan noldan hisoblaydi (snapshot maydonlari ko'rinishida).
+    4 ta so'rov: talabalar, binolar/xonalar, faolliklar va tugayotgan shartnomalar ro'yxati.
+    """
+    today = timezone.localdate()
+    aggregates = [qs.aggregate(**fields) for qs, fields in _metric_aggregates(today, timezone.now())]
+    return _metrics(today, aggregates, expiring_list(today))
+
+
+async def acompute_metrics():
+    """compute_metrics ning async varianti: 4 ta mustaqil so'rov asyncio.gather bilan."""
+    today = timezone.localdate()
+    *aggregates, expiring = await asyncio.gather(
+        *(qs.aaggregate(**fields) for qs, fields in _metric_aggregates(today, timezone.now())),
+        aexpiring_list(today),
+    )
+    return _metrics(today, aggregates, expiring)
+
+
+# ---------- Snapshot yuritish ----------
+def rebuild_snapshot():
+    """Snapshotni noldan qayta hisoblab saqlaydi va qaytaradi (odatda bitta UPDATE, birinchi marta INSERT)."""
+    now = timezone.now()
+    values = {**compute_metrics(), 'as_of': now, 'rebuilt_at': now}
+    if not DashboardSnapshot.objects.filter(pk=SNAPSHOT_PK).update(**values):
+        # parallel qayta hisoblash qatorni allaqachon yaratgan bo'lsa - uning qiymatlari ham yangi
+        DashboardSnapshot.objects.bulk_create([DashboardSnapshot(pk=SNAPSHOT_PK, **values)], ignore_conflicts=True)
+    return DashboardSnapshot(pk=SNAPSHOT_PK, **values)
+
+
+async def arebuild_snapshot():
+    now = timezone.now()
+    values = {**await acompute_metrics(), 'as_of': now, 'rebuilt_at': now}
+    if not await DashboardSnapshot.objects.filter(pk=SNAPSHOT_PK).aupdate(**values):
+        await DashboardSnapshot.objects.abulk_create([DashboardSnapshot(pk=SNAPSHOT_PK, **values)], ignore_conflicts=True)
+    return DashboardSnapshot(pk=SNAPSHOT_PK, **values)
+
+
+def _is_stale(snapshot):
+    return (
+        snapshot is None
+        or snapshot.day != timezone.localdate()
+        or timezone.now() - snapshot.rebuilt_at > timedelta(seconds=_max_age())
+    )
+
+
+def get_snapshot():
+    """
+    Joriy snapshotni qaytaradi (odatda bitta SELECT).
+    Snapshot yo'q bo'lsa, kun almashgan bo'lsa yoki DASHBOARD_SNAPSHOT_MAX_AGE dan eski bo'lsa qayta hisoblanadi.
+    """
+    snapshot = DashboardSnapshot.objects.filter(pk=SNAPSHOT_PK).first()
+    if _is_stale(snapshot):
+        snapshot = rebuild_snapshot()
+    return snapshot
+
+
+async def aget_snapshot():
+    snapshot = await DashboardSnapshot.objects.filter(pk=SNAPSHOT_PK).afirst()
+    if _is_stale(snapshot):
+        snapshot = await arebuild_snapshot()
+    return snapshot
+
+
+def bump(day=None, **deltas):
+    """
+    Hisoblagichlarni atomar (F() orqali) o'zgartiradi: bump(total_students=1, assigned_students=-1).
+    day berilsa faqat snapshot shu kunga tegishli bo'lsa o'zgartiriladi (kunlik hisoblagichlar uchun).
+    Snapshot hali yaratilmagan bo'lsa hech narsa qilinmaydi - keyingi o'qishda noldan hisoblanadi.
+    """
+    updates = {name: F(name) + delta for name, delta in deltas.items() if delta}
+    if not updates:
+        return
+    qs = DashboardSnapshot.objects.filter(pk=SNAPSHOT_PK)
+    if day is not None:
+        qs = qs.filter(day=day)
+    if qs.update(as_of=timezone.now(), **updates):
+        events.counters_changed_on_commit()
+
+
+def refresh(*names):
+    """Ko'rsatilgan (kesh qilib bo'lmaydigan) ko'rsatkichlarnigina qayta hisoblaydi."""
+    snapshot = DashboardSnapshot.objects.filter(pk=SNAPSHOT_PK).only('day').first()
+    if snapshot is None:
+        return
+    today = snapshot.day
+    values = {}
+    if 'students_inside' in names:
+        values['students_inside'] = students_inside()
+    if 'pending_payments' in names:
+        values['pending_payments'] = pending_payments(today)
+    if 'expiring_contracts' in names:
+        values['expiring_contracts_7_days'], values['expiring_contracts'] = expiring_contracts(today)
+    if 'today_activity_count' in names:
+        values['today_activity_count'], values['late_today_count'] = today_activity_counts(today)
+    if values:
+        DashboardSnapshot.objects.filter(pk=SNAPSHOT_PK).update(as_of=timezone.now(), **values)
+        events.counters_changed_on_commit()
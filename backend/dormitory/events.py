@@ -0,0 +1,160 @@
+"""
+Dashboard uchun jonli voqealar (Server-Sent Events): jarayon ichidagi pub/sub.
+
+Bitta ishlab chiqaruvchi: faolliklar commit bo'lganda (signals/ingest) ular bitta so'rov bilan
+formatlanadi va barcha ochiq SSE ulanishlariga (obunachilarga) tarqatiladi; dashboard hisoblagichlari
+o'zgarganda DashboardSnapshot qatori EVENTS_COUNTERS_INTERVAL da ko'pi bilan bir marta o'qiladi.
+Obunachilar bazaga murojaat qilmaydi - yuzlab dashboard bitta manbadan xizmat oladi.
+
+Broker jarayon ichida: SSE ulanishlari va yozuvlar bitta ASGI jarayonida bo'lishi kerak
+(masalan `uvicorn backend.asgi:application`). Bir nechta jarayonda umumiy broker (Redis pub/sub) kerak bo'ladi.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .feed import describe, feed
+from .models import DashboardSnapshot
+
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_COUNTERS_INTERVAL = 1.0
+COUNTER_FIELDS = (
+    'total_students', 'total_rooms', 'total_buildings', 'total_capacity', 'assigned_students',
+    'students_inside', 'today_activity_count', 'late_today_count', 'pending_payments',
+    'expiring_contracts_7_days', 'active_students_24h',
+)
+
+
+class Subscription:
+    """Bitta SSE ulanishi: o'z event loop idagi cheklangan navbat (sekin mijozda eng eskisi tashlanadi)."""
+
+    def __init__(self, broker, loop, maxsize):
+        self._broker = broker
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize)
+
+    def _put(self, event):
+        # faqat obunachining loop ida chaqiriladi
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    def deliver(self, event):
+        # istalgan thread dan
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            self.close()  # loop yopilgan
+
+    async def get(self):
+        return await self._queue.get()
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+
+class Broker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._counters = None         # oxirgi yuborilgan hisoblagichlar (yangi ulanishga darhol beriladi)
+        self._counters_timer = None
+
+    def subscribe(self):
+        """Async kontekstdan chaqiriladi (joriy event loop ga bog'lanadi)."""
+        maxsize = getattr(settings, 'EVENTS_QUEUE_SIZE', DEFAULT_QUEUE_SIZE)
+        subscription = Subscription(self, asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    @property
+    def counters(self):
+        return self._counters
+
+    def load_counters(self):
+        """Yangi ulanishning birinchi voqeasi uchun joriy hisoblagichlar: hali o'qilmagan bo'lsa snapshotdan."""
+        if self._counters is None:
+            self._counters = self._read_counters()
+        return self._counters
+
+    def publish(self, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver((event, data))
+
+    # ---------- hisoblagichlar ----------
+    def counters_changed(self):
+        """Hisoblagichlar o'zgardi: EVENTS_COUNTERS_INTERVAL ichidagi o'zgarishlar bitta o'qishga birlashtiriladi."""
+        if not self._subscribers:
+            self._counters = None  # obunachi yo'q - keyingi ulanishda eskisi berilmasin
+            return
+        with self._lock:
+            if self._counters_timer is not None:
+                return
+            interval = getattr(settings, 'EVENTS_COUNTERS_INTERVAL', DEFAULT_COUNTERS_INTERVAL)
+            self._counters_timer = threading.Timer(interval, self._publish_counters)
+            self._counters_timer.daemon = True
+            self._counters_timer.start()
+
+    def _read_counters(self):
+        from .dashboard import SNAPSHOT_PK  # dashboard events ni import qiladi
+
+        row = DashboardSnapshot.objects.filter(pk=SNAPSHOT_PK).values(*COUNTER_FIELDS, 'as_of').first()
+        if row is None:
+            return None
+        row['students_outside'] = max(row['total_students'] - row['students_inside'], 0)
+        row['as_of'] = row['as_of'].isoformat()
+        return row
+
+    def _publish_counters(self):
+        with self._lock:
+            self._counters_timer = None
+        try:
+            row = self._read_counters()
+        finally:
+            connection.close()  # timer thread ining ulanishi
+        if row is None:
+            return
+        self._counters = row
+        self.publish('counters', row)
+
+
+broker = Broker()
+
+
+def activities_committed(activities):
+    """
+    Yangi faolliklar commit bo'ldi (on_commit dan): so'nggi faolliklar lentasi va SSE obunachilari
+    uchun talabalar bitta so'rovda o'qiladi.
+    """
+    fresh = feed.accepted(activities)
+    targets = list(activities) if broker.has_subscribers() else fresh
+    if not targets:
+        return
+    described = describe(targets)
+    if fresh:
+        feed.push_described(fresh, described)
+    if broker.has_subscribers():
+        for activity in sorted(targets, key=lambda a: (a.time, a.pk)):
+            broker.publish('activity', {
+                'id': activity.pk,
+                'student': activity.student_id,
+                'action_code': activity.action,
+                'at': activity.time.isoformat(),
+                **described[activity.pk],
+            })
+
+
+def counters_changed_on_commit():
+    transaction.on_commit(broker.counters_changed)
@@ -0,0 +1,125 @@
+"""
+Dashboard uchun so'nggi faolliklar lentasi: xotirada oxirgi N ta faollik (tayyor formatlangan)
+vaqt bo'yicha saralangan cheklangan bufer - dashboard so'rovida bazaga murojaat yo'q.
+
+Yangi faolliklar Activity post_save va paket qabul qilish (ingest) orqali commit dan keyin qo'shiladi.
+Faollik o'zgartirilsa/o'chirilsa yoki lentadagi talaba/xona o'zgarsa bufer keyingi o'qishda
+qayta yuklanadi. Har bir jarayon o'z nusxasiga ega; boshqa jarayonlardagi yozuvlar
+RECENT_ACTIVITY_MAX_AGE sekunddan keyin yetib keladi.
+"""
+import threading
+import time
+from bisect import insort
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from student.models import Student
+from .models import Activity
+
+DEFAULT_SIZE = 100
+DEFAULT_MAX_AGE = 60
+ACTION_LABELS = dict(Activity.ACTION_CHOICES)
+
+
+def _format(time_, action, first_name, last_name, room_number):
+    return {
+        'time': timezone.localtime(time_).strftime('%H:%M'),
+        'student': f"{first_name} {last_name}",
+        'action': ACTION_LABELS.get(action, action),
+        'room': room_number,
+    }
+
+
+def describe(activities):
+    """{activity.pk: formatlangan yozuv} - talabalar bitta so'rovda."""
+    students = {
+        pk: rest for pk, *rest in Student.objects.filter(pk__in={a.student_id for a in activities})
+        .values_list('id', 'first_name', 'last_name', 'room__number')
+    }
+    described = {}
+    for activity in activities:
+        first_name, last_name, room_number = students.get(activity.student_id, ('', '', None))
+        described[activity.pk] = _format(activity.time, activity.action, first_name, last_name, room_number)
+    return described
+
+
+class RecentActivityFeed:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = []          # (time, pk, student_pk, yozuv) - o'sish tartibida
+        self._loaded_at = None
+
+    @property
+    def size(self):
+        return getattr(settings, 'RECENT_ACTIVITY_FEED_SIZE', DEFAULT_SIZE)
+
+    def load(self):
+        rows = Activity.objects.order_by('-time', '-id').values_list(
+            'time', 'id', 'student_id', 'action',
+            'student__first_name', 'student__last_name', 'student__room__number',
+        )[:self.size]
+        items = sorted(
+            (time_, pk, student_pk, _format(time_, action, first_name, last_name, room_number))
+            for time_, pk, student_pk, action, first_name, last_name, room_number in rows
+        )
+        with self._lock:
+            self._items = items
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def student_changed(self, student_pk):
+        # faqat lentada ko'rinayotgan talaba bo'lsa qayta yuklash kerak
+        with self._lock:
+            if any(item[2] == student_pk for item in self._items):
+                self._loaded_at = None
+
+    def _accepts(self, time_, pk):
+        return len(self._items) < self.size or (time_, pk) > self._items[0][:2]
+
+    def accepted(self, activities):
+        """Lentaga kiradigan (yetarlicha yangi) faolliklar; lenta hali yuklanmagan bo'lsa bo'sh."""
+        if self._loaded_at is None:
+            return []  # keyingi o'qishda baribir to'liq yuklanadi
+        with self._lock:
+            return [a for a in activities if a.pk is not None and self._accepts(a.time, a.pk)]
+
+    def push_described(self, activities, described):
+        """describe() natijasi bilan faolliklarni qo'shadi (so'rovsiz)."""
+        with self._lock:
+            for activity in activities:
+                insort(self._items, (activity.time, activity.pk, activity.student_id, described[activity.pk]))
+            del self._items[:-self.size]
+
+    def push_many(self, activities):
+        """Yangi yaratilgan faolliklarni qo'shadi (lentaga kiradiganlari uchun bitta so'rov)."""
+        fresh = self.accepted(activities)
+        if fresh:
+            self.push_described(fresh, describe(fresh))
+
+    def _stale(self):
+        max_age = getattr(settings, 'RECENT_ACTIVITY_MAX_AGE', DEFAULT_MAX_AGE)
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > max_age
+
+    def _latest(self, limit):
+        with self._lock:
+            return [item[3] for item in reversed(self._items[-limit:])] if limit > 0 else []
+
+    def recent(self, limit=10):
+        """Eng yangi limit ta yozuv (yangilari birinchi)."""
+        if self._stale():
+            self.load()
+        return self._latest(limit)
+
+    async def arecent(self, limit=10):
+        """recent() ning async varianti: bazaga faqat lenta qayta yuklanganda murojaat qilinadi."""
+        if self._stale():
+            await sync_to_async(self.load)()
+        return self._latest(limit)
+
+
+feed = RecentActivityFeed()
@@ -0,0 +1,145 @@
+"""
+Turniket/darvoza kontrollerlaridan keladigan faolliklarni paket (bulk) holida qabul qilish.
+
+Butun paket uchun: talabalar bitta so'rovda topiladi, qatorlar oddiy tekshiruvdan o'tadi,
+to'g'ri qatorlar bitta tranzaksiyada bulk_create qilinadi. Voqealar tartibsiz (eski vaqt bilan)
+kelishi mumkin - holat faqat eng yangi voqea bo'yicha o'zgaradi. bulk_create signal yubormaydi,
+shuning uchun StudentPresence, DashboardSnapshot, so'nggi faolliklar lentasi va SSE voqealari shu yerda paket bo'yicha yangilanadi.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from student.models import Student
+from . import dashboard, events, presence, schedule
+from .feed import feed
+from .models import Activity
+
+ACTIONS = {code for code, _ in Activity.ACTION_CHOICES}
+# Kontroller soati serverdan qancha oldinda bo'lishi mumkin (sekund)
+DEFAULT_MAX_CLOCK_SKEW = 300
+
+
+def _max_clock_skew():
+    return getattr(settings, 'ACTIVITY_MAX_CLOCK_SKEW', DEFAULT_MAX_CLOCK_SKEW)
+
+
+def _as_pk(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _resolve_students(events):
+    # pk va student_id bo'yicha barcha talabalarni bitta so'rovda olamiz
+    pks, codes = set(), set()
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        if event.get('student') is not None:
+            pks.add(_as_pk(event['student']))
+        elif event.get('student_id') is not None:
+            codes.add(str(event['student_id']))
+    pks.discard(None)
+    if not pks and not codes:
+        return set(), {}
+    rows = Student.objects.filter(Q(pk__in=pks) | Q(student_id__in=codes)).values_list('id', 'student_id')
+    known_pks, by_code = set(), {}
+    for pk, code in rows:
+        known_pks.add(pk)
+        by_code[code] = pk
+    return known_pks, by_code
+
+
+def _validate(event, known_pks, by_code):
+    # (Activity yoki None, xatolar lug'ati)
+    if not isinstance(event, dict):
+        return None, {'non_field_errors': ["Har bir yozuv obyekt bo'lishi kerak"]}
+    errors = {}
+    action = event.get('action')
+    if action not in ACTIONS:
+        errors['action'] = [f"Quyidagilardan biri bo'lishi kerak: {', '.join(sorted(ACTIONS))}"]
+    student_pk = None
+    if event.get('student') is not None:
+        student_pk = _as_pk(event['student'])
+        if student_pk not in known_pks:
+            errors['student'] = ["Talaba topilmadi"]
+    elif event.get('student_id') is not None:
+        student_pk = by_code.get(str(event['student_id']))
+        if student_pk is None:
+            errors['student_id'] = ["Talaba topilmadi"]
+    else:
+        errors['student'] = ["'student' (pk) yoki 'student_id' kerak"]
+    moment = timezone.now()
+    if event.get('time') is not None:
+        try:
+            moment = parse_datetime(str(event['time']))
+        except ValueError:  # to'g'ri formatdagi, lekin mavjud bo'lmagan sana (2025-02-30)
+            moment = None
+        if moment is None:
+            errors['time'] = ["Noto'g'ri vaqt formati (ISO 8601 kerak)"]
+        else:
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            if moment > timezone.now() + timedelta(seconds=_max_clock_skew()):
+                errors['time'] = ["Vaqt kelajakda"]
+    if errors:
+        return None, errors
+    return Activity(student_id=student_pk, action=schedule.classify(action, moment), time=moment), {}
+
+
+def ingest(events):
+    """
+    events: [{'student': <pk>} yoki {'student_id': '<ID>'}, 'action': 'in'|..., 'time': '<ISO, ixtiyoriy>'}, ...]
+    time - voqea vaqti (kontroller buferidan kechikib kelgan voqealar uchun); berilmasa hozirgi vaqt.
+    (yaratilgan faolliklar ro'yxati, [{'index': i, 'errors': {...}}, ...]) qaytaradi.
+    """
+    known_pks, by_code = _resolve_students(events)
+    activities, errors = [], []
+    for i, event in enumerate(events):
+        activity, row_errors = _validate(event, known_pks, by_code)
+        if row_errors:
+            errors.append({'index': i, 'errors': row_errors})
+        else:
+            activities.append(activity)
+    if not activities:
+        return [], errors
+
+    with transaction.atomic():
+        created = Activity.objects.bulk_create(activities, batch_size=1000)
+        apply_side_effects(created)
+    return created, errors
+
+
+def apply_side_effects(activities):
+    """Signalsiz yaratilgan faolliklar uchun StudentPresence, DashboardSnapshot va so'nggi faolliklar lentasini yangilaydi."""
+    if connection.features.can_return_rows_from_bulk_insert:
+        inside_delta = presence.record_many(activities)
+    else:
+        # pk qaytarilmaydigan bazalarda har bir talabani qayta hisoblaymiz
+        inside_delta = 0
+        for student_id in {a.student_id for a in activities}:
+            was_inside, is_inside = presence.recompute(student_id)
+            inside_delta += int(is_inside) - int(was_inside)
+    dashboard.bump(students_inside=inside_delta)
+
+    per_day = Counter()
+    late_per_day = Counter()
+    for activity in activities:
+        day = timezone.localdate(activity.time)
+        per_day[day] += 1
+        late_per_day[day] += int(activity.action == 'late_in')
+    for day, count in per_day.items():
+        dashboard.bump(day=day, today_activity_count=count, late_today_count=late_per_day[day])
+    if connection.features.can_return_rows_from_bulk_insert:
+        transaction.on_commit(lambda: events.activities_committed(activities))
+    else:
+        transaction.on_commit(feed.invalidate)
@@ -0,0 +1,124 @@
+"""
+Ruxsatlar sinxronizatsiyasi (rolesync.py) uchun kechiktirilgan, birlashtiriladigan ishlar navbati.
+
+Rol ruxsatlari yoki foydalanuvchi rollari o'zgarganda (models.py m2m_changed) og'ir qayta hisoblash
+admin so'rovida bajarilmaydi: o'zgarish bilan bir tranzaksiyada PermissionSyncJob qatori yoziladi
+(rol/foydalanuvchi uchun bitta qator - takroriy tahrirlar birlashadi), commit dan keyin esa jarayon
+ichidagi runner PERMISSION_SYNC_DELAY sekund kutib, yig'ilgan barcha ishlarni bitta fon thread ida
+paketlab bajaradi. Navbat jadvalda bo'lgani uchun jarayon qayta ishga tushsa ham ishlar yo'qolmaydi:
+keyingi enqueue yoki `manage.py process_permission_sync` (cron) ularni ham oladi.
+
+PERMISSION_SYNC_DEFERRED = False - navbatsiz, darhol (shu so'rovda) bajariladi.
+Kutish oralig'ida foydalanuvchining eski ruxsatlari amal qiladi (authz versiyasi sinxronizatsiyadan keyin oshadi).
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import rolesync
+from .models import PermissionSyncJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DELAY = 2.0
+DEFAULT_BATCH_SIZE = 500
+
+
+def _deferred():
+    return getattr(settings, 'PERMISSION_SYNC_DEFERRED', True)
+
+
+def _batch_size():
+    return getattr(settings, 'PERMISSION_SYNC_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+
+def process_batch():
+    """
+    Navbatdan bitta paketni oladi (qatorlar o'chiriladi) va bajaradi - bitta tranzaksiyada, xatoda ishlar qoladi.
+    Bajarilgan ishlar sonini qaytaradi.
+    """
+    with transaction.atomic():
+        qs = PermissionSyncJob.objects.order_by('pk')
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)  # parallel worker lar bir ishni ikki marta olmasin
+        claimed = list(qs.values_list('pk', 'kind', 'target_id')[:_batch_size()])
+        if not claimed:
+            return 0
+        PermissionSyncJob.objects.filter(pk__in=[pk for pk, _, _ in claimed]).delete()
+        roles = [target for _, kind, target in claimed if kind == 'role']
+        users = [target for _, kind, target in claimed if kind == 'user']
+        if roles:
+            rolesync.sync_users(rolesync.role_users(roles))
+        if users:
+            rolesync.sync_users(users)
+    return len(claimed)
+
+
+def process_pending():
+    """Navbat bo'shaguncha paketlab bajaradi; jami ishlar soni."""
+    total = 0
+    while True:
+        done = process_batch()
+        if not done:
+            return total
+        total += done
+
+
+class Runner:
+    """Jarayon ichidagi runner: commit dan keyin PERMISSION_SYNC_DELAY ichidagi so'rovlar bitta ishga birlashadi."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timer = None
+        self._executor = None
+
+    def schedule(self):
+        with self._lock:
+            if self._timer is not None:
+                return
+            delay = getattr(settings, 'PERMISSION_SYNC_DELAY', DEFAULT_DELAY)
+            self._timer = threading.Timer(delay, self._submit)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _submit(self):
+        with self._lock:
+            self._timer = None
+            if self._executor is None:
+                # bitta worker: paketlar ketma-ket, bir-biri bilan poyga qilmaydi
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='permission-sync')
+            executor = self._executor
+        executor.submit(self._run)
+
+    def _run(self):
+        try:
+            process_pending()
+        except Exception:
+            logger.exception("Ruxsatlar sinxronizatsiyasi bajarilmadi (ishlar navbatda qoldi)")
+        finally:
+            connection.close()  # fon thread ining ulanishi
+
+
+runner = Runner()
+
+
+def enqueue(users=(), roles=()):
+    """Foydalanuvchi(lar) va rol(lar) uchun ruxsatlar sinxronizatsiyasini navbatga qo'yadi."""
+    users, roles = set(users), set(roles)
+    if not users and not roles:
+        return
+    if not _deferred():
+        if roles:
+            rolesync.sync_users(rolesync.role_users(roles))
+        if users:
+            rolesync.sync_users(users)
+        return
+    PermissionSyncJob.objects.bulk_create(
+        [PermissionSyncJob(kind='role', target_id=pk) for pk in roles]
+        + [PermissionSyncJob(kind='user', target_id=pk) for pk in users],
+        batch_size=_batch_size(), ignore_conflicts=True,  # navbatda bor bo'lsa - birlashadi
+    )
+    transaction.on_commit(runner.schedule)
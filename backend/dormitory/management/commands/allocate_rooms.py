@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from dormitory.allocation import allocate
+
+
+class Command(BaseCommand):
+    help = (
+        "Xonasiz faol talabalarni bo'sh joylarga ommaviy joylashtiradi (semestr boshi). "
+        "Bir guruh talabalari imkon qadar birga; avval --dry-run bilan rejani ko'ring."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--building', type=int, action='append', dest='buildings', help="Faqat shu bino(lar) (bir necha marta berish mumkin)")
+        parser.add_argument('--floor', type=int, action='append', dest='floors', help="Afzal qavat(lar), berilgan tartibda")
+        parser.add_argument('--student', type=int, action='append', dest='students', help="Faqat shu talaba(lar) pk")
+        parser.add_argument('--dry-run', action='store_true', help="Faqat rejani ko'rsatish, yozmaslik")
+
+    def handle(self, *args, **options):
+        result = allocate(
+            student_ids=options['students'],
+            buildings=options['buildings'],
+            floors=options['floors'],
+            dry_run=options['dry_run'],
+        )
+        if options['verbosity'] > 1:
+            for pk, room_id, number in result['assignments']:
+                self.stdout.write(f"Talaba #{pk} -> xona {number} (#{room_id})")
+        verb = "joylashtiriladi" if options['dry_run'] else "joylashtirildi"
+        self.stdout.write(self.style.SUCCESS(f"{len(result['assignments'])} ta talaba {verb}"))
+        if result['unassigned']:
+            self.stdout.write(self.style.WARNING(f"{len(result['unassigned'])} ta talabaga joy yetmadi"))
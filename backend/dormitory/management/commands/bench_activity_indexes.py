@@ -0,0 +1,132 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from dormitory.models import Activity
+from dormitory.utils import local_day_filter
+from student.models import Student, StudentPaymentStory
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Activity/Student/StudentPaymentStory indekslari uchun benchmark: sun'iy ma'lumot yaratadi, "
+        "dashboard so'rovlarining query-planini va vaqtini indeks bilan va indekssiz solishtiradi. "
+        "Hammasi bitta tranzaksiyada bajariladi va oxirida bekor qilinadi (DDL tranzaksiyali bo'lgan "
+        "SQLite/PostgreSQL uchun)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--activities', type=int, default=1_000_000, help="Yaratiladigan faolliklar soni")
+        parser.add_argument('--students', type=int, default=5_000, help="Yaratiladigan talabalar soni")
+        parser.add_argument('--days', type=int, default=90, help="Faolliklar necha kunga tarqatiladi")
+        parser.add_argument('--repeat', type=int, default=5, help="Har bir so'rov necha marta o'lchanadi")
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError("Benchmark faqat SQLite/PostgreSQL da ishlaydi (tranzaksiyali DDL kerak)")
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write("Benchmark ma'lumotlari bekor qilindi.")
+
+    def _run(self, options):
+        now = timezone.now()
+        student_ids = self._seed(options, now)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("== Indekslar bilan =="))
+        self._measure(options, now, student_ids, 'with')
+
+        with connection.cursor() as cursor:
+            for model in (Activity, Student, StudentPaymentStory):
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+
+        self.stdout.write(self.style.MIGRATE_HEADING("== Indekslarsiz (faqat FK indekslari) =="))
+        self._measure(options, now, student_ids, 'without')
+
+    def _seed(self, options, now):
+        started = time.perf_counter()
+        today = timezone.localdate()
+        Student.objects.bulk_create([
+            Student(
+                student_id=f"bench-{i}",
+                first_name=f"Ism{i}",
+                last_name=f"Familiya{i}",
+                contract_end=today + timedelta(days=random.randint(-30, 365)),
+            )
+            for i in range(options['students'])
+        ], batch_size=1000)
+        student_ids = list(Student.objects.filter(student_id__startswith='bench-').values_list('id', flat=True))
+
+        StudentPaymentStory.objects.bulk_create([
+            StudentPaymentStory(student_id=sid, amount=100, date=today - timedelta(days=random.randint(0, 120)))
+            for sid in student_ids for _ in range(3)
+        ], batch_size=1000)
+
+        actions = [code for code, _ in Activity.ACTION_CHOICES]
+        span = options['days'] * 86400
+        remaining = options['activities']
+        while remaining > 0:
+            size = min(remaining, 10_000)
+            Activity.objects.bulk_create([
+                Activity(
+                    student_id=random.choice(student_ids),
+                    time=now - timedelta(seconds=random.randint(0, span)),
+                    action=random.choice(actions),
+                )
+                for _ in range(size)
+            ], batch_size=1000)
+            remaining -= size
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        self.stdout.write(
+            f"Yaratildi: {len(student_ids)} talaba, {options['activities']} faollik "
+            f"({time.perf_counter() - started:.1f}s)"
+        )
+        return student_ids
+
+    def _queries(self, now, student_ids):
+        today = timezone.localdate()
+        sample = student_ids[len(student_ids) // 2]
+        return [
+            ("bugungi faolliklar", Activity.objects.filter(**local_day_filter('time', today))),
+            ("bugun kechikkanlar", Activity.objects.filter(action='late_in', **local_day_filter('time', today))),
+            ("oxirgi 24 soat", Activity.objects.filter(time__gte=now - timedelta(hours=24))),
+            ("so'nggi 10 faollik", Activity.objects.order_by('-time')[:10]),
+            ("talabaning oxirgi harakati", Activity.objects.filter(student_id=sample).order_by('-time')[:1]),
+            ("tugayotgan shartnomalar", Student.objects.filter(
+                contract_end__gte=today, contract_end__lte=today + timedelta(days=7))),
+            ("talabaning oxirgi to'lovi", StudentPaymentStory.objects.filter(student_id=sample).order_by('-date')[:1]),
+        ]
+
+    def _explain(self, qs, label):
+        # SQL oxiridagi izoh drayverning tayyorlangan so'rovlar keshini chetlab o'tadi (DROP INDEX dan keyin eski plan qaytmasligi uchun)
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql} /* {label} */', params)
+            return [' '.join(str(col) for col in row) for row in cursor.fetchall()]
+
+    def _measure(self, options, now, student_ids, label):
+        for name, qs in self._queries(now, student_ids):
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                if qs.query.is_sliced:
+                    list(qs.values_list('pk', flat=True))
+                else:
+                    qs.count()
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(self.style.SUCCESS(f"{name}: {min(timings):.2f} ms (min of {options['repeat']})"))
+            for line in self._explain(qs, label):
+                self.stdout.write(f"    {line}")
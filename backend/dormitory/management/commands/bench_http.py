@@ -0,0 +1,105 @@
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = (
+    '/api/dashboard/', '/api/async/dashboard/',
+    '/api/bino-xonalar/', '/api/async/bino-xonalar/',
+    '/api/rooms/', '/api/async/rooms/',
+    '/api/students/', '/api/async/students/',
+    '/api/activities/', '/api/async/activities/',
+)
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Ishlab turgan serverlarga parallel HTTP yuklama beradi va har bir endpoint uchun p50/p95/p99 "
+        "kechikishni chiqaradi (sync va /api/async/ variantlarni, ASGI va WSGI serverlarni solishtirish uchun). "
+        "Masalan, ikkita terminalda:\n"
+        "  uvicorn backend.asgi:application --port 8001\n"
+        "  gunicorn backend.wsgi:application --worker-class sync --workers 4 --port 8002\n"
+        "so'ng: manage.py bench_http --server uvicorn=http://127.0.0.1:8001 "
+        "--server gunicorn=http://127.0.0.1:8002 --username admin --password ..."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', action='append', dest='servers', required=True,
+                            help="nom=bazaviy URL (bir necha marta berish mumkin)")
+        parser.add_argument('--path', action='append', dest='paths',
+                            help="O'lchanadigan yo'l(lar); standart - dashboard, bino-xonalar va ro'yxatlar (sync va async)")
+        parser.add_argument('--requests', type=int, default=500, help="Har bir endpointga so'rovlar soni")
+        parser.add_argument('--concurrency', type=int, default=50, help="Bir vaqtdagi so'rovlar soni")
+        parser.add_argument('--token', help="JWT access token")
+        parser.add_argument('--username', help="Token olish uchun (/api/auth/jwt/)")
+        parser.add_argument('--password')
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        servers = []
+        for item in options['servers']:
+            name, sep, url = item.partition('=')
+            if not sep:
+                name, url = item, item
+            servers.append((name, url.rstrip('/')))
+        paths = options['paths'] or DEFAULT_PATHS
+
+        for name, base in servers:
+            token = options['token'] or self._obtain_token(base, options)
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"== {name} ({base}): {options['requests']} so'rov, {options['concurrency']} parallel =="
+            ))
+            for path in paths:
+                self._bench(base + path, path, token, options)
+
+    def _obtain_token(self, base, options):
+        if not options['username']:
+            raise CommandError("--token yoki --username/--password kerak")
+        body = json.dumps({'username': options['username'], 'password': options['password'] or ''}).encode()
+        request = urllib.request.Request(
+            f"{base}/api/auth/jwt/", data=body, headers={'Content-Type': 'application/json'},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=options['timeout']) as response:
+                return json.load(response)['access']
+        except (urllib.error.URLError, KeyError, ValueError) as exc:
+            raise CommandError(f"{base}: token olinmadi ({exc})")
+
+    def _bench(self, url, label, token, options):
+        headers = {'Authorization': f"Bearer {token}"}
+
+        def hit(_):
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=options['timeout']) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return (time.perf_counter() - started) * 1000, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(hit, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(ms for ms, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+        line = (
+            f"{label}: p50 {_percentile(timings, 50):.1f} ms, p95 {_percentile(timings, 95):.1f} ms, "
+            f"p99 {_percentile(timings, 99):.1f} ms, {len(results) / elapsed:.0f} so'rov/s"
+        )
+        if errors:
+            self.stdout.write(self.style.WARNING(f"{line}, {errors} xato"))
+        else:
+            self.stdout.write(self.style.SUCCESS(line))
@@ -0,0 +1,118 @@
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from dormitory import models
+from dormitory.models import UserProfile
+
+
+class _Rollback(Exception):
+    pass
+
+
+# Avvalgi (user-025 dan oldingi) signal juftligi - "avval" o'lchovi uchun vaqtincha ulanadi
+def _legacy_create_user_profile(sender, instance, created, **kwargs):
+    if created:
+        UserProfile.objects.create(user=instance)
+
+
+def _legacy_save_user_profile(sender, instance, **kwargs):
+    try:
+        instance.profile.save()
+    except UserProfile.DoesNotExist:
+        UserProfile.objects.create(user=instance)
+
+
+class Command(BaseCommand):
+    help = (
+        "Foydalanuvchilarni ommaviy import qilish benchmarki: N ta foydalanuvchi bittadan saqlanadi (signallar bilan), "
+        "so'ng har biriga login (last_login) va oddiy tahrir. So'rovlar soni va vaqt avvalgi profil signallari "
+        "(har User saqlanishida profile.save()) va joriylari bilan solishtiriladi. Har bir o'lchov alohida "
+        "tranzaksiyada bajariladi va bekor qilinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000, help="Import qilinadigan foydalanuvchilar soni")
+
+    def handle(self, *args, **options):
+        results = {}
+        for label, legacy in (('avval', True), ('hozir', False)):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {label} =="))
+            with self._receivers(legacy):
+                try:
+                    with transaction.atomic():
+                        results[label] = self._run(options['users'])
+                        raise _Rollback()
+                except _Rollback:
+                    pass
+
+        self.stdout.write(self.style.MIGRATE_HEADING("== Natija (so'rovlar soni) =="))
+        for phase in results['avval']:
+            before, after = results['avval'][phase], results['hozir'][phase]
+            self.stdout.write(self.style.SUCCESS(f"{phase}: {before} -> {after} ({before - after} kam)"))
+        self.stdout.write("Benchmark ma'lumotlari bekor qilindi.")
+
+    @contextmanager
+    def _receivers(self, legacy):
+        if not legacy:
+            yield
+            return
+        post_save.disconnect(models.save_user_profile, sender=settings.AUTH_USER_MODEL)
+        post_save.connect(_legacy_create_user_profile, sender=settings.AUTH_USER_MODEL)
+        post_save.connect(_legacy_save_user_profile, sender=settings.AUTH_USER_MODEL)
+        try:
+            yield
+        finally:
+            post_save.disconnect(_legacy_create_user_profile, sender=settings.AUTH_USER_MODEL)
+            post_save.disconnect(_legacy_save_user_profile, sender=settings.AUTH_USER_MODEL)
+            post_save.connect(models.save_user_profile, sender=settings.AUTH_USER_MODEL)
+
+    def _run(self, count):
+        User = get_user_model()
+        counts = {}
+
+        def phase(name, fn):
+            # CaptureQueriesContext 9000 ta so'rovdan keyin to'xtaydi - execute_wrapper bilan sanaladi
+            executed = [0]
+
+            def count_query(execute, sql, params, many, context):
+                executed[0] += 1
+                return execute(sql, params, many, context)
+
+            started = time.perf_counter()
+            with connection.execute_wrapper(count_query):
+                fn()
+            elapsed = time.perf_counter() - started
+            counts[name] = executed[0]
+            self.stdout.write(f"{name}: {executed[0]} so'rov, {elapsed:.2f} s")
+
+        users = []
+
+        def create():
+            for i in range(count):
+                user = User(username=f"bench_import_{i}", email=f"bench_import_{i}@example.com")
+                user.set_unusable_password()  # parol xeshlash (PBKDF2) o'lchovni bosib ketmasin
+                user.save()
+                users.append(user)
+
+        def login():
+            # update_last_login bilan bir xil saqlash; yangi obyektlar - profil keshlanmagan holat
+            for user in User.objects.filter(username__startswith='bench_import_').iterator():
+                user.last_login = timezone.now()
+                user.save(update_fields=['last_login'])
+
+        def edit():
+            for user in users:
+                user.first_name = 'Bench'
+                user.save()
+
+        phase("import (create)", create)
+        phase("login (last_login)", login)
+        phase("tahrir (save)", edit)
+        return counts
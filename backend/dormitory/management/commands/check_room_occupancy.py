@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from dormitory.occupancy import check, check_status
+
+
+class Command(BaseCommand):
+    help = "Xonalar bandligi hisoblagichini (Room.occupied) haqiqiy talabalar soni bilan, holatini (Room.status) esa bandlik bilan tekshiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Farqlarni tuzatish")
+
+    def handle(self, *args, **options):
+        mismatches = check(fix=options['fix'])
+        for room_id, stored, actual in mismatches:
+            self.stdout.write(f"Xona #{room_id}: saqlangan {stored}, haqiqiy {actual}")
+        stale = check_status(fix=options['fix'])
+        for room_id in stale:
+            self.stdout.write(f"Xona #{room_id}: holat bandlikka mos emas")
+        mismatches = [*mismatches, *stale]
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("Barcha xonalar bandligi to'g'ri"))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f"{len(mismatches)} ta xona tuzatildi"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(mismatches)} ta xonada farq bor (--fix bilan tuzating)"))
@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dormitory.schedule import generate_absences
+
+
+class Command(BaseCommand):
+    help = (
+        "Yopilish vaqtidan keyin umuman kirmagan talabalar uchun 'absent' faolliklarini yaratadi. "
+        "Har kuni rejalashtirilgan holda (cron/systemd timer) ishga tushiriladi, masalan: "
+        "30 23 * * * python manage.py generate_absences. --date berilmasa oynasi yopilgan oxirgi kun olinadi: "
+        "oyna yarim tundan o'tsa (masalan 08:00-01:00) 23:30 da kechagi kun, 01:00 dan keyin yopilgan kun yoziladi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help="Kun (YYYY-MM-DD), standart - oynasi yopilgan oxirgi kun")
+        parser.add_argument('--dry-run', action='store_true', help="Faqat ko'rsatish, yozmaslik")
+
+    def handle(self, *args, **options):
+        try:
+            student_ids = generate_absences(options['date'], dry_run=options['dry_run'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        verb = "yaratiladi" if options['dry_run'] else "yaratildi"
+        self.stdout.write(self.style.SUCCESS(f"{len(student_ids)} ta 'absent' faollik {verb}"))
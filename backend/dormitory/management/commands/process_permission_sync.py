@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from dormitory.jobs import process_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Navbatdagi ruxsatlar sinxronizatsiyasi ishlarini (PermissionSyncJob) bajaradi - jarayon qayta "
+        "ishga tushganda qolib ketgan ishlar uchun (cron bilan ham ishlatish mumkin)."
+    )
+
+    def handle(self, *args, **options):
+        done = process_pending()
+        self.stdout.write(self.style.SUCCESS(f"{done} ta ish bajarildi"))
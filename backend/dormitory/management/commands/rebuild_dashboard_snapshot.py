@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from dormitory.dashboard import rebuild_snapshot
+
+
+class Command(BaseCommand):
+    help = "Dashboard snapshotini (DashboardSnapshot) bazadan noldan qayta hisoblaydi"
+
+    def handle(self, *args, **options):
+        snapshot = rebuild_snapshot()
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot qayta hisoblandi: {snapshot.total_students} talaba, "
+            f"{snapshot.students_inside} ichkarida (as of {snapshot.as_of:%Y-%m-%d %H:%M:%S})"
+        ))
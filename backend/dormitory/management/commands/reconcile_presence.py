@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from dormitory import dashboard
+from dormitory.presence import reconcile
+
+
+class Command(BaseCommand):
+    help = "Talabalarning joriy holatini (StudentPresence) Activity jadvali bilan solishtirib tuzatadi"
+
+    def handle(self, *args, **options):
+        fixed = reconcile()
+        if fixed:
+            dashboard.refresh('students_inside')
+        self.stdout.write(self.style.SUCCESS(f"Tuzatilgan yozuvlar: {fixed}"))
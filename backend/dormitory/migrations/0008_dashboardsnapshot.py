@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory', '0007_alter_activity_student_alter_userprofile_student_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('total_students', models.IntegerField(default=0)),
+                ('total_rooms', models.IntegerField(default=0)),
+                ('total_buildings', models.IntegerField(default=0)),
+                ('total_capacity', models.IntegerField(default=0)),
+                ('assigned_students', models.IntegerField(default=0)),
+                ('students_inside', models.IntegerField(default=0)),
+                ('today_activity_count', models.IntegerField(default=0)),
+                ('late_today_count', models.IntegerField(default=0)),
+                ('pending_payments', models.IntegerField(default=0)),
+                ('expiring_contracts_7_days', models.IntegerField(default=0)),
+                ('expiring_contracts', models.JSONField(blank=True, default=list)),
+                ('active_students_24h', models.IntegerField(default=0)),
+                ('as_of', models.DateTimeField()),
+                ('rebuilt_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_presence(apps, schema_editor):
+    # Mavjud faolliklardan har bir talabaning oxirgi holatini to'ldiramiz
+    Activity = apps.get_model('dormitory', 'Activity')
+    StudentPresence = apps.get_model('dormitory', 'StudentPresence')
+    latest = {}
+    for activity in Activity.objects.order_by('time', 'id').iterator():
+        latest[activity.student_id] = activity
+    StudentPresence.objects.bulk_create([
+        StudentPresence(
+            student_id=student_id,
+            last_action=a.action,
+            last_time=a.time,
+            last_activity_id=a.pk,
+            is_inside=a.action in ('in', 'late_in'),
+        )
+        for student_id, a in latest.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory', '0008_dashboardsnapshot'),
+        ('student', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentPresence',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='presence', serialize=False, to='student.student')),
+                ('last_action', models.CharField(choices=[('in', 'Kirdi'), ('out', 'Chiqdi'), ('late_in', 'Kech kirdi'), ('absent', 'Umuman kirmadi')], max_length=10)),
+                ('last_time', models.DateTimeField()),
+                ('last_activity_id', models.BigIntegerField()),
+                ('is_inside', models.BooleanField(db_index=True, default=False)),
+            ],
+        ),
+        migrations.RunPython(fill_presence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory', '0009_studentpresence'),
+        ('student', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['student', '-time'], name='activity_student_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['action', 'time'], name='activity_action_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['time'], name='activity_time_idx'),
+        ),
+    ]
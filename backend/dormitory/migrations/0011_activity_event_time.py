@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_time_to_received_at(apps, schema_editor):
+    # Eski yozuvlarda voqea vaqti ham server vaqti edi (auto_now)
+    Activity = apps.get_model('dormitory', 'Activity')
+    Activity.objects.update(received_at=models.F('time'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory', '0010_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='received_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='activity',
+            name='time',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(copy_time_to_received_at, migrations.RunPython.noop),
+    ]
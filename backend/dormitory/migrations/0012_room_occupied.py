@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:49
+
+from django.db import migrations, models
+
+
+def fill_occupied(apps, schema_editor):
+    Room = apps.get_model('dormitory', 'Room')
+    rooms = list(Room.objects.annotate(n=models.Count('students')))
+    for room in rooms:
+        room.occupied = room.n
+    Room.objects.bulk_update(rooms, ['occupied'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory', '0011_activity_event_time'),
+        ('student', '0003_student_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='occupied',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_occupied, migrations.RunPython.noop),
+    ]
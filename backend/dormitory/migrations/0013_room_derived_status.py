@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:51
+
+from django.db import migrations, models
+from django.db.models.lookups import GreaterThanOrEqual, LessThanOrEqual
+
+
+def derive_status(apps, schema_editor):
+    # qo'lda kiritilgan (eskirgan) holatlarni occupied/capacity bo'yicha qayta hisoblash
+    Room = apps.get_model('dormitory', 'Room')
+    Room.objects.update(status=models.Case(
+        models.When(LessThanOrEqual(models.F('occupied'), 0), then=models.Value('empty')),
+        models.When(GreaterThanOrEqual(models.F('occupied'), models.F('capacity')), then=models.Value('full')),
+        default=models.Value('partial'),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory', '0012_room_occupied'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='room',
+            name='status',
+            field=models.CharField(choices=[('full', 'To’la'), ('partial', 'Qisman band'), ('empty', 'Bo’sh')], default='empty', editable=False, max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['building', 'status'], name='room_building_status_idx'),
+        ),
+        migrations.RunPython(derive_status, migrations.RunPython.noop),
+    ]
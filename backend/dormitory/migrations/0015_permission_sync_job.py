@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory', '0014_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PermissionSyncJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('role', 'Rol'), ('user', 'Foydalanuvchi')], max_length=10)),
+                ('target_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'target_id'), name='permission_sync_job_unique')],
+            },
+        ),
+    ]
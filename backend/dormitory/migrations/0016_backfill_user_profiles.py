@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:40
+
+from django.conf import settings
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    # User saqlanganda profil endi qayta yaratilmaydi - profili yo'q eski foydalanuvchilar shu yerda to'ldiriladi
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserProfile = apps.get_model('dormitory', 'UserProfile')
+    missing = User.objects.filter(profile__isnull=True).values_list('pk', flat=True)
+    UserProfile.objects.bulk_create([UserProfile(user_id=pk) for pk in missing], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory', '0015_permission_sync_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
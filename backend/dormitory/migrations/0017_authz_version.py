@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory', '0016_backfill_user_profiles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthzVersion',
+            fields=[
+                ('scope', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
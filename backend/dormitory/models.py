@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from django.db.models.signals import post_save, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth.models import Permission
@@ -11,6 +12,7 @@ class Building(models.Model):  # Bino modeli: yotoqxona binosi haqida ma'lumot
  floors = models.PositiveIntegerField()  # Qavatlar soni
  rooms_count = models.PositiveIntegerField()  # Xonalar soni
  capacity = models.PositiveIntegerField()  # Binoning umumiy sig‘imi
+ updated_at = models.DateTimeField(auto_now=True)  # Oxirgi o'zgarish (shartli GET uchun)
 
  def __str__(self):
   return self.name
@@ -20,13 +22,39 @@ class Room(models.Model):  # Xona modeli: har bir xonaning parametrlari
  number = models.CharField(max_length=10)  # Xona raqami
  floor = models.PositiveIntegerField()  # Qavat raqami
  capacity = models.PositiveIntegerField()  # Xona sig‘imi
+ occupied = models.PositiveIntegerField(default=0, editable=False)  # Joylashgan talabalar soni (occupancy.py orqali yuritiladi)
  STATUS_CHOICES = [
   ('full', 'To’la'),        # Xona to‘la
   ('partial', 'Qisman band'), # Qisman band
   ('empty', 'Bo’sh'),      # Bo‘sh
  ]
- status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='empty')  # Bandlik holati
+ status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='empty', editable=False)  # Bandlik holati (occupied va capacity dan hisoblanadi)
+ updated_at = models.DateTimeField(auto_now=True)  # Oxirgi o'zgarish (occupancy.py dagi UPDATE lar ham yangilaydi)
 
+ class Meta:
+  indexes = [
+   models.Index(fields=['building', 'status'], name='room_building_status_idx'),  # binoda bo'sh joy qidirish
+  ]
+
+ def save(self, *args, **kwargs):
+  from .occupancy import status_for
+
+  if self._state.adding:
+   self.status = status_for(self.occupied, self.capacity)
+   return super().save(*args, **kwargs)
+  update_fields = kwargs.get('update_fields')
+  if update_fields is None:
+   # occupied faqat occupancy.py orqali (F()) yoziladi - eskirgan qiymat bilan ustidan yozilmasin
+   update_fields = [f.name for f in self._meta.concrete_fields if not f.primary_key and f.name != 'occupied']
+  else:
+   update_fields = [*update_fields, 'updated_at']
+   if 'capacity' in update_fields and 'status' not in update_fields:
+    update_fields.append('status')
+  kwargs['update_fields'] = update_fields
+  if 'status' in update_fields:
+   # nusxadagi occupied bo'yicha; ommaviy UPDATE lar (occupancy.py) status_expression ishlatadi
+   self.status = status_for(self.occupied, self.capacity)
+  super().save(*args, **kwargs)
 
  def __str__(self):
   return f"{self.building.name} - {self.number}"
@@ -35,7 +63,8 @@ class Room(models.Model):  # Xona modeli: har bir xonaning parametrlari
 
 class Activity(models.Model):  # Faolliklar modeli: talabalar harakatlari logi
  student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='activities')  # Qaysi talaba
- time = models.DateTimeField(auto_now=True)  # Harakat vaqti
+ time = models.DateTimeField(default=timezone.now)  # Harakat (voqea) vaqti - mijoz yuboradi, bo'lmasa hozirgi vaqt
+ received_at = models.DateTimeField(auto_now_add=True)  # Server qabul qilgan vaqt
  ACTION_CHOICES = [
   ('in', 'Kirdi'),         # Kirgan
   ('out', 'Chiqdi'),       # Chiqgan
@@ -43,11 +72,30 @@ class Activity(models.Model):  # Faolliklar modeli: talabalar harakatlari logi
   ('absent', 'Umuman kirmadi'), # Umuman kirmagan
  ]
  action = models.CharField(max_length=10, choices=ACTION_CHOICES)  # Harakat turi
+ updated_at = models.DateTimeField(auto_now=True)  # Oxirgi o'zgarish (shartli GET uchun)
+
+ class Meta:
+  indexes = [
+   models.Index(fields=['student', '-time'], name='activity_student_time_idx'),  # talabaning oxirgi harakati
+   models.Index(fields=['action', 'time'], name='activity_action_time_idx'),  # bugun kechikkanlar
+   models.Index(fields=['time'], name='activity_time_idx'),  # kunlik oraliq va so'nggi faolliklar
+  ]
 
  def __str__(self):
   return f"{self.student} - {self.get_action_display()} - {self.time}"
 
 
+class StudentPresence(models.Model):  # Talabaning joriy holati (oxirgi faollik bo'yicha), presence.py orqali yuritiladi
+ student = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, related_name='presence')  # Qaysi talaba
+ last_action = models.CharField(max_length=10, choices=Activity.ACTION_CHOICES)  # Oxirgi harakat turi
+ last_time = models.DateTimeField()  # Oxirgi harakat vaqti
+ last_activity_id = models.BigIntegerField()  # Oxirgi faollik (Activity.pk)
+ is_inside = models.BooleanField(default=False, db_index=True)  # Hozir ichkaridami ('in' yoki 'late_in')
+
+ def __str__(self):
+  return f"{self.student} - {self.get_last_action_display()}"
+
+
 class TimeOpenEndClosed(models.Model):  # Yotoqxonani ochish va yopish vaqtlari
  open_time = models.TimeField()  # Ochilish vaqti
  close_time = models.TimeField()  # Yopilish vaqti
@@ -56,6 +104,28 @@ class TimeOpenEndClosed(models.Model):  # Yotoqxonani ochish va yopish vaqtlari
   return f"Open: {self.open_time}, Close: {self.close_time}"
 
 
+class DashboardSnapshot(models.Model):  # Dashboard ko'rsatkichlarining tayyor (materializatsiya qilingan) nusxasi
+ # Yagona qator (pk=1). Signallar orqali bosqichma-bosqich yangilanadi, to'liq qayta hisoblash: dashboard.rebuild_snapshot()
+ day = models.DateField()  # Kunlik hisoblagichlar qaysi kunga tegishli
+ total_students = models.IntegerField(default=0)  # Jami talabalar
+ total_rooms = models.IntegerField(default=0)  # Jami xonalar
+ total_buildings = models.IntegerField(default=0)  # Jami binolar
+ total_capacity = models.IntegerField(default=0)  # Jami sig'im
+ assigned_students = models.IntegerField(default=0)  # Xonaga joylashganlar
+ students_inside = models.IntegerField(default=0)  # Hozir ichkarida
+ today_activity_count = models.IntegerField(default=0)  # Bugungi faolliklar
+ late_today_count = models.IntegerField(default=0)  # Bugun kechikkanlar
+ pending_payments = models.IntegerField(default=0)  # 30 kundan beri to'lov qilmaganlar
+ expiring_contracts_7_days = models.IntegerField(default=0)  # 7 kun ichida tugaydigan shartnomalar
+ expiring_contracts = models.JSONField(default=list, blank=True)  # Tugayotgan shartnomalar ro'yxati (maks 10 ta)
+ active_students_24h = models.IntegerField(default=0)  # Oxirgi 24 soatda harakat qilganlar
+ as_of = models.DateTimeField()  # Oxirgi o'zgarish vaqti
+ rebuilt_at = models.DateTimeField()  # Oxirgi to'liq qayta hisoblash vaqti
+
+ def __str__(self):
+  return f"Dashboard snapshot ({self.as_of})"
+
+
 
 
 
@@ -88,6 +158,31 @@ class UserProfile(models.Model):
  def __str__(self):
   return f"Profile of {getattr(self.user, 'username', 'user')}"
 
+ # O'qilgan/saqlangan qiymatlar eslab qolinadi - User saqlanganda profil faqat o'zgargan bo'lsa yoziladi
+ def _snapshot(self):
+  return {f.attname: getattr(self, f.attname) for f in self._meta.concrete_fields}
+
+ @classmethod
+ def from_db(cls, db, field_names, values):
+  instance = super().from_db(db, field_names, values)
+  instance._loaded = instance._snapshot()
+  return instance
+
+ def save(self, *args, **kwargs):
+  super().save(*args, **kwargs)
+  self._loaded = self._snapshot()
+
+ def save_if_changed(self):
+  """Faqat o'zgargan maydonlarni yozadi; o'zgarish bo'lmasa so'rov yo'q. Saqlangan bo'lsa True."""
+  loaded = getattr(self, '_loaded', None)
+  if self.pk is None or loaded is None:
+   self.save()
+   return True
+  changed = [f.name for f in self._meta.concrete_fields if getattr(self, f.attname) != loaded.get(f.attname)]
+  if changed:
+   self.save(update_fields=changed)
+  return bool(changed)
+
  class Meta:
   permissions = (
    ("can_view_dashboard", "Dashboardni ko'rish huquqi"),
@@ -95,19 +190,46 @@ class UserProfile(models.Model):
   )
 
 
-@receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def create_user_profile(sender, instance, created, **kwargs):
- if created:
-  UserProfile.objects.create(user=instance)
+class PermissionSyncJob(models.Model):  # Kechiktirilgan ruxsatlar sinxronizatsiyasi navbati (dormitory/jobs.py)
+ # Bitta rol/foydalanuvchi uchun bitta qator: takroriy o'zgarishlar birlashadi, qayta ishga tushganda ham yo'qolmaydi
+ KIND_CHOICES = [
+  ('role', 'Rol'),   # rol biriktirilgan barcha foydalanuvchilar
+  ('user', 'Foydalanuvchi'),
+ ]
+ kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+ target_id = models.BigIntegerField()  # Role.pk yoki User.pk
+ created_at = models.DateTimeField(auto_now_add=True)
+
+ class Meta:
+  constraints = [
+   models.UniqueConstraint(fields=['kind', 'target_id'], name='permission_sync_job_unique'),
+  ]
+
+ def __str__(self):
+  return f"{self.get_kind_display()} #{self.target_id}"
+
+
+class AuthzVersion(models.Model):  # Ruxsatlar keshi versiyalari (dormitory/authz.py): barcha worker lar uchun umumiy
+ # '*' - umumiy versiya (rol kodlari, guruh ruxsatlari), 'user:<pk>' - foydalanuvchining o'zi; F() bilan oshiriladi
+ scope = models.CharField(max_length=40, primary_key=True)
+ version = models.PositiveBigIntegerField(default=0)
+
+ def __str__(self):
+  return f"{self.scope} v{self.version}"
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def save_user_profile(sender, instance, **kwargs):
- # Profil mavjud bo'lmasa yaratishga urinmaymiz (create signal allaqachon yaratadi)
- try:
-  instance.profile.save()
- except UserProfile.DoesNotExist:
+def save_user_profile(sender, instance, created, **kwargs):
+ # Yangi foydalanuvchi - profil yaratiladi (bitta INSERT). Keyingi saqlashlarda (har login dagi last_login ham)
+ # profil bazadan o'qilmaydi; faqat user.profile orqali o'qilib o'zgartirilgan bo'lsa o'zgargan maydonlari yoziladi.
+ # Saqlashda profil qayta yaratilmaydi: profili yo'q eski foydalanuvchilar 0016 migratsiyasida to'ldirilgan,
+ # bulk_create (signalsiz) bilan qo'shilgan foydalanuvchilarga profil alohida yaratilishi kerak
+ if created:
   UserProfile.objects.create(user=instance)
+  return
+ profile = instance._state.fields_cache.get('profile')
+ if profile is not None:
+  profile.save_if_changed()
 
 
 # ---------- Roles -> User permissions sinxronizatsiyasi ----------
@@ -115,31 +237,49 @@ def sync_user_permissions(user):
  """
  Foydalanuvchi rollaridan kelib chiqib user.user_permissions ni yangilaydi.
  Superuser uchun hech narsa qilmaymiz (u allaqachon hamma ruxsatga ega).
+ Ko'p foydalanuvchi uchun - rolesync.sync_users (bitta tranzaksiya, faqat farq yoziladi).
  """
- # Ba'zi hollarda profil hali yaratilmagan bo'lishi mumkin
- profile = getattr(user, 'profile', None)
- if user.is_superuser or profile is None:
-  return
-
- # Foydalanuvchi rollaridan yig'ilgan ruxsatlar to'plami
- roles_qs = profile.roles.all()
- perms = Permission.objects.filter(roles__in=roles_qs).distinct()
- user.user_permissions.set(perms)
+ from . import rolesync
+ rolesync.sync_users([user.pk])
 
 
 @receiver(m2m_changed, sender=UserProfile.roles.through)
 def on_user_roles_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
  # Rollar qo'shilganda/olib tashlanganda/clear qilinganda user permissionsni yangilaymiz
- if action in {"post_add", "post_remove", "post_clear"}:
-  sync_user_permissions(instance.user)
+ # (jobs.py navbati orqali, commit dan keyin fon rejimida).
+ # reverse: role.users.add(profile, ...) - instance Role, pk_set profillar
+ from . import authz, jobs, rolesync
+ if action == "pre_clear" and reverse:
+  instance._cleared_users = list(rolesync.role_users([instance.pk]))
+  return
+ if action not in {"post_add", "post_remove", "post_clear"}:
+  return
+ if not reverse:
+  user_ids = [instance.user_id]
+ elif action == "post_clear":
+  user_ids = getattr(instance, '_cleared_users', [])
+ else:
+  user_ids = rolesync.profile_users(pk_set)
+ jobs.enqueue(users=user_ids)
+ authz.bump_users(user_ids)  # keshlangan rollar to'plami (dormitory/authz.py)
 
 
 @receiver(m2m_changed, sender=Role.permissions.through)
 def on_role_permissions_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
- # Rolga ruxsatlar o'zgarsa, ushbu rol biriktirilgan barcha foydalanuvchilarning ruxsatlarini yangilaymiz
- if action in {"post_add", "post_remove", "post_clear"}:
-  for profile in instance.users.select_related('user').all():
-   sync_user_permissions(profile.user)
-
+ # Rolga ruxsatlar o'zgarsa, ushbu rol biriktirilgan barcha foydalanuvchilarning ruxsatlarini
+ # yangilash navbatga qo'yiladi (reverse: permission.roles.add(role, ...))
+ from . import jobs
+ if action == "pre_clear" and reverse:
+  instance._cleared_roles = list(instance.roles.values_list('pk', flat=True))
+  return
+ if action not in {"post_add", "post_remove", "post_clear"}:
+  return
+ if not reverse:
+  role_ids = [instance.pk]
+ elif action == "post_clear":
+  role_ids = getattr(instance, '_cleared_roles', [])
+ else:
+  role_ids = pk_set
+ jobs.enqueue(roles=role_ids)
 
 # --------------------------
\ No newline at end of file
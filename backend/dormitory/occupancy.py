@@ -0,0 +1,95 @@
+"""
+Xonalar bandligi: Room.occupied hisoblagichi talaba xonasi o'zgarganda shu tranzaksiyada
+F() ifodalari bilan yangilanadi, shuning uchun xonalar jadvali JOIN/GROUP BY siz o'qiladi.
+Room.status (empty/partial/full) qo'lda kiritilmaydi - o'sha UPDATE da occupied va capacity dan hisoblanadi.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, CharField, Count, F, Value, When
+from django.db.models.lookups import GreaterThanOrEqual, LessThanOrEqual
+from django.utils import timezone
+
+from . import caching
+from .models import Room
+
+
+def status_for(occupied, capacity):
+    """Python tomonida: 0 -> empty, capacity ga yetgan -> full, aks holda partial."""
+    if occupied <= 0:
+        return 'empty'
+    if occupied >= capacity:
+        return 'full'
+    return 'partial'
+
+
+def status_expression(occupied=F('occupied'), capacity=F('capacity')):
+    """status_for ning SQL ko'rinishi; UPDATE ichida yangi occupied/capacity ifodalari bilan ishlatiladi."""
+    return Case(
+        When(LessThanOrEqual(occupied, 0), then=Value('empty')),
+        When(GreaterThanOrEqual(occupied, capacity), then=Value('full')),
+        default=Value('partial'),
+        output_field=CharField(),
+    )
+
+
+def move(old_room_id, new_room_id):
+    """Bitta talaba old_room_id dan new_room_id ga o'tdi (ikkalasi ham None bo'lishi mumkin)."""
+    if old_room_id == new_room_id:
+        return
+    apply_moves([(old_room_id, new_room_id)])
+
+
+def apply_moves(moves):
+    """
+    Ko'p talabalar ko'chishini qo'llaydi: [(eski_xona_id, yangi_xona_id), ...].
+    Har bir xona uchun bitta UPDATE (qo'shilgan va ayirilganlar yig'indisi), status ham shu UPDATE da.
+    """
+    delta = Counter()
+    for old_room_id, new_room_id in moves:
+        if old_room_id == new_room_id:
+            continue
+        if old_room_id is not None:
+            delta[old_room_id] -= 1
+        if new_room_id is not None:
+            delta[new_room_id] += 1
+    with transaction.atomic():
+        for room_id, change in delta.items():
+            if change:
+                occupied = F('occupied') + change
+                Room.objects.filter(pk=room_id).update(
+                    occupied=occupied, status=status_expression(occupied), updated_at=timezone.now(),
+                )
+        if any(delta.values()):
+            caching.bump_on_commit(caching.ROOMS)
+
+
+def check(fix=False):
+    """
+    Room.occupied ni haqiqiy talabalar soni bilan solishtiradi.
+    [(room_id, saqlangan, haqiqiy), ...] qaytaradi; fix=True bo'lsa tuzatadi (status ham qayta hisoblanadi).
+    """
+    actual = dict(Room.objects.annotate(n=Count('students')).values_list('id', 'n'))
+    mismatches = [
+        (room_id, stored, actual.get(room_id, 0))
+        for room_id, stored in Room.objects.values_list('id', 'occupied')
+        if stored != actual.get(room_id, 0)
+    ]
+    if fix and mismatches:
+        with transaction.atomic():
+            for room_id, _, count in mismatches:
+                Room.objects.filter(pk=room_id).update(
+                    occupied=count, status=status_expression(Value(count)), updated_at=timezone.now(),
+                )
+            caching.bump_on_commit(caching.ROOMS)
+    return mismatches
+
+
+def check_status(fix=False):
+    """status occupied/capacity ga mos kelmaydigan xonalar pk ro'yxati; fix=True bo'lsa tuzatadi."""
+    stale = Room.objects.annotate(expected=status_expression()).exclude(status=F('expected'))
+    room_ids = list(stale.values_list('id', flat=True))
+    if fix and room_ids:
+        Room.objects.filter(pk__in=room_ids).update(status=status_expression(), updated_at=timezone.now())
+        caching.bump_on_commit(caching.ROOMS)
+    return room_ids
@@ -0,0 +1,140 @@
+"""
+Keyset (cursor) pagination: OFFSET ishlatmaydi, har bir sahifa oldingi sahifaning oxirgi
+kaliti bo'yicha indeks orqali topiladi - sahifa narxi jadval hajmiga bog'liq emas.
+"""
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _json_default(value):
+    # DjangoJSONEncoder mikrosekundlarni qisqartiradi - kalit aniq saqlanishi kerak
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _page_size(request, default, maximum):
+    # ?page_size= yoki ?limit= (ikkalasi bir xil ma'noda)
+    raw = request.GET.get('page_size') or request.GET.get('limit')
+    try:
+        size = int(raw) if raw else default
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
+
+
+class KeysetPagination:
+    """
+    ordering: ('time', 'id') yoki ('-time', '-id') kabi maydonlar; oxirgisi noyob va NULL bo'lmasligi kerak.
+    Queryset annotatsiyalari ham bo'lishi mumkin (masalan qidiruvdagi '-search_rank').
+    Cursor - oxirgi yozuv kalitlarining base64 (JSON) ko'rinishi, mijoz uchun shaffof emas.
+    """
+
+    def __init__(self, ordering, page_size=50, max_page_size=500):
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+    def get_page_size(self, request):
+        return _page_size(request, self.page_size, self.max_page_size)
+
+    # ---------- cursor ----------
+    def encode_cursor(self, obj):
+        values = [getattr(obj, name.lstrip('-')) for name in self.ordering]
+        raw = json.dumps(values, default=_json_default, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, queryset, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            # kalit maydonlari NULL bo'lmaydi - None li cursor soxta
+            if not isinstance(values, list) or len(values) != len(self.ordering) or None in values:
+                raise ValueError
+            return [
+                self._field(queryset, name.lstrip('-')).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise InvalidCursor("Noto'g'ri cursor")
+
+    @staticmethod
+    def _field(queryset, name):
+        try:
+            return queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return queryset.query.annotations[name].output_field
+
+    def _after(self, values):
+        # (a, b) > (x, y)  =>  a > x OR (a = x AND b > y)
+        condition = Q()
+        for i, name in enumerate(self.ordering):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            equal = {n.lstrip('-'): v for n, v in zip(self.ordering[:i], values[:i])}
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[i]})
+        return condition
+
+    # ---------- sahifalash ----------
+    def _page(self, request, queryset):
+        # (sahifa + 1 ta yozuv uchun queryset, sahifa hajmi)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.GET.get('cursor')
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(queryset, cursor)))
+        size = self.get_page_size(request)
+        return queryset[:size + 1], size
+
+    def _result(self, items, size):
+        next_cursor = None
+        if len(items) > size:
+            items = items[:size]
+            next_cursor = self.encode_cursor(items[-1])
+        return items, next_cursor
+
+    def paginate_queryset(self, request, queryset):
+        """(sahifadagi obyektlar, keyingi sahifa cursori yoki None) qaytaradi."""
+        queryset, size = self._page(request, queryset)
+        return self._result(list(queryset), size)
+
+    async def apaginate_queryset(self, request, queryset):
+        """paginate_queryset ning async (ASGI view lar uchun) varianti."""
+        queryset, size = self._page(request, queryset)
+        return self._result([obj async for obj in queryset], size)
+
+
+class PagePagination:
+    """Oddiy ?page=&limit= sahifalash (umumiy son bilan). Chuqur sahifalar uchun KeysetPagination afzal."""
+
+    def __init__(self, page_size=50, max_page_size=500):
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+    def _page(self, request):
+        size = _page_size(request, self.page_size, self.max_page_size)
+        try:
+            page = max(1, int(request.GET.get('page', 1)))
+        except (TypeError, ValueError):
+            page = 1
+        return page, size
+
+    def paginate_queryset(self, request, queryset):
+        """(sahifadagi obyektlar, {'count', 'page', 'limit'}) qaytaradi."""
+        page, size = self._page(request)
+        offset = (page - 1) * size
+        items = list(queryset[offset:offset + size])
+        return items, {'count': queryset.count(), 'page': page, 'limit': size}
+
+    async def apaginate_queryset(self, request, queryset):
+        """paginate_queryset ning async varianti."""
+        page, size = self._page(request)
+        offset = (page - 1) * size
+        items = [obj async for obj in queryset[offset:offset + size]]
+        return items, {'count': await queryset.acount(), 'page': page, 'limit': size}
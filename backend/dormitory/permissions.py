@@ -1,22 +1,22 @@
 from typing import Iterable, Optional
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from . import authz
+
 
 class HasRequiredDjangoPerms(BasePermission):
     """
     DRF permission: view.permission_required = ["app_label.codename", ...]
     Grants access if request.user has ALL listed Django perms.
     If view.permission_required is missing/empty -> allow (use with IsAuthenticated together).
+    Perms come from the cached per-user set (authz.py), not user.has_perm.
     """
 
     def has_permission(self, request, view) -> bool:
         required: Optional[Iterable[str]] = getattr(view, "permission_required", None)
         if not required:
             return True
-        user = request.user
-        if not user or not user.is_authenticated:
-            return False
-        return all(user.has_perm(perm) for perm in required)
+        return authz.has_perms(request.user, required)
 
 
 class IsInAnyRole(BasePermission):
@@ -30,15 +30,7 @@ class IsInAnyRole(BasePermission):
         roles_any: Optional[Iterable[str]] = getattr(view, "roles_any", None)
         if not roles_any:
             return True
-        user = request.user
-        if not user or not user.is_authenticated:
-            return False
-        if user.is_superuser:
-            return True
-        profile = getattr(user, "profile", None)
-        if not profile:
-            return False
-        return profile.roles.filter(code__in=roles_any).exists()
+        return authz.has_any_role(request.user, roles_any)
 
 
 class IsInAllRoles(BasePermission):
@@ -52,16 +44,7 @@ class IsInAllRoles(BasePermission):
         roles_all: Optional[Iterable[str]] = getattr(view, "roles_all", None)
         if not roles_all:
             return True
-        user = request.user
-        if not user or not user.is_authenticated:
-            return False
-        if user.is_superuser:
-            return True
-        profile = getattr(user, "profile", None)
-        if not profile:
-            return False
-        user_roles = set(profile.roles.values_list("code", flat=True))
-        return set(roles_all).issubset(user_roles)
+        return authz.has_all_roles(request.user, roles_all)
 
 
 class ReadOnly(BasePermission):
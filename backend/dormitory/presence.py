@@ -0,0 +1,120 @@
+"""
+Talabalarning joriy holati (StudentPresence): "hozir kim ichkarida" savoliga
+har bir talaba uchun oxirgi Activity ni qidirmasdan, indekslangan filtr bilan javob beradi.
+
+Har bir funksiya holat o'zgarishini (oldin_ichkarida, hozir_ichkarida) qaytaradi,
+shunda chaqiruvchi DashboardSnapshot.students_inside ni delta bilan yangilay oladi.
+"""
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from student.models import Student
+from .models import Activity, StudentPresence
+
+INSIDE_ACTIONS = ('in', 'late_in')
+
+
+def _values(activity):
+    return {
+        'last_action': activity.action,
+        'last_time': activity.time,
+        'last_activity_id': activity.pk,
+        'is_inside': activity.action in INSIDE_ACTIONS,
+    }
+
+
+def record(activity):
+    """Yangi faollikni holatga qo'llaydi (faqat u oxirgisidan yangiroq bo'lsa)."""
+    with transaction.atomic():
+        presence = StudentPresence.objects.select_for_update().filter(student_id=activity.student_id).first()
+        if presence is None:
+            StudentPresence.objects.create(student_id=activity.student_id, **_values(activity))
+            return False, activity.action in INSIDE_ACTIONS
+        was_inside = presence.is_inside
+        if (activity.time, activity.pk) < (presence.last_time, presence.last_activity_id):
+            # kechikib kelgan eski voqea - joriy holatni o'zgartirmaydi
+            return was_inside, was_inside
+        values = _values(activity)
+        StudentPresence.objects.filter(pk=presence.pk).update(**values)
+        return was_inside, values['is_inside']
+
+
+def record_many(activities):
+    """
+    bulk_create qilingan faolliklar to'plamini holatga qo'llaydi (signalsiz yo'l uchun).
+    Har bir talaba uchun faqat eng yangi voqea hisobga olinadi; ichkaridagilar soni o'zgarishini qaytaradi.
+    """
+    latest = {}
+    for activity in activities:
+        current = latest.get(activity.student_id)
+        if current is None or (activity.time, activity.pk) > (current.time, current.pk):
+            latest[activity.student_id] = activity
+    if not latest:
+        return 0
+
+    delta = 0
+    with transaction.atomic():
+        existing = {
+            p.student_id: p
+            for p in StudentPresence.objects.select_for_update().filter(student_id__in=list(latest))
+        }
+        to_create, to_update = [], []
+        for student_id, activity in latest.items():
+            values = _values(activity)
+            presence = existing.get(student_id)
+            if presence is None:
+                to_create.append(StudentPresence(student_id=student_id, **values))
+                delta += int(values['is_inside'])
+                continue
+            if (activity.time, activity.pk) < (presence.last_time, presence.last_activity_id):
+                continue
+            delta += int(values['is_inside']) - int(presence.is_inside)
+            for name, value in values.items():
+                setattr(presence, name, value)
+            to_update.append(presence)
+        StudentPresence.objects.bulk_create(to_create)
+        StudentPresence.objects.bulk_update(to_update, ['last_action', 'last_time', 'last_activity_id', 'is_inside'])
+    return delta
+
+
+def recompute(student_id):
+    """Talabaning holatini uning oxirgi faolligidan qayta hisoblaydi (tahrirlash/o'chirishdan keyin)."""
+    with transaction.atomic():
+        presence = StudentPresence.objects.select_for_update().filter(student_id=student_id).first()
+        was_inside = presence.is_inside if presence else False
+        latest = Activity.objects.filter(student_id=student_id).order_by('-time', '-id').first()
+        if latest is None:
+            if presence is not None:
+                presence.delete()
+            return was_inside, False
+        StudentPresence.objects.update_or_create(student_id=student_id, defaults=_values(latest))
+        return was_inside, latest.action in INSIDE_ACTIONS
+
+
+def reconcile():
+    """
+    Barcha talabalar holatini Activity jadvalidan tekshiradi va farqlarni tuzatadi.
+    Tuzatilgan yozuvlar sonini qaytaradi.
+    """
+    last_id_sq = Activity.objects.filter(student=OuterRef('pk')).order_by('-time', '-id').values('id')[:1]
+    latest_ids = Student.objects.annotate(last_id=Subquery(last_id_sq))\
+        .filter(last_id__isnull=False).values_list('last_id', flat=True)
+    expected = {a.student_id: _values(a) for a in Activity.objects.filter(id__in=latest_ids)}
+    current = {p.student_id: p for p in StudentPresence.objects.all()}
+
+    to_create, to_update = [], []
+    for student_id, values in expected.items():
+        presence = current.get(student_id)
+        if presence is None:
+            to_create.append(StudentPresence(student_id=student_id, **values))
+        elif any(getattr(presence, name) != value for name, value in values.items()):
+            for name, value in values.items():
+                setattr(presence, name, value)
+            to_update.append(presence)
+    stale = [student_id for student_id in current if student_id not in expected]
+
+    with transaction.atomic():
+        StudentPresence.objects.bulk_create(to_create)
+        StudentPresence.objects.bulk_update(to_update, ['last_action', 'last_time', 'last_activity_id', 'is_inside'])
+        StudentPresence.objects.filter(student_id__in=stale).delete()
+    return len(to_create) + len(to_update) + len(stale)
@@ -0,0 +1,69 @@
+"""
+Rollar -> foydalanuvchi ruxsatlari (user.user_permissions) sinxronizatsiyasi, ommaviy.
+
+Har bir foydalanuvchi uchun alohida so'rov va user_permissions.set() o'rniga: barcha ta'sirlangan
+foydalanuvchilarning maqsadli (rollaridan kelgan) ruxsatlari bitta so'rovda, joriy ruxsatlari
+bitta so'rovda o'qiladi va faqat farq through jadvaliga bulk_create/delete bilan yoziladi -
+bitta tranzaksiyada. Rol 5000 kishiga biriktirilgan bo'lsa ham so'rovlar soni o'zgarmaydi
+(yozishlar BATCH_SIZE lik paketlarda).
+
+Qoidalar avvalgidek: superuser va profili yo'q foydalanuvchilarga tegilmaydi; shaxsiy ruxsatlar
+rollardan kelgan ruxsatlar bilan almashtiriladi. bulk yozuvlar m2m_changed yubormaydi - authz
+versiyalari shu yerda oshiriladi.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import transaction
+
+from . import authz
+from .models import UserProfile
+
+BATCH_SIZE = 500
+
+
+def _eligible(users):
+    # users: pk lar ro'yxati yoki pk qaytaradigan queryset (subquery bo'lib qoladi)
+    return get_user_model().objects.filter(pk__in=users, is_superuser=False, profile__isnull=False).values('pk')
+
+
+def sync_users(users):
+    """
+    users (pk lar yoki queryset) ning ruxsatlarini rollariga moslaydi.
+    (qo'shilgan, o'chirilgan) yozuvlar sonini qaytaradi.
+    """
+    through = get_user_model().user_permissions.through
+    with transaction.atomic():
+        eligible = _eligible(users)
+        target = set(
+            Permission.objects.filter(roles__users__user_id__in=eligible)
+            .order_by().values_list('roles__users__user_id', 'pk').distinct()
+        )
+        current = {
+            (user_id, permission_id): pk
+            for pk, user_id, permission_id in through.objects.filter(user_id__in=eligible)
+            .values_list('pk', 'user_id', 'permission_id')
+        }
+        to_add = target - current.keys()
+        removed = current.keys() - target
+        to_remove = [current[key] for key in removed]
+
+        through.objects.bulk_create(
+            [through(user_id=user_id, permission_id=permission_id) for user_id, permission_id in to_add],
+            batch_size=BATCH_SIZE, ignore_conflicts=True,
+        )
+        for i in range(0, len(to_remove), BATCH_SIZE):
+            through.objects.filter(pk__in=to_remove[i:i + BATCH_SIZE]).delete()
+
+        changed = {user_id for user_id, _ in to_add | removed}
+        if changed:
+            authz.bump_users(changed)
+    return len(to_add), len(to_remove)
+
+
+def role_users(role_pks):
+    """Rol(lar) biriktirilgan foydalanuvchilar pk lari (queryset - sync_users da subquery bo'lib qoladi)."""
+    return UserProfile.objects.filter(roles__in=role_pks).values_list('user_id', flat=True)
+
+
+def profile_users(profile_pks):
+    return list(UserProfile.objects.filter(pk__in=profile_pks).values_list('user_id', flat=True))
@@ -0,0 +1,120 @@
+"""
+Yotoqxonaning ochilish/yopilish vaqti (TimeOpenEndClosed) asosida faolliklarni tasniflash.
+
+Faol oyna (oxirgi TimeOpenEndClosed yozuvi) xotirada saqlanadi va model saqlanganda/o'chirilganda
+yangilanadi, shuning uchun har bir 'in' voqeasini tasniflash bazaga murojaatsiz O(1).
+Boshqa jarayonlardagi o'zgarishlar SCHEDULE_MAX_AGE sekunddan keyin yetib keladi.
+"""
+import threading
+import time as _time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from student.models import Student
+from .models import Activity, TimeOpenEndClosed
+from .utils import local_day_bounds
+
+DEFAULT_MAX_AGE = 60
+
+_lock = threading.Lock()
+_window = None      # (open_time, close_time) yoki None (sozlanmagan)
+_loaded_at = None
+
+
+def invalidate():
+    global _loaded_at
+    with _lock:
+        _loaded_at = None
+
+
+def get_window():
+    """Faol (open_time, close_time) yoki sozlanmagan bo'lsa None."""
+    global _window, _loaded_at
+    max_age = getattr(settings, 'SCHEDULE_MAX_AGE', DEFAULT_MAX_AGE)
+    with _lock:
+        if _loaded_at is None or _time.monotonic() - _loaded_at > max_age:
+            row = TimeOpenEndClosed.objects.order_by('-id').values_list('open_time', 'close_time').first()
+            _window = tuple(row) if row else None
+            _loaded_at = _time.monotonic()
+        return _window
+
+
+def is_late(moment):
+    """Mahalliy vaqt bo'yicha yotoqxona yopiq bo'lgan oraliqqa tushadimi."""
+    window = get_window()
+    if window is None:
+        return False
+    open_time, close_time = window
+    t = timezone.localtime(moment).time()
+    if open_time <= close_time:
+        # masalan 06:00 - 22:00: 22:00 dan keyin yoki 06:00 dan oldin kirish - kechikish
+        return t >= close_time or t < open_time
+    # oyna yarim tundan o'tadi (masalan 08:00 - 01:00)
+    return close_time <= t < open_time
+
+
+def classify(action, moment):
+    """'in' voqeasini yopilish vaqtidan keyin bo'lsa 'late_in' ga aylantiradi."""
+    if action == 'in' and is_late(moment):
+        return 'late_in'
+    return action
+
+
+def close_moment(day, window):
+    """Kun oynasining yopilish vaqti (aware); oyna yarim tundan o'tsa - ertasi kuni."""
+    open_time, close_time = window
+    close_day = day + timedelta(days=1) if close_time < open_time else day
+    return timezone.make_aware(datetime.combine(close_day, close_time))
+
+
+def absent_candidates(day, closes_at=None):
+    """
+    Berilgan kunda umuman kirmagan (in/late_in/absent yo'q) va hozir ichkarida bo'lmagan,
+    xonaga joylashgan faol talabalar - bitta so'rov (to'plamlar ayirmasi).
+    closes_at kun tugashidan keyin bo'lsa (oyna yarim tundan o'tadi), kun shu vaqtgacha davom etadi -
+    ertasi kuni yopilish vaqtida yozilgan 'absent' lar ham hisobga olinadi.
+    """
+    start, end = local_day_bounds(day)
+    seen = Activity.objects.filter(time__gte=start, action__in=('in', 'late_in', 'absent'))
+    if closes_at is not None and closes_at >= end:
+        seen = seen.filter(time__lte=closes_at)
+    else:
+        seen = seen.filter(time__lt=end)
+    return Student.objects.filter(working_status=True, room__isnull=False)\
+        .exclude(pk__in=seen.values('student_id'))\
+        .exclude(presence__is_inside=True)
+
+
+def generate_absences(day=None, dry_run=False):
+    """
+    Yopilish vaqtidan keyin kirmagan talabalar uchun 'absent' faolliklarini bulk_create qiladi.
+    Yaratilgan (dry_run da - yaratiladigan) talabalar pk ro'yxatini qaytaradi. Qayta ishga tushirilsa
+    yangi yozuv yaratmaydi. Kun berilmasa - oynasi yopilgan oxirgi kun: bugungi oyna hali yopilmagan
+    bo'lsa (masalan yarim tundan o'tadigan oyna) kechagi kun.
+    """
+    from .ingest import apply_side_effects
+
+    window = get_window()
+    if window is None:
+        raise ValueError("Ochilish/yopilish vaqti (TimeOpenEndClosed) sozlanmagan")
+    if day is None:
+        day = timezone.localdate()
+        if timezone.now() < close_moment(day, window):
+            day -= timedelta(days=1)
+    closes_at = close_moment(day, window)
+    if timezone.now() < closes_at:
+        raise ValueError(f"{day} uchun yopilish vaqti ({window[1]}) hali kelmagan")
+
+    student_ids = list(absent_candidates(day, closes_at).values_list('pk', flat=True))
+    if dry_run or not student_ids:
+        return student_ids
+    with transaction.atomic():
+        created = Activity.objects.bulk_create(
+            [Activity(student_id=pk, action='absent', time=closes_at) for pk in student_ids],
+            batch_size=1000,
+        )
+        apply_side_effects(created)
+    return student_ids
@@ -1,5 +1,10 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Building, Room, Activity
+from . import schedule
 from student.models import Student
 
 class BuildingSerializer(serializers.ModelSerializer):
@@ -16,18 +21,20 @@ class BuildingSummarySerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'floors', 'capacity', 'rooms_total')
 
     def get_rooms_total(self, obj):
-        # Prefer DB annotation if present to avoid N+1
-        return getattr(obj, 'rooms_total', obj.rooms.count())
+        # Prefer DB annotation if present to avoid N+1 (count() faqat annotatsiya bo'lmasa)
+        if hasattr(obj, 'rooms_total'):
+            return obj.rooms_total
+        return obj.rooms.count()
 
 class RoomSerializer(serializers.ModelSerializer):
     class Meta:
         model = Room
         fields = '__all__'
+        read_only_fields = ('occupied', 'status')
 
 
 class RoomListSerializer(serializers.ModelSerializer):
     building_name = serializers.CharField(source='building.name', read_only=True)
-    occupied = serializers.SerializerMethodField()
     status_label = serializers.SerializerMethodField()
 
     class Meta:
@@ -37,18 +44,44 @@ class RoomListSerializer(serializers.ModelSerializer):
             'occupied', 'status', 'status_label'
         )
 
-    def get_occupied(self, obj):
-        return getattr(obj, 'occupied', obj.students.count())
-
     def get_status_label(self, obj):
         return obj.get_status_display()
 
-class StudentSerializer(serializers.ModelSerializer):
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    fields=[...] argumenti bilan faqat kerakli maydonlarni qaytaradi (sparse fieldsets).
+    StudentSerializer(qs, many=True, fields=['id', 'last_name'])
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class StudentSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = Student
-        fields = '__all__'
+        exclude = ('search_key',)  # ichki qidiruv kaliti (student/search.py)
 
 class ActivitySerializer(serializers.ModelSerializer):
     class Meta:
         model = Activity
         fields = '__all__'
+        read_only_fields = ('received_at',)
+
+    def validate_time(self, value):
+        # Voqea vaqti mijozdan keladi; kelajakdagi vaqt (soat farqidan tashqari) qabul qilinmaydi
+        skew = getattr(settings, 'ACTIVITY_MAX_CLOCK_SKEW', 300)
+        if value > timezone.now() + timedelta(seconds=skew):
+            raise serializers.ValidationError("Vaqt kelajakda")
+        return value
+
+    def validate(self, attrs):
+        # 'in' yopilish vaqtidan keyin bo'lsa server o'zi 'late_in' deb belgilaydi (schedule.py)
+        if 'action' in attrs:
+            moment = attrs.get('time') or getattr(self.instance, 'time', None) or timezone.now()
+            attrs['action'] = schedule.classify(attrs['action'], moment)
+        return attrs
@@ -0,0 +1,253 @@
+"""
+Yotoqxona modellarining signallari: denormalizatsiya qilingan ma'lumotlarni (DashboardSnapshot)
+yozish bilan bir tranzaksiyada yangilab boradi.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from student.models import Student, StudentPaymentStory
+from . import authz, caching, dashboard, events, jobs, occupancy, presence, rolesync, schedule, typeahead
+from .feed import feed
+from .models import Activity, Building, Role, Room, StudentPresence, TimeOpenEndClosed
+
+User = get_user_model()
+
+
+def _remember(instance, *fields):
+    # Saqlashdan oldingi qiymatlarni eslab qolamiz (yangi obyekt uchun None)
+    previous = None
+    if instance.pk is not None:
+        previous = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+    instance._previous = previous
+
+
+def _cascaded_from(origin, model):
+    # post_delete 'origin': o'chirishni boshlagan obyekt yoki QuerySet
+    return isinstance(origin, model) or getattr(origin, 'model', None) is model
+
+
+# ---------- Building ----------
+@receiver(post_save, sender=Building)
+def on_building_saved(sender, instance, created, raw=False, **kwargs):
+    caching.bump_on_commit(caching.ROOMS)
+    if created and not raw:
+        dashboard.bump(total_buildings=1)
+
+
+@receiver(post_delete, sender=Building)
+def on_building_deleted(sender, instance, **kwargs):
+    caching.bump_on_commit(caching.ROOMS)
+    dashboard.bump(total_buildings=-1)
+
+
+# ---------- Room ----------
+@receiver(pre_save, sender=Room)
+def remember_room(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember(instance, 'capacity')
+
+
+@receiver(post_save, sender=Room)
+def on_room_saved(sender, instance, created, raw=False, **kwargs):
+    caching.bump_on_commit(caching.ROOMS)
+    if raw:
+        return
+    previous = getattr(instance, '_previous', None)
+    if created or previous is None:
+        dashboard.bump(total_rooms=1, total_capacity=instance.capacity)
+    else:
+        dashboard.bump(total_capacity=instance.capacity - previous['capacity'])
+    transaction.on_commit(lambda: typeahead.index.set_room(instance.pk, instance.number))
+    if not created:
+        transaction.on_commit(feed.invalidate)  # lentadagi xona raqamlari
+
+
+@receiver(pre_delete, sender=Room)
+def remember_room_students(sender, instance, **kwargs):
+    # Xona o'chirilganda talabalar room=NULL ga o'tadi (SET_NULL, signalsiz va updated_at siz UPDATE)
+    instance._students_count = instance.students.update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Room)
+def on_room_deleted(sender, instance, **kwargs):
+    caching.bump_on_commit(caching.ROOMS)
+    dashboard.bump(
+        total_rooms=-1,
+        total_capacity=-instance.capacity,
+        assigned_students=-getattr(instance, '_students_count', 0),
+    )
+    room_pk = instance.pk
+    transaction.on_commit(lambda: typeahead.index.set_room(room_pk, None))
+    transaction.on_commit(feed.invalidate)
+
+
+# ---------- Student ----------
+@receiver(pre_save, sender=Student)
+def remember_student(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember(instance, 'room_id', 'contract_end')
+
+
+@receiver(post_save, sender=Student)
+def on_student_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: typeahead.index.upsert(instance))
+    if not created:
+        transaction.on_commit(lambda: feed.student_changed(instance.pk))
+    previous = getattr(instance, '_previous', None)
+    if created or previous is None:
+        # yangi talabada hali to'lov yo'q
+        occupancy.move(None, instance.room_id)
+        dashboard.bump(
+            total_students=1,
+            assigned_students=int(instance.room_id is not None),
+            pending_payments=1,
+        )
+        if instance.contract_end:
+            dashboard.refresh('expiring_contracts')
+        return
+    occupancy.move(previous['room_id'], instance.room_id)
+    dashboard.bump(
+        assigned_students=int(instance.room_id is not None) - int(previous['room_id'] is not None),
+    )
+    if previous['contract_end'] != instance.contract_end:
+        dashboard.refresh('expiring_contracts')
+
+
+@receiver(pre_delete, sender=Student)
+def remember_student_presence(sender, instance, **kwargs):
+    # StudentPresence kaskad bilan o'chadi, ichkaridami - oldindan bilib olamiz
+    instance._was_inside = StudentPresence.objects.filter(student_id=instance.pk, is_inside=True).exists()
+
+
+@receiver(post_delete, sender=Student)
+def on_student_deleted(sender, instance, **kwargs):
+    occupancy.move(instance.room_id, None)
+    dashboard.bump(
+        total_students=-1,
+        assigned_students=-int(instance.room_id is not None),
+        students_inside=-int(getattr(instance, '_was_inside', False)),
+    )
+    dashboard.refresh('expiring_contracts', 'pending_payments', 'today_activity_count')
+    student_pk = instance.pk
+    transaction.on_commit(lambda: typeahead.index.remove(student_pk))
+    transaction.on_commit(lambda: feed.student_changed(student_pk))
+
+
+# ---------- Activity ----------
+def _bump_inside(transition):
+    was_inside, is_inside = transition
+    dashboard.bump(students_inside=int(is_inside) - int(was_inside))
+
+
+@receiver(pre_save, sender=Activity)
+def remember_activity(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember(instance, 'student_id')
+
+
+@receiver(post_save, sender=Activity)
+def on_activity_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous', None)
+    if created or previous is None:
+        dashboard.bump(
+            day=timezone.localdate(instance.time),
+            today_activity_count=1,
+            late_today_count=int(instance.action == 'late_in'),
+        )
+        _bump_inside(presence.record(instance))
+        transaction.on_commit(lambda: events.activities_committed([instance]))
+        return
+    transaction.on_commit(feed.invalidate)
+    dashboard.refresh('today_activity_count')
+    _bump_inside(presence.recompute(instance.student_id))
+    if previous['student_id'] != instance.student_id:
+        _bump_inside(presence.recompute(previous['student_id']))
+
+
+@receiver(post_delete, sender=Activity)
+def on_activity_deleted(sender, instance, origin=None, **kwargs):
+    # Talaba o'chirilganda (kaskad) har bir faollik uchun qayta hisoblamaymiz - Student signali bir marta qiladi
+    if _cascaded_from(origin, Student):
+        return
+    transaction.on_commit(feed.invalidate)
+    dashboard.refresh('today_activity_count')
+    # Faqat oxirgi faollik o'chirilgandagina holat o'zgaradi
+    if StudentPresence.objects.filter(student_id=instance.student_id, last_activity_id=instance.pk).exists():
+        _bump_inside(presence.recompute(instance.student_id))
+
+
+# ---------- StudentPaymentStory ----------
+@receiver(post_save, sender=StudentPaymentStory)
+def on_payment_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        dashboard.refresh('pending_payments')
+
+
+@receiver(post_delete, sender=StudentPaymentStory)
+def on_payment_deleted(sender, instance, origin=None, **kwargs):
+    if not _cascaded_from(origin, Student):
+        dashboard.refresh('pending_payments')
+
+
+# ---------- TimeOpenEndClosed ----------
+@receiver(post_save, sender=TimeOpenEndClosed)
+@receiver(post_delete, sender=TimeOpenEndClosed)
+def on_schedule_changed(sender, instance, **kwargs):
+    transaction.on_commit(schedule.invalidate)
+
+
+# ---------- Ruxsatlar keshi (authz.py) ----------
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+def on_user_grants_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {'post_add', 'post_remove', 'post_clear'}:
+        return
+    if not reverse:
+        authz.bump_users([instance.pk])
+    elif pk_set:
+        authz.bump_users(pk_set)  # permission.user_set.add(...) / group.user_set.add(...)
+    else:
+        authz.bump_all()  # teskari clear - kimga tegishli ekani ma'lum emas
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def on_group_permissions_changed(sender, action, **kwargs):
+    if action in {'post_add', 'post_remove', 'post_clear'}:
+        authz.bump_all()
+
+
+@receiver(post_save, sender=User)
+def on_user_saved(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    # is_active/is_superuser/parol o'zgargan bo'lishi mumkin - JWT dagi ruxsatlar (tokens.py) eskiradi;
+    # har kirishdagi last_login yangilanishi bundan mustasno
+    if created or raw or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    authz.bump_users([instance.pk])
+
+
+@receiver(post_delete, sender=User)
+def on_user_deleted(sender, instance, **kwargs):
+    authz.bump_users([instance.pk])
+
+
+@receiver(pre_delete, sender=Role)
+def remember_role_users(sender, instance, **kwargs):
+    instance._users = list(rolesync.role_users([instance.pk]))
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def on_role_changed(sender, instance, **kwargs):
+    # rol kodi o'zgarsa yoki rol o'chirilsa (bog'lanishlar m2m_changed siz o'chadi)
+    authz.bump_all()
+    users = getattr(instance, '_users', None)
+    if users:
+        jobs.enqueue(users=users)  # o'chirilgan rol ruxsatlari foydalanuvchilardan olinadi
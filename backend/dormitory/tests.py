@@ -1,3 +1,823 @@
-from django.test import TestCase
+import asyncio
+import base64
+import json
+from datetime import datetime, time, timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from student.models import Student, StudentPaymentStory
+from . import authz, dashboard, events, jobs, occupancy, rolesync, schedule, typeahead
+from .allocation import allocate
+from .dashboard import compute_metrics
+from .feed import feed
+from .models import (
+    Activity, AuthzVersion, Building, DashboardSnapshot, PermissionSyncJob, Role, Room, StudentPresence,
+    TimeOpenEndClosed, UserProfile,
+)
+from .presence import reconcile
+from .tokens import ClaimsJWTAuthentication, ClaimsUser, decode_perms
+from .utils import local_day_bounds, local_day_filter
+
+
+class DashboardQueryCountTests(TestCase):
+    def setUp(self):
+        building = Building.objects.create(name='A', floors=2, rooms_count=2, capacity=6)
+        room = Room.objects.create(building=building, number='101', floor=1, capacity=3)
+        Room.objects.create(building=building, number='102', floor=1, capacity=3)
+        Building.objects.create(name='B', floors=1, rooms_count=0, capacity=0)
+        today = timezone.localdate()
+        for i in range(5):
+            student = Student.objects.create(
+                student_id=f'2025{i:04}', first_name='Ali', last_name='Valiyev',
+                room=room if i % 2 else None, contract_end=today + timedelta(days=i * 3),
+            )
+            Activity.objects.create(student=student, action='late_in' if i == 0 else 'in')
+            if i < 2:
+                StudentPaymentStory.objects.create(student=student, amount=100, date=today)
+        feed.invalidate()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', password='x'))
+
+    def test_compute_metrics_query_count(self):
+        with self.assertNumQueries(4):
+            metrics = compute_metrics()
+        self.assertEqual(metrics['total_students'], 5)
+        self.assertEqual(metrics['assigned_students'], 2)
+        self.assertEqual(metrics['students_inside'], 5)
+        self.assertEqual(metrics['pending_payments'], 3)
+        self.assertEqual(metrics['expiring_contracts_7_days'], 3)
+        self.assertEqual(len(metrics['expiring_contracts']), 3)
+        self.assertEqual(metrics['total_buildings'], 2)
+        self.assertEqual(metrics['total_rooms'], 2)
+        self.assertEqual(metrics['total_capacity'], 6)
+        self.assertEqual(metrics['today_activity_count'], 5)
+        self.assertEqual(metrics['late_today_count'], 1)
+        self.assertEqual(metrics['active_students_24h'], 5)
+
+    def test_dashboard_query_count(self):
+        # snapshot yo'q: to'liq qayta hisoblash (snapshot SELECT, compute_metrics, UPDATE + INSERT, so'nggi faolliklar)
+        DashboardSnapshot.objects.all().delete()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/dashboard/')
+        self.assertLessEqual(len(queries), 8)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['metrics']['total_students'], 5)
+        # snapshot yangi, so'nggi faolliklar xotiradagi lentadan: bitta SELECT
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/dashboard/?recent=3')
+        self.assertEqual(len(response.json()['recent_activities']), 3)
+        self.assertEqual(response.json()['recent_activities'][0]['action'], 'Kirdi')
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        building = Building.objects.create(name='A', floors=1, rooms_count=1, capacity=2)
+        Room.objects.create(building=building, number='101', floor=1, capacity=2)
+        cache.clear()  # kesh sovuq: javob async view ning o'zida quriladi
+        user = User.objects.create_user('guard', password='x')
+        self.auth = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    async def test_bino_xonalar_cold_cache(self):
+        response = await self.async_client.get('/api/async/bino-xonalar/', headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['buildings'][0]['rooms_total'], 1)
+        self.assertEqual(response.json()['rooms'][0]['building_name'], 'A')
+
+    async def test_requires_token(self):
+        response = await self.async_client.get('/api/async/bino-xonalar/')
+        self.assertEqual(response.status_code, 401)
+
+
+class AbsenceTests(TestCase):
+    def setUp(self):
+        building = Building.objects.create(name='A', floors=1, rooms_count=1, capacity=4)
+        room = Room.objects.create(building=building, number='101', floor=1, capacity=4)
+        self.absent = Student.objects.create(student_id='1', first_name='Ali', last_name='V', room=room)
+        self.present = Student.objects.create(student_id='2', first_name='Vali', last_name='A', room=room)
+        self.day = timezone.localdate() - timedelta(days=2)
+
+    def _window(self, open_time, close_time):
+        TimeOpenEndClosed.objects.create(open_time=open_time, close_time=close_time)
+        schedule.invalidate()
+
+    def _came_in(self, hour):
+        moment = timezone.make_aware(datetime.combine(self.day, time(hour)))
+        Activity.objects.create(student=self.present, action='in', time=moment)
+
+    def test_rerun_creates_nothing(self):
+        self._window(time(6), time(22))
+        self._came_in(12)
+        self.assertEqual(schedule.generate_absences(self.day), [self.absent.pk])
+        self.assertEqual(schedule.generate_absences(self.day), [])
+        self.assertEqual(Activity.objects.filter(action='absent').count(), 1)
+
+    def test_overnight_window_rerun_creates_nothing(self):
+        # oyna yarim tundan o'tadi: absent ertasi kuni 01:00 da yoziladi
+        self._window(time(8), time(1))
+        self._came_in(12)
+        self.assertEqual(schedule.generate_absences(self.day), [self.absent.pk])
+        self.assertEqual(schedule.generate_absences(self.day), [])
+        absent = Activity.objects.get(action='absent')
+        self.assertEqual(timezone.localtime(absent.time).date(), self.day + timedelta(days=1))
+
+    def test_overnight_window_default_day(self):
+        # cron 23:30 da: bugungi oyna ertaga 01:00 da yopiladi - kechagi (yopilgan) kun yoziladi
+        self._window(time(8), time(1))
+        self._came_in(12)
+        now = timezone.make_aware(datetime.combine(self.day + timedelta(days=1), time(23, 30)))
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            call_command('generate_absences', stdout=StringIO())
+        absent = Activity.objects.get(action='absent')
+        self.assertEqual(absent.student, self.absent)
+        self.assertEqual(timezone.localtime(absent.time).date(), self.day + timedelta(days=1))
+
+    def test_late_in(self):
+        self._window(time(6), time(22))
+        late = timezone.make_aware(datetime.combine(self.day, time(23)))
+        self.assertEqual(schedule.classify('in', late), 'late_in')
+        self.assertEqual(schedule.classify('in', late - timedelta(hours=2)), 'in')
+
+
+class ActivityBulkCreateTests(TestCase):
+    def setUp(self):
+        self.student = Student.objects.create(student_id='20250001', first_name='Ali', last_name='V')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', password='x'))
+
+    def test_per_row_errors(self):
+        response = self.client.post('/api/activities/bulk/', {'events': [
+            {'student_id': '20250001', 'action': 'in', 'time': '2025-09-19T12:00:00+05:00'},
+            {'student_id': '404', 'action': 'in'},
+            {'student': self.student.pk, 'action': 'in', 'time': '2025-02-30T10:00:00'},
+            {'student': self.student.pk, 'action': 'in', 'time': 'kecha'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 1)
+        errors = {row['index']: row['errors'] for row in response.json()['errors']}
+        self.assertEqual(sorted(errors), [1, 2, 3])
+        self.assertIn('student_id', errors[1])
+        self.assertIn('time', errors[2])
+        self.assertIn('time', errors[3])
+        activity = Activity.objects.get()
+        self.assertEqual(activity.time.isoformat(), '2025-09-19T07:00:00+00:00')
+
+
+class ActivityListTests(TestCase):
+    def setUp(self):
+        student = Student.objects.create(student_id='1', first_name='Ali', last_name='V')
+        start = timezone.now() - timedelta(hours=5)
+        for i in range(5):
+            Activity.objects.create(student=student, action='in', time=start + timedelta(hours=i))
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', password='x'))
+
+    def test_keyset_pages(self):
+        seen, cursor = [], None
+        while True:
+            response = self.client.get('/api/activities/', {'page_size': 2, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            seen += [row['id'] for row in response.json()['results']]
+            cursor = response.json()['next']
+            if not cursor:
+                break
+        self.assertEqual(sorted(seen), sorted(Activity.objects.values_list('pk', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_invalid_parameters(self):
+        null_cursor = base64.urlsafe_b64encode(b'[null,null]').decode()
+        for params in ({'since': '2025-02-30T10:00:00'}, {'until': 'kecha'}, {'cursor': 'zzz'}, {'cursor': null_cursor}):
+            response = self.client.get('/api/activities/', params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
+
+
+class UserProfileSaveTests(TestCase):
+    def _profile_queries(self, queries):
+        return [q['sql'] for q in queries if 'dormitory_userprofile' in q['sql']]
+
+    def test_created_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            user = User.objects.create(username='guard')
+        self.assertEqual(len(self._profile_queries(queries)), 1)
+        user = User.objects.get(pk=user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            user.save(update_fields=['last_login'])
+            user.save()
+        self.assertEqual(self._profile_queries(queries), [])
+
+    def test_changed_profile_saved_with_user(self):
+        user = User.objects.create(username='guard')
+        student = Student.objects.create(student_id='1', first_name='Ali', last_name='V')
+        user = User.objects.get(pk=user.pk)
+        user.profile.student = student
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+            user.save()  # ikkinchi saqlashda profil o'zgarmagan
+        self.assertEqual(len(self._profile_queries(queries)), 1)
+        self.assertEqual(UserProfile.objects.get(user=user).student, student)
+
+    def test_backfill_missing_profiles(self):
+        user = User.objects.create(username='guard')
+        UserProfile.objects.filter(user=user).delete()
+        import_module('dormitory.migrations.0016_backfill_user_profiles').create_missing_profiles(apps, None)
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
+
+
+class StudentListTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            Student.objects.create(student_id=f'2025{i:04}', first_name='Ali' if i != 2 else 'Alisher', last_name=f'Valiyev{i}')
+        Student.objects.create(student_id='20259999', first_name='Vali', last_name='Aliyev')
+        Student.objects.create(student_id='20258888', first_name='Bobur', last_name='Karimov')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', password='x'))
+
+    def _walk(self, params):
+        seen, cursor = [], None
+        while True:
+            response = self.client.get('/api/students/', {**params, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            seen += [row['id'] for row in response.json()['results']]
+            cursor = response.json()['next']
+            if not cursor:
+                return seen
+
+    def test_cursor_pages(self):
+        seen = self._walk({'limit': 3, 'ordering': '-last_name'})
+        self.assertEqual(seen, list(Student.objects.order_by('-last_name', '-id').values_list('pk', flat=True)))
+
+    def test_ranked_search_pages(self):
+        # moslik darajasi bo'yicha: to'liq mos "ali" tokeni prefiks mosliklardan oldin
+        seen = self._walk({'name': 'ali', 'limit': 2})
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
+        prefix_only = list(Student.objects.filter(first_name__in=('Alisher', 'Vali')).order_by('id').values_list('pk', flat=True))
+        self.assertEqual(seen[4:], prefix_only)
+
+        # cursor faqat ball va id dan iborat - ism-familiya ochiq ko'rinmaydi
+        cursor = self.client.get('/api/students/', {'name': 'ali', 'limit': 2}).json()['next']
+        self.assertEqual(json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))), [2, seen[1]])
+
+        pages = [self.client.get('/api/students/', {'name': 'ali', 'limit': 2, 'page': n}).json() for n in (1, 2, 3)]
+        self.assertEqual([row['id'] for page in pages for row in page['results']], seen)
+        self.assertEqual(pages[0]['count'], 6)
+
+    def test_fields_and_internal_key(self):
+        response = self.client.get('/api/students/', {'name': 'karimov', 'fields': 'id,last_name'})
+        self.assertEqual(response.json()['results'], [{'id': Student.objects.get(last_name='Karimov').pk, 'last_name': 'Karimov'}])
+        response = self.client.get('/api/students/', {'page': 1})
+        self.assertNotIn('search_key', response.json()['results'][0])
+        self.assertEqual(self.client.get('/api/students/', {'fields': 'search_key'}).status_code, 400)
+
+    def test_search_without_terms(self):
+        response = self.client.get('/api/students/', {'name': "'"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        feed.invalidate()
+        dashboard.rebuild_snapshot()
+        self.building = Building.objects.create(name='A', floors=2, rooms_count=2, capacity=5)
+        self.room = Room.objects.create(building=self.building, number='101', floor=1, capacity=2)
+
+    def assertSnapshotFresh(self):
+        snapshot = DashboardSnapshot.objects.get(pk=dashboard.SNAPSHOT_PK)
+        metrics = compute_metrics()
+        metrics.pop('active_students_24h')  # faqat to'liq qayta hisoblashda yangilanadi
+        for name, value in metrics.items():
+            self.assertEqual(getattr(snapshot, name), value, name)
+
+    def test_counters_follow_writes(self):
+        other = Room.objects.create(building=self.building, number='102', floor=1, capacity=3)
+        ali = Student.objects.create(student_id='1', first_name='Ali', last_name='V', room=self.room,
+                                     contract_end=timezone.localdate() + timedelta(days=3))
+        vali = Student.objects.create(student_id='2', first_name='Vali', last_name='X')
+        self.assertSnapshotFresh()
+        Activity.objects.create(student=ali, action='in')
+        activity = Activity.objects.create(student=vali, action='late_in')
+        self.assertSnapshotFresh()
+        activity.action = 'out'
+        activity.save()
+        StudentPaymentStory.objects.create(student=ali, amount=5, date=timezone.localdate())
+        self.assertSnapshotFresh()
+        vali.room = other
+        vali.save()
+        other.capacity = 6
+        other.save()
+        self.assertSnapshotFresh()
+        other.delete()
+        ali.delete()
+        self.assertSnapshotFresh()
+        self.building.delete()
+        self.assertSnapshotFresh()
+
+
+class PresenceTests(TestCase):
+    def setUp(self):
+        self.student = Student.objects.create(student_id='1', first_name='Ali', last_name='V')
+
+    def is_inside(self):
+        presence = StudentPresence.objects.filter(pk=self.student.pk).first()
+        return presence is not None and presence.is_inside
+
+    def test_latest_activity_wins(self):
+        now = timezone.now()
+        came_in = Activity.objects.create(student=self.student, action='in', time=now - timedelta(minutes=10))
+        self.assertTrue(self.is_inside())
+        went_out = Activity.objects.create(student=self.student, action='out', time=now - timedelta(minutes=5))
+        self.assertFalse(self.is_inside())
+        # kechikib kelgan eski voqea holatni o'zgartirmaydi
+        Activity.objects.create(student=self.student, action='in', time=now - timedelta(hours=1))
+        self.assertFalse(self.is_inside())
+        went_out.delete()
+        self.assertTrue(self.is_inside())
+        came_in.delete()
+        Activity.objects.filter(student=self.student).delete()
+        self.assertFalse(StudentPresence.objects.filter(pk=self.student.pk).exists())
+
+    def test_reconcile(self):
+        Activity.objects.create(student=self.student, action='late_in')
+        StudentPresence.objects.all().delete()
+        self.assertEqual(reconcile(), 1)
+        self.assertEqual(reconcile(), 0)
+        self.assertTrue(self.is_inside())
+
+
+class ActivityIndexTests(TestCase):
+    def test_hot_filter_indexes(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Activity._meta.db_table)
+        self.assertLessEqual({'activity_student_time_idx', 'activity_action_time_idx', 'activity_time_idx'}, set(constraints))
+
+
+class LocalDayTests(TestCase):
+    def test_local_day_filter(self):
+        # Asia/Tashkent (UTC+5): mahalliy 00:10 UTC bo'yicha oldingi kunga tushadi
+        day = timezone.localdate() - timedelta(days=1)
+        start, end = local_day_bounds(day)
+        self.assertEqual(timezone.localtime(start).time(), time.min)
+        self.assertEqual(end - start, timedelta(days=1))
+        student = Student.objects.create(student_id='1', first_name='Ali', last_name='V')
+        for moment in (start + timedelta(minutes=10), start - timedelta(minutes=10), end, end - timedelta(seconds=1)):
+            Activity.objects.create(student=student, action='in', time=moment)
+        self.assertEqual(Activity.objects.filter(**local_day_filter('time', day)).count(), 2)
+
+
+class StudentPageTests(TestCase):
+    def setUp(self):
+        for i in range(7):
+            Student.objects.create(student_id=f'S{i}', first_name='Ali', last_name=f'L{i % 3}')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', password='x'))
+
+    def test_page_mode(self):
+        response = self.client.get('/api/students/', {'page': 3, 'limit': 3})
+        self.assertEqual((response.json()['count'], len(response.json()['results'])), (7, 1))
+
+    def test_sparse_fields(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/students/', {'fields': 'student_id,last_name', 'ordering': '-last_name'})
+        self.assertEqual(set(response.json()['results'][0]), {'student_id', 'last_name'})
+        self.assertEqual(self.client.get('/api/students/', {'fields': 'zzz'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/students/', {'ordering': 'address'}).status_code, 400)
+
+
+class TypeaheadTests(TestCase):
+    def setUp(self):
+        building = Building.objects.create(name='A', floors=1, rooms_count=1, capacity=2)
+        self.room = Room.objects.create(building=building, number='101', floor=1, capacity=2)
+        Student.objects.create(student_id='2025001', first_name='Ўткир', last_name='Ғуломов', room=self.room)
+        typeahead.index.build()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', password='x'))
+
+    def suggest(self, query):
+        response = self.client.get('/api/students/suggest/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_transliterated_prefix(self):
+        with self.assertNumQueries(0):
+            results = self.suggest("g'ul")
+        self.assertEqual([row['student_id'] for row in results], ['2025001'])
+        self.assertEqual(results[0]['room_number'], '101')
+
+    def test_index_follows_commits(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            student = Student.objects.create(student_id='2025002', first_name='Otabek', last_name='Gulomova')
+        self.assertEqual([row['student_id'] for row in self.suggest('gul')], ['2025001', '2025002'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room.number = '202'
+            self.room.save()
+            student.delete()
+        results = self.suggest('2025')
+        self.assertEqual([(row['student_id'], row['room_number']) for row in results], [('2025001', '202')])
+
+    def test_changes_during_rebuild(self):
+        # qurish lock siz ketadi; shu paytda kelgan o'zgarish yangi holatda ham qoladi
+        index = typeahead.TypeaheadIndex()
+        load = index._load
+        student = Student.objects.get(student_id='2025001')
+
+        def load_then_remove():
+            state = load()
+            index.remove(student.pk)
+            return state
+
+        with mock.patch.object(index, '_load', load_then_remove):
+            index.build()
+        self.assertEqual(index.suggest('gul'), [])
+        index.upsert(student)
+        with self.assertNumQueries(0):
+            self.assertEqual([row['student_id'] for row in index.suggest('gul')], ['2025001'])
+
+
+class BulkIngestSideEffectTests(TestCase):
+    def setUp(self):
+        schedule.invalidate()
+        feed.invalidate()
+        dashboard.rebuild_snapshot()
+        self.students = [Student.objects.create(student_id=f'S{i}', first_name='Ali', last_name='V') for i in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', password='x'))
+
+    def test_presence_and_snapshot(self):
+        now = timezone.now()
+        events_ = [
+            {'student_id': 'S0', 'action': 'in', 'time': (now - timedelta(minutes=3)).isoformat()},
+            {'student_id': 'S0', 'action': 'out', 'time': (now - timedelta(minutes=2)).isoformat()},
+            {'student_id': 'S1', 'action': 'in', 'time': (now - timedelta(minutes=1)).isoformat()},
+            {'student_id': 'S2', 'action': 'out'},
+        ]
+        response = self.client.post('/api/activities/bulk/', {'events': events_}, format='json')
+        self.assertEqual(response.json(), {'created': 4, 'errors': []})
+        inside = set(StudentPresence.objects.filter(is_inside=True).values_list('pk', flat=True))
+        self.assertEqual(inside, {self.students[1].pk})
+        self.assertEqual(reconcile(), 0)
+        snapshot = DashboardSnapshot.objects.get(pk=dashboard.SNAPSHOT_PK)
+        self.assertEqual((snapshot.today_activity_count, snapshot.students_inside), (4, 1))
+
+
+class RoomOccupancyTests(TestCase):
+    def setUp(self):
+        building = Building.objects.create(name='A', floors=1, rooms_count=2, capacity=5)
+        self.room = Room.objects.create(building=building, number='1', floor=1, capacity=2)
+        self.other = Room.objects.create(building=building, number='2', floor=1, capacity=3)
+
+    def occupied(self, room):
+        return Room.objects.get(pk=room.pk).occupied
+
+    def test_counter_follows_students(self):
+        ali = Student.objects.create(student_id='1', first_name='Ali', last_name='V', room=self.room)
+        vali = Student.objects.create(student_id='2', first_name='Vali', last_name='V', room=self.room)
+        self.assertEqual(self.occupied(self.room), 2)
+        vali.room = self.other
+        vali.save()
+        self.assertEqual((self.occupied(self.room), self.occupied(self.other)), (1, 1))
+        ali.delete()
+        self.assertEqual(self.occupied(self.room), 0)
+        self.assertEqual(occupancy.check(), [])
+
+    def test_check_fixes_drift(self):
+        Student.objects.create(student_id='1', first_name='Ali', last_name='V', room=self.room)
+        Room.objects.filter(pk=self.room.pk).update(occupied=7)
+        self.assertEqual(len(occupancy.check(fix=True)), 1)
+        self.assertEqual(occupancy.check(), [])
+        self.assertEqual(self.occupied(self.room), 1)
+
+
+class RoomStatusTests(TestCase):
+    def setUp(self):
+        self.building = Building.objects.create(name='A', floors=1, rooms_count=2, capacity=5)
+        self.room = Room.objects.create(building=self.building, number='1', floor=1, capacity=2)
+        Room.objects.create(building=self.building, number='2', floor=1, capacity=3)
+
+    def status(self):
+        return Room.objects.get(pk=self.room.pk).status
+
+    def test_status_follows_occupancy(self):
+        self.assertEqual(self.status(), 'empty')
+        ali = Student.objects.create(student_id='1', first_name='Ali', last_name='V', room=self.room)
+        self.assertEqual(self.status(), 'partial')
+        Student.objects.create(student_id='2', first_name='Vali', last_name='V', room=self.room)
+        self.assertEqual(self.status(), 'full')
+        ali.delete()
+        self.room.refresh_from_db()
+        self.room.capacity = 1
+        # eski capacity (signal), UPDATE, dashboard total_capacity - refresh_from_db siz
+        with self.assertNumQueries(3):
+            self.room.save()
+        self.assertEqual(self.room.status, 'full')
+        self.assertEqual(self.status(), 'full')
+        self.assertEqual(occupancy.check_status(), [])
+
+    def test_check_status_fixes_drift(self):
+        Student.objects.create(student_id='1', first_name='Ali', last_name='V', room=self.room)
+        Room.objects.filter(pk=self.room.pk).update(status='empty')
+        self.assertEqual(occupancy.check_status(fix=True), [self.room.pk])
+        self.assertEqual(self.status(), 'partial')
+
+    def test_status_is_read_only(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser('admin', password='x'))
+        response = client.put(f'/api/rooms/{self.room.pk}/', {
+            'building': self.building.pk, 'number': '1', 'floor': 1, 'capacity': 5, 'status': 'full',
+        }, format='json')
+        self.assertEqual(response.json()['status'], 'empty')
+        self.assertEqual(len(client.get('/api/rooms/', {'available': 1}).json()), 2)
+
+
+class AllocationTests(TestCase):
+    def setUp(self):
+        building = Building.objects.create(name='A', floors=2, rooms_count=3, capacity=6)
+        self.shared = Room.objects.create(building=building, number='1', floor=1, capacity=2)
+        Room.objects.create(building=building, number='2', floor=1, capacity=2)
+        Room.objects.create(building=building, number='3', floor=2, capacity=2)
+        Student.objects.create(student_id='X', first_name='A', last_name='B', department='IT', group='1', room=self.shared)
+        for i in range(3):
+            Student.objects.create(student_id=f'IT{i}', first_name='A', last_name='B', department='IT', group='1')
+        for i in range(2):
+            Student.objects.create(student_id=f'M{i}', first_name='A', last_name='B', department='Math', group='2')
+
+    def test_dry_run_writes_nothing(self):
+        result = allocate(dry_run=True)
+        self.assertEqual((len(result['assignments']), result['unassigned']), (5, []))
+        self.assertEqual(Student.objects.filter(room__isnull=False).count(), 1)
+
+    def test_groups_stay_together(self):
+        result = allocate()
+        self.assertEqual(len(result['assignments']), 5)
+        # guruhdosh yashaydigan xona birinchi to'ladi, Math guruhi bitta xonada
+        self.assertEqual(Student.objects.filter(room=self.shared, department='IT').count(), 2)
+        self.assertEqual(Student.objects.filter(department='Math').values('room').distinct().count(), 1)
+        self.assertEqual(set(Room.objects.values_list('status', flat=True)), {'full'})
+        self.assertEqual((occupancy.check(), occupancy.check_status()), ([], []))
+
+    def test_over_capacity(self):
+        Student.objects.create(student_id='Z', first_name='A', last_name='B')
+        result = allocate()
+        self.assertEqual(len(result['assignments']), 5)
+        self.assertEqual(len(result['unassigned']), 1)
+
+
+class BinoXonalarCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.building = Building.objects.create(name='A', floors=1, rooms_count=1, capacity=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room = Room.objects.create(building=self.building, number='1', floor=1, capacity=2)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', password='x'))
+
+    def test_etag_and_invalidation(self):
+        response = self.client.get('/api/bino-xonalar/')
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/bino-xonalar/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Student.objects.create(student_id='1', first_name='Ali', last_name='V', room=self.room)
+        response = self.client.get('/api/bino-xonalar/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['rooms'][0]['occupied'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.building.name = 'B'
+            self.building.save()
+        self.assertEqual(self.client.get('/api/bino-xonalar/').json()['buildings'][0]['name'], 'B')
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.building = Building.objects.create(name='A', floors=1, rooms_count=1, capacity=2)
+        self.room = Room.objects.create(building=self.building, number='1', floor=1, capacity=2)
+        self.student = Student.objects.create(student_id='1', first_name='Ali', last_name='V', room=self.room)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', password='x'))
+
+    def test_not_modified(self):
+        for url in ('/api/rooms/', '/api/buildings/', '/api/students/', '/api/students/?page=1',
+                    f'/api/rooms/{self.room.pk}/', f'/api/students/{self.student.pk}/', '/api/activities/'):
+            etag = self.client.get(url)['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304, url)
+
+    def test_changes_invalidate(self):
+        etag = self.client.get('/api/rooms/')['ETag']
+        self.building.name = 'B'
+        self.building.save()  # building_name ro'yxatga kiradi
+        self.assertEqual(self.client.get('/api/rooms/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        etag = self.client.get('/api/students/')['ETag']
+        Student.objects.create(student_id='2', first_name='Vali', last_name='X')
+        self.assertEqual(self.client.get('/api/students/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        last_modified = self.client.get(f'/api/students/{self.student.pk}/')['Last-Modified']
+        response = self.client.get(f'/api/students/{self.student.pk}/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+
+class ActivityStreamTests(TransactionTestCase):
+    def setUp(self):
+        user = User.objects.create_user('guard', password='x')
+        user.user_permissions.add(Permission.objects.get(codename='can_view_dashboard'))
+        self.token = str(AccessToken.for_user(user))
+        self.student = Student.objects.create(student_id='1', first_name='Ali', last_name='V')
+        dashboard.rebuild_snapshot()
+        events.broker._counters = None
+
+    def test_activity_event(self):
+        async def run():
+            client = AsyncClient()
+            self.assertEqual((await client.get('/api/dashboard/stream/')).status_code, 401)
+            response = await client.get('/api/dashboard/stream/', {'token': self.token})
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            chunks = response.streaming_content.__aiter__()
+            self.assertIn(b'retry', await chunks.__anext__())
+            # hisoblagichlar o'zgarishini kutmasdan - joriy snapshot
+            chunk = await asyncio.wait_for(chunks.__anext__(), 2)
+            self.assertIn(b'event: counters', chunk)
+            self.assertIn(b'"total_students": 1', chunk)
+            activity = Activity(pk=999, student_id=self.student.pk, action='in', time=timezone.now())
+            # yozuvchi boshqa thread da (sync view kabi)
+            await sync_to_async(events.activities_committed, thread_sensitive=False)([activity])
+            chunk = await asyncio.wait_for(chunks.__anext__(), 2)
+            self.assertIn(b'event: activity', chunk)
+            self.assertIn(b'Ali V', chunk)
+
+        asyncio.run(run())
+
+
+@override_settings(PERMISSION_SYNC_DEFERRED=False)
+class AuthzTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        authz.local.clear()
+        self.user = User.objects.create_user('guard', password='x')
+        self.role = Role.objects.create(name='Qorovul', code='security')
+        self.role.permissions.add(Permission.objects.get(codename='can_view_dashboard'))
+        self.user.profile.roles.add(self.role)
+
+    def fresh(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_cached_grants(self):
+        user = self.fresh()
+        with self.assertNumQueries(3):  # versiyalar, rollar, ruxsatlar
+            self.assertTrue(authz.has_any_role(user, ['security', 'warden']))
+        user = self.fresh()
+        with self.assertNumQueries(0):
+            self.assertTrue(authz.has_perms(user, ['dormitory.can_view_dashboard']))
+            self.assertFalse(authz.has_all_roles(user, ['security', 'warden']))
+        self.assertEqual(authz.grants(user).perms, user.get_all_permissions())
+        user = self.fresh()
+        with override_settings(AUTHZ_LOCAL_TTL=0), self.assertNumQueries(1):  # muddat o'tgach faqat versiyalar
+            self.assertTrue(authz.has_any_role(user, ['security']))
+
+    @override_settings(AUTHZ_LOCAL_TTL=0)
+    def test_other_worker_bump(self):
+        # boshqa worker: rol olib tashlangan va versiya bazada oshirilgan, bu jarayonning LRU si o'chirilmagan
+        self.assertTrue(authz.has_any_role(self.fresh(), ['security']))
+        UserProfile.roles.through.objects.filter(userprofile__user=self.user).delete()
+        self.assertTrue(authz.has_any_role(self.fresh(), ['security']))
+        AuthzVersion.objects.filter(scope=authz._user_scope(self.user.pk)).update(version=F('version') + 1)
+        self.assertFalse(authz.has_any_role(self.fresh(), ['security']))
+
+    def test_changes_bump_versions(self):
+        authz.grants(self.fresh())
+        group = Group.objects.create(name='admins')
+        group.permissions.add(Permission.objects.get(codename='delete_room'))
+        self.user.groups.add(group)
+        self.assertTrue(authz.has_perms(self.fresh(), ['dormitory.delete_room']))
+        group.permissions.clear()
+        self.assertFalse(authz.has_perms(self.fresh(), ['dormitory.delete_room']))
+        self.role.delete()
+        user = self.fresh()
+        self.assertEqual(authz.grants(user), authz.EMPTY)
+        user.is_active = False
+        self.assertFalse(authz.has_perms(user, []))
+
+
+@override_settings(PERMISSION_SYNC_DEFERRED=False)
+class JwtClaimsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        authz.local.clear()
+        self.user = User.objects.create_user('guard', password='pw')
+        self.role = Role.objects.create(name='Qorovul', code='security')
+        self.role.permissions.add(Permission.objects.get(codename='can_view_dashboard'))
+        self.user.profile.roles.add(self.role)
+        response = APIClient().post('/api/auth/jwt/', {'username': 'guard', 'password': 'pw'}, format='json')
+        self.tokens = response.json()
+
+    def authenticate(self, access):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        return ClaimsJWTAuthentication().authenticate(request)[0]
+
+    def test_claims_without_user_lookup(self):
+        access = AccessToken(self.tokens['access'])
+        self.assertEqual(access['roles'], ['security'])
+        self.assertEqual(decode_perms(access['perms']), {'dormitory.can_view_dashboard'})
+        with self.assertNumQueries(1):  # faqat rv (AuthzVersion)
+            user = self.authenticate(self.tokens['access'])
+            self.assertIsInstance(user, ClaimsUser)
+            self.assertTrue(user.has_perm('dormitory.can_view_dashboard'))
+
+    def test_stale_token_falls_back(self):
+        self.user.profile.roles.remove(self.role)
+        user = self.authenticate(self.tokens['access'])
+        self.assertNotIsInstance(user, ClaimsUser)
+        self.assertFalse(authz.has_perms(user, ['dormitory.can_view_dashboard']))
+        response = APIClient().post('/api/auth/jwt/refresh/', {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(AccessToken(response.json()['access'])['roles'], [])
+        self.assertIsInstance(self.authenticate(response.json()['access']), ClaimsUser)
+
+    def test_deactivated_user_rejected(self):
+        self.assertIsInstance(self.authenticate(self.tokens['access']), ClaimsUser)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.tokens['access'])
+
+
+@override_settings(PERMISSION_SYNC_DEFERRED=False)
+class RoleSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.change, self.view, self.delete = (
+            Permission.objects.get(codename=codename) for codename in ('change_student', 'view_room', 'delete_room')
+        )
+        self.role = Role.objects.create(name='Xodim', code='staff')
+        self.role.permissions.add(self.change)
+        self.other = Role.objects.create(name='Boshqa', code='other')
+        self.other.permissions.add(self.delete)
+        users = User.objects.bulk_create([User(username=f'user{i}') for i in range(200)])
+        self.profiles = UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+        through = UserProfile.roles.through
+        through.objects.bulk_create([through(userprofile=profile, role=self.role) for profile in self.profiles])
+        through.objects.bulk_create([through(userprofile=profile, role=self.other) for profile in self.profiles[:10]])
+        rolesync.sync_users(rolesync.role_users([self.role.pk, self.other.pk]))
+
+    def perms(self, profile):
+        return User.objects.get(pk=profile.user_id).get_all_permissions()
+
+    def test_bulk_diff(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.role.permissions.add(self.view)
+        self.assertLess(len(queries), 40)
+        self.assertEqual(self.perms(self.profiles[0]), {'student.change_student', 'dormitory.view_room', 'dormitory.delete_room'})
+        self.role.permissions.remove(self.change)
+        self.assertEqual(User.user_permissions.through.objects.filter(permission=self.change).count(), 0)
+        self.assertEqual(rolesync.sync_users(rolesync.role_users([self.role.pk])), (0, 0))
+
+    def test_reverse_relations(self):
+        self.role.users.remove(self.profiles[1])
+        self.assertEqual(self.perms(self.profiles[1]), {'dormitory.delete_room'})
+        self.other.users.clear()
+        self.assertEqual(self.perms(self.profiles[2]), {'student.change_student'})
+        self.role.delete()
+        self.assertEqual(self.perms(self.profiles[3]), set())
+
+
+class PermissionSyncJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('guard', password='x')
+        self.role = Role.objects.create(name='Xodim', code='staff')
+        self.user.profile.roles.add(self.role)
+        PermissionSyncJob.objects.all().delete()
+
+    def test_coalesced_jobs(self):
+        change, view = (Permission.objects.get(codename=codename) for codename in ('change_student', 'view_room'))
+        with mock.patch.object(jobs.runner, 'schedule'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.role.permissions.add(change)
+                self.role.permissions.add(view)
+                self.role.permissions.remove(change)
+        self.assertEqual(list(PermissionSyncJob.objects.values_list('kind', flat=True)), ['role'])
+        self.assertEqual(User.objects.get(pk=self.user.pk).get_all_permissions(), set())
+        self.assertEqual(jobs.process_pending(), 1)
+        self.assertFalse(PermissionSyncJob.objects.exists())
+        self.assertEqual(User.objects.get(pk=self.user.pk).get_all_permissions(), {'dormitory.view_room'})
+
+    def test_runner_coalesces(self):
+        runner = jobs.Runner()
+        with mock.patch.object(jobs, 'process_pending') as pending, override_settings(PERMISSION_SYNC_DELAY=0.05):
+            runner.schedule()
+            timer = runner._timer
+            runner.schedule()
+            timer.join()
+            runner._executor.shutdown(wait=True)
+        self.assertEqual(pending.call_count, 1)
@@ -0,0 +1,134 @@
+"""
+Ruxsatlar JWT ichida: rol kodlari, ruxsatlar bitmap i va ruxsatlar versiyasi (rv) access tokenga yoziladi,
+ClaimsJWTAuthentication esa rv joriy bo'lsa ularga ishonadi - User qatori va ruxsat jadvallari
+o'qilmaydi (qo'riqchi terminallari, dashboardlar).
+
+Bitmap: bit raqami - Permission.pk (ruxsatlar faqat migratsiyada qo'shiladi, jadval kichik).
+rv - authz.versions(): foydalanuvchining rollari/ruxsatlari o'zgarsa yoki u o'chirilsa/bloklansa
+(is_active, signals.py) versiya oshadi va eski token odatdagi yo'lga (User bazadan - faol emasligi
+shu yerda rad etiladi, ruxsatlar authz keshidan) tushadi. Versiyalar bazada (AuthzVersion) va har
+so'rovda jarayon keshisiz o'qiladi (bitta so'rov) - boshqa worker dagi o'zgarish ham darhol ko'rinadi.
+"""
+import base64
+import threading
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import authz
+
+ROLES_CLAIM = 'roles'
+PERMS_CLAIM = 'perms'
+VERSION_CLAIM = 'rv'
+
+_lock = threading.Lock()
+_index = None   # (pk -> "app_label.codename", "app_label.codename" -> pk)
+
+
+def _permission_index(reload=False):
+    global _index
+    with _lock:
+        if _index is None or reload:
+            rows = Permission.objects.order_by().values_list('pk', 'content_type__app_label', 'codename')
+            by_pk = {pk: f"{app_label}.{codename}" for pk, app_label, codename in rows}
+            _index = (by_pk, {code: pk for pk, code in by_pk.items()})
+        return _index
+
+
+def encode_perms(codes):
+    by_code = _permission_index()[1]
+    if any(code not in by_code for code in codes):
+        by_code = _permission_index(reload=True)[1]
+    bits = 0
+    for code in codes:
+        if code in by_code:
+            bits |= 1 << by_code[code]
+    raw = bits.to_bytes(max(1, (bits.bit_length() + 7) // 8), 'big')
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_perms(value):
+    try:
+        bits = int.from_bytes(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)), 'big')
+    except (TypeError, ValueError):
+        raise InvalidToken("Noto'g'ri ruxsatlar bitmap i")
+    pks = [i for i in range(bits.bit_length()) if bits >> i & 1]
+    by_pk = _permission_index()[0]
+    if any(pk not in by_pk for pk in pks):
+        by_pk = _permission_index(reload=True)[0]
+    return frozenset(by_pk[pk] for pk in pks if pk in by_pk)
+
+
+def version_tag(user_pk):
+    return '.'.join(str(v) for v in authz.versions(user_pk))
+
+
+def add_claims(token, user):
+    grants = authz.grants(user)
+    token[ROLES_CLAIM] = sorted(grants.roles)
+    token[PERMS_CLAIM] = encode_perms(grants.perms)
+    token[VERSION_CLAIM] = version_tag(user.pk)
+    if user.is_superuser:
+        token['is_superuser'] = True
+    if user.is_staff:
+        token['is_staff'] = True
+    return token
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """TokenObtainPairView uchun (SIMPLE_JWT['TOKEN_OBTAIN_SERIALIZER']): refresh va access tokenlarda ruxsatlar."""
+
+    @classmethod
+    def get_token(cls, user):
+        return add_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Yangi access token refresh dagi eski ruxsatlar bilan emas, joriylari bilan chiqariladi."""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data['access'], verify=False)
+        user = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]}).first()
+        if user is not None:
+            data['access'] = str(add_claims(access, user))
+        return data
+
+
+class ClaimsUser(TokenUser):
+    """Token ichidagi ruxsatlar bilan foydalanuvchi (bazasiz); authz va permissions.py bilan ishlaydi."""
+
+    def __init__(self, token):
+        super().__init__(token)
+        self._authz_grants = authz.Grants(frozenset(token.get(ROLES_CLAIM, ())), decode_perms(token[PERMS_CLAIM]))
+
+    def get_all_permissions(self, obj=None):
+        return set(self._authz_grants.perms) if obj is None else set()
+
+    def has_perm(self, perm, obj=None):
+        return obj is None and authz.has_perms(self, [perm])
+
+    def has_perms(self, perm_list, obj=None):
+        return obj is None and authz.has_perms(self, perm_list)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Token rv si bazadagi joriy versiyaga teng bo'lsa - ClaimsUser (faqat AuthzVersion o'qiladi);
+    ruxsatlarsiz (eski) token yoki versiya eskirgan bo'lsa - odatdagi JWTAuthentication (User bazadan,
+    faol bo'lmagan foydalanuvchi rad etiladi).
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or PERMS_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        if validated_token.get(VERSION_CLAIM) != version_tag(user_id):
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
@@ -0,0 +1,213 @@
+"""
+Qo'riqchi posti uchun talabalarni tezkor topish (typeahead): xotiradagi saralangan
+(token, talaba) massivi ustida bisect bilan prefiks qidiruvi - so'rov uchun bazaga murojaat yo'q.
+
+Indeks server ishga tushganda (backend/wsgi.py, backend/asgi.py -> index.start()) fon thread ida
+quriladi va Student/Room signallari orqali yangilanadi. Har bir jarayon (worker) o'z nusxasiga ega;
+boshqa jarayonda qilingan o'zgarishlar fon thread i har TYPEAHEAD_MAX_AGE sekundda qayta qurganda
+yetib keladi. Yangi indeks lock siz quriladi va bitta havola almashtirish bilan qo'yiladi - so'rovlar
+qayta qurishni kutmaydi.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection
+
+from student.models import Student
+from student.search import TOKEN_MAX_LENGTH, normalize, terms
+from .models import Room
+
+DEFAULT_MAX_AGE = 600
+
+logger = logging.getLogger(__name__)
+
+# keys - saralangan (token, student_pk); entries - student_pk -> yozuv; rooms - room_pk -> xona raqami
+State = namedtuple('State', 'keys entries rooms')
+
+
+class TypeaheadIndex:
+    CANDIDATE_FACTOR = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()        # joriy holatni o'zgartirish/o'qish (qisqa)
+        self._build_lock = threading.Lock()  # bir vaqtda bitta qurish
+        self._state = None
+        self._pending = None  # qurish davomida kelgan o'zgarishlar - almashtirilgach qayta qo'llanadi
+        self._thread = None
+
+    # ---------- qurish va yangilash ----------
+    def start(self):
+        """Fon thread ini ishga tushiradi: darhol quradi, keyin har TYPEAHEAD_MAX_AGE sekundda qayta quradi."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='typeahead-index', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.build()
+            except Exception:
+                logger.exception("Typeahead indeksi qurilmadi (keyingi davrda qayta uriniladi)")
+            finally:
+                connection.close()  # fon thread ining ulanishi
+            time.sleep(getattr(settings, 'TYPEAHEAD_MAX_AGE', DEFAULT_MAX_AGE))
+
+    def build(self):
+        with self._build_lock:
+            self._rebuild()
+
+    def _ensure_built(self):
+        with self._build_lock:
+            if self._state is None:
+                self._rebuild()
+
+    def _rebuild(self):
+        with self._lock:
+            self._pending = []
+        try:
+            state = self._load()
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            self._state = state
+            for change in self._pending:
+                change(state)
+            self._pending = None
+
+    def _load(self):
+        rooms = dict(Room.objects.values_list('id', 'number'))
+        entries, keys = {}, []
+        students = Student.objects.values_list('id', 'student_id', 'first_name', 'last_name', 'room_id', 'search_key')
+        for pk, student_id, first_name, last_name, room_id, search_key in students.iterator():
+            entry = self._entry(pk, student_id, first_name, last_name, room_id, search_key)
+            entries[pk] = entry
+            keys.extend((token, pk) for token in entry['tokens'])
+        keys.sort()
+        return State(keys, entries, rooms)
+
+    def _entry(self, pk, student_id, first_name, last_name, room_id, search_key):
+        return {
+            'id': pk,
+            'student_id': student_id,
+            'full_name': f"{last_name} {first_name}",
+            'room_id': room_id,
+            'search_key': search_key,
+            'student_id_key': normalize(student_id),
+            'tokens': tuple(sorted({t[:TOKEN_MAX_LENGTH] for t in (search_key or '').split()})),
+        }
+
+    def _apply(self, change):
+        """O'zgarishni joriy holatga qo'llaydi; qurish ketayotgan bo'lsa yangi holatga ham qo'llash uchun yozib qo'yadi."""
+        with self._lock:
+            if self._state is not None:
+                change(self._state)
+            if self._pending is not None:
+                self._pending.append(change)
+
+    @staticmethod
+    def _discard(state, pk):
+        entry = state.entries.pop(pk, None)
+        if entry is None:
+            return
+        for token in entry['tokens']:
+            i = bisect_left(state.keys, (token, pk))
+            if i < len(state.keys) and state.keys[i] == (token, pk):
+                del state.keys[i]
+
+    def upsert(self, student):
+        entry = self._entry(student.pk, student.student_id, student.first_name, student.last_name,
+                            student.room_id, student.search_key)
+
+        def change(state):
+            self._discard(state, student.pk)
+            state.entries[student.pk] = entry
+            for token in entry['tokens']:
+                insort(state.keys, (token, student.pk))
+        self._apply(change)
+
+    def remove(self, student_pk):
+        self._apply(lambda state: self._discard(state, student_pk))
+
+    def set_student_rooms(self, moves):
+        """[(student_pk, room_id), ...] - signalsiz (bulk_update) ko'chirishlardan keyin."""
+        def change(state):
+            for student_pk, room_id in moves:
+                entry = state.entries.get(student_pk)
+                if entry is not None:
+                    entry['room_id'] = room_id
+        self._apply(change)
+
+    def set_room(self, room_pk, number):
+        def change(state):
+            if number is None:
+                state.rooms.pop(room_pk, None)
+            else:
+                state.rooms[room_pk] = number
+        self._apply(change)
+
+    # ---------- qidiruv ----------
+    @staticmethod
+    def _prefix_matches(keys, term):
+        i = bisect_left(keys, (term,))
+        while i < len(keys) and keys[i][0].startswith(term):
+            yield keys[i]
+            i += 1
+
+    def suggest(self, query, limit=10):
+        """
+        Har bir so'z biror token prefiksi bo'lgan talabalarni moslik darajasi bo'yicha qaytaradi.
+        Nomzodlar token tartibida ko'riladi (to'liq mos token prefikslardan oldin keladi) va
+        limit * CANDIDATE_FACTOR ta topilgach to'xtaladi - qisqa prefiks ("a") ham butun indeksni aylanmaydi.
+        """
+        words = terms(query)
+        if not words:
+            return []
+        if self._state is None:
+            # start() chaqirilmagan jarayon (shell, testlar) yoki fon qurish hali tugamagan
+            self._ensure_built()
+        with self._lock:
+            state = self._state
+            # eng uzun so'z eng kam nomzod beradi
+            anchor = max(words, key=len)
+            pool = limit * self.CANDIDATE_FACTOR
+            scored, seen = [], set()
+            for _, pk in self._prefix_matches(state.keys, anchor):
+                if pk in seen:
+                    continue
+                seen.add(pk)
+                entry = state.entries[pk]
+                score = 0
+                for term in words:
+                    if term == entry['student_id_key']:
+                        score += 6
+                    elif term in entry['tokens']:
+                        score += 2
+                    elif any(token.startswith(term) for token in entry['tokens']):
+                        score += 1
+                    else:
+                        break
+                else:
+                    scored.append((-score, entry['search_key'], pk))
+                    if len(scored) >= pool:
+                        break
+            scored.sort()
+            return [
+                {
+                    'id': entry['id'],
+                    'student_id': entry['student_id'],
+                    'full_name': entry['full_name'],
+                    'room_number': state.rooms.get(entry['room_id']),
+                }
+                for entry in (state.entries[pk] for _, _, pk in scored[:limit])
+            ]
+
+
+index = TypeaheadIndex()
@@ -1,25 +1,38 @@
 from django.urls import path
 from .views import (
     BuildingListCreate, BuildingDetail,
-    RoomListCreate, RoomDetail,
-    StudentListCreate, StudentDetail,
-    ActivityListCreate, ActivityDetail,
+    RoomListCreate, RoomDetail, RoomAllocateView,
+    StudentListCreate, StudentDetail, StudentSuggestView,
+    ActivityListCreate, ActivityDetail, ActivityBulkCreate,
     DashboardView,
     BinoXonalarView,
 )
+from . import async_views
 
 urlpatterns = [
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('dashboard/stream/', async_views.activity_stream, name='dashboard-stream'),
     path('bino-xonalar/', BinoXonalarView.as_view(), name='bino-xonalar-page'),
     path('buildings/', BuildingListCreate.as_view(), name='building-list-create'),
     path('buildings/<int:pk>/', BuildingDetail.as_view(), name='building-detail'),
 
     path('rooms/', RoomListCreate.as_view(), name='room-list-create'),
+    path('rooms/allocate/', RoomAllocateView.as_view(), name='room-allocate'),
     path('rooms/<int:pk>/', RoomDetail.as_view(), name='room-detail'),
 
     path('students/', StudentListCreate.as_view(), name='student-list-create'),
+    path('students/suggest/', StudentSuggestView.as_view(), name='student-suggest'),
     path('students/<int:pk>/', StudentDetail.as_view(), name='student-detail'),
 
     path('activities/', ActivityListCreate.as_view(), name='activity-list-create'),
+    path('activities/bulk/', ActivityBulkCreate.as_view(), name='activity-bulk-create'),
     path('activities/<int:pk>/', ActivityDetail.as_view(), name='activity-detail'),
+
+    # O'qish uchun async (ASGI) variantlar - javoblar yuqoridagilar bilan bir xil
+    path('async/dashboard/', async_views.dashboard, name='async-dashboard'),
+    path('async/bino-xonalar/', async_views.bino_xonalar, name='async-bino-xonalar'),
+    path('async/buildings/', async_views.building_list, name='async-building-list'),
+    path('async/rooms/', async_views.room_list, name='async-room-list'),
+    path('async/students/', async_views.student_list, name='async-student-list'),
+    path('async/activities/', async_views.activity_list, name='async-activity-list'),
 ]
@@ -0,0 +1,25 @@
+"""Umumiy yordamchi funksiyalar."""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+
+def local_day_bounds(day=None, tz=None):
+    """
+    Mahalliy kunning [boshi, keyingi kun boshi) oralig'ini aware datetime sifatida qaytaradi.
+    day berilmasa - bugun (yotoqxona vaqt mintaqasi bo'yicha, settings.TIME_ZONE).
+    """
+    tz = tz or timezone.get_current_timezone()
+    day = day or timezone.localdate(timezone=tz)
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def local_day_filter(field='time', day=None, tz=None):
+    """
+    `field__date=day` o'rniga ishlatiladigan filtr: {'time__gte': start, 'time__lt': end}.
+    Ustunni sanaga aylantirmaydi, shuning uchun indeks bo'yicha oraliq skan qilinadi.
+    """
+    start, end = local_day_bounds(day, tz)
+    return {f'{field}__gte': start, f'{field}__lt': end}
@@ -2,7 +2,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from .models import Building, Room, Activity
-from student.models import Student, StudentPaymentStory
+from student.models import Student
+from student import search
 from .serializers import (
 	BuildingSerializer,
 	BuildingSummarySerializer,
@@ -12,181 +13,154 @@ from .serializers import (
 	ActivitySerializer,
 )
 from drf_yasg.utils import swagger_auto_schema
+from django.conf import settings
 from django.utils import timezone
-from django.db.models import Sum, Max, OuterRef, Subquery, Q, Count
-from datetime import timedelta
+from django.utils.dateparse import parse_datetime
+from django.db.models import Count
 from rest_framework.permissions import IsAuthenticated
 from .permissions import HasRequiredDjangoPerms
+from .dashboard import get_snapshot
+from .feed import feed
+from . import allocation, caching, conditional, ingest, typeahead
+from .pagination import KeysetPagination, PagePagination, InvalidCursor
+
+
+def recent_limit_param(request):
+	# ?recent=N (standart 10), lenta hajmi bilan cheklangan
+	try:
+		return max(0, min(int(request.GET.get('recent', 10)), feed.size))
+	except ValueError:
+		return 10
+
+
+def dashboard_data(snapshot, recent_activities):
+	"""Dashboard javobi (kartalar, ogohlantirishlar, ko'rsatkichlar) - sync va async view lar uchun umumiy."""
+	total_students = snapshot.total_students # jami talabalar soni
+	total_rooms = snapshot.total_rooms # jami xonalar soni
+	total_buildings = snapshot.total_buildings # jami binolar soni
+
+	total_capacity = snapshot.total_capacity # jami sig'im
+	assigned_students = snapshot.assigned_students # xonaga joylashgan talabalar soni
+	occupancy_rate = round((assigned_students / total_capacity) * 100, 1) if total_capacity else 0.0 # bandlik foizi
+
+	# Students inside/outside (oxirgi activity bo'yicha)
+	students_inside = snapshot.students_inside  # oxirgi harakati 'in' yoki 'late_in' bo'lganlar
+	students_outside = max(total_students - students_inside, 0) # tashqarida bo'lganlar
+
+	# Contracts expiring in 7 days
+	expiring_contracts_7_days = snapshot.expiring_contracts_7_days # soni
+	expiring_list = snapshot.expiring_contracts # ro'yxat (maks 10 ta)
+
+	late_today_count = snapshot.late_today_count # bugun kechikkanlar
+	today_activity_count = snapshot.today_activity_count # bugungi faolliklar soni
+	active_students_24h = snapshot.active_students_24h # oxirgi 24 soat ichida harakat qilganlar
+	pending_payments = snapshot.pending_payments # oxirgi to'lov 30 kundan eski yoki yo'q
+
+	# Cards for UI (exact labels as screenshot)
+	cards = [
+		{'key': 'total_students', 'label': 'Jami talabalar', 'value': total_students},
+		{'key': 'total_rooms', 'label': 'Yotoqxona xonalari', 'value': total_rooms},
+		{'key': 'students_inside', 'label': 'Hozir ichkarida', 'value': students_inside},
+		{'key': 'students_outside', 'label': 'Tashqarida', 'value': students_outside},
+	]
+
+	# Alerts (ogohlantirishlar)
+	alerts = []
+	if expiring_contracts_7_days:
+		alerts.append({
+			'text': f"{expiring_contracts_7_days} ta talabaning shartnomasi 7 kun ichida tugaydi",
+			'variant': 'warning',  # info|warning|danger
+		})
+	if late_today_count:
+		alerts.append({
+			'text': f"{late_today_count} ta talaba bugun kechikib kirdi",
+			'variant': 'info',
+		})
+	if pending_payments:
+		alerts.append({
+			'text': f"{pending_payments} ta talabada 30 kundan beri to'lov yo'q",
+			'variant': 'danger',
+		})
+
+	data = {
+		'cards': cards,
+		'alerts': alerts,
+		'recent_activities': recent_activities,
+		# Raw metrics for additional widgets/analytics
+		'metrics': {
+			'total_students': total_students,
+			'total_rooms': total_rooms,
+			'total_buildings': total_buildings,
+			'students_inside': students_inside,
+			'students_outside': students_outside,
+			'occupancy_rate': occupancy_rate,
+			'today_activity_count': today_activity_count,
+			'late_today_count': late_today_count,
+			'pending_payments': pending_payments,
+			'expiring_contracts_7_days': expiring_contracts_7_days,
+			'active_students_24h': active_students_24h,
+		},
+		# Extra detailed list for expiring contracts card
+		'expiring_contracts': expiring_list,
+		# Ko'rsatkichlar qaysi holatga tegishli
+		'as_of': snapshot.as_of,
+	}
+
+	return data
+
+
+class InvalidParameter(ValueError):
+	"""Ro'yxat filtrlaridagi noto'g'ri query parametri (400)."""
 
 
 class DashboardView(APIView):
 	permission_classes = [IsAuthenticated, HasRequiredDjangoPerms]
 	permission_required = ["dormitory.can_view_dashboard"]
-	@swagger_auto_schema(operation_description="Dashboard statistikalarini qaytaradi")
+	@swagger_auto_schema(operation_description="Dashboard statistikalarini qaytaradi. Optional: ?recent=N - so'nggi faolliklar soni (standart 10)")
 	def get(self, request):
-		today = timezone.localdate()
-		now = timezone.now()
-
-		total_students = Student.objects.count() # jami talabalar soni
-		total_rooms = Room.objects.count() # jami xonalar soni
-		total_buildings = Building.objects.count() # jami binolar soni
-
-		total_capacity = Room.objects.aggregate(total=Sum('capacity'))['total'] or 0 # jami sig'im
-		assigned_students = Student.objects.exclude(room__isnull=True).count() # xonaga joylashgan talabalar soni
-		occupancy_rate = round((assigned_students / total_capacity) * 100, 1) if total_capacity else 0.0 # bandlik foizi
-
-		# Students inside/outside (oxirgi activity bo'yicha)
-		last_action_sq = Activity.objects.filter(student=OuterRef('pk')).order_by('-time').values('action')[:1] # oxirgi harakat
-		students_inside = Student.objects.annotate(last_action=Subquery(last_action_sq))\
-			.filter(last_action__in=['in', 'late_in']).count()  # oxirgi harakati 'in' yoki 'late_in' bo'lganlar
-		students_outside = max(total_students - students_inside, 0) # tashqarida bo'lganlar
-
-		# Contracts expiring in 7 days
-		in_7_days = today + timedelta(days=7) # 7 kun ichida tugaydigan shartnomalar
-		expiring_qs = Student.objects.filter(contract_end__gte=today, contract_end__lte=in_7_days) # 7 kun ichida tugaydigan shartnomalar
-		expiring_contracts_7_days = expiring_qs.count() # soni
-		expiring_list = [
-			{
-				'student_id': s.student_id,  
-				'full_name': f"{s.last_name} {s.first_name}",
-				'contract_end': s.contract_end,
-			} 
-			for s in expiring_qs.order_by('contract_end')[:10]
-		] # ro'yxat (maks 10 ta)
-
-		# Late today
-		late_today_count = Activity.objects.filter(action='late_in', time__date=today).count() # bugun kechikkanlar
-
-		# Today activities
-		today_activity_count = Activity.objects.filter(time__date=today).count() # bugungi faolliklar soni
-
-		# Active students last 24h
-		last24 = now - timedelta(hours=24) # oxirgi 24 soat ichida harakat qilgan talabalar
-		active_students_24h = Student.objects.filter(activities__time__gte=last24).distinct().count() # soni
-
-		# Pending payments: oxirgi to'lov 30 kundan eski yoki yo'q
-		last_pay_sq = StudentPaymentStory.objects.filter(student=OuterRef('pk')).order_by()\
-			.values('student').annotate(latest=Max('date')).values('latest')[:1] # oxirgi to'lov sanasi
-		pending_payments = Student.objects.annotate(last_payment=Subquery(last_pay_sq))\
-			.filter(Q(last_payment__isnull=True) | Q(last_payment__lt=today - timedelta(days=30))).count() # soni
-
-		# Recent activities
-		recent = Activity.objects.select_related('student', 'student__room', 'student__room__building')\
-			.order_by('-time')[:10] # oxirgi 10 ta faollik
-		recent_activities = []  
-		for a in recent:
-			room = getattr(a.student, 'room', None)
-			recent_activities.append({
-				'student_id': a.student.student_id,
-				'full_name': f"{a.student.last_name} {a.student.first_name}",
-				'action': a.action,
-				'time': a.time,
-				'room_number': room.number if room else None,
-				'building': room.building.name if room else None,
-			})
+		# Barcha ko'rsatkichlar bitta qatordan o'qiladi (dashboard.py / DashboardSnapshot)
+		snapshot = get_snapshot()
+		# So'nggi faolliklar: xotiradagi lentadan (feed.py), bazaga so'rovsiz
+		recent_activities = feed.recent(recent_limit_param(request)) # Vaqt, Talaba, Harakat, Xona
 
-		# Cards for UI (exact labels as screenshot)
-		cards = [
-			{'key': 'total_students', 'label': 'Jami talabalar', 'value': total_students},
-			{'key': 'total_rooms', 'label': 'Yotoqxona xonalari', 'value': total_rooms},
-			{'key': 'students_inside', 'label': 'Hozir ichkarida', 'value': students_inside},
-			{'key': 'students_outside', 'label': 'Tashqarida', 'value': students_outside},
-		]
-
-		# Alerts (ogohlantirishlar)
-		alerts = []
-		if expiring_contracts_7_days:
-			alerts.append({
-				'text': f"{expiring_contracts_7_days} ta talabaning shartnomasi 7 kun ichida tugaydi",
-				'variant': 'warning',  # info|warning|danger
-			})
-		if late_today_count:
-			alerts.append({
-				'text': f"{late_today_count} ta talaba bugun kechikib kirdi",
-				'variant': 'info',
-			})
-		if pending_payments:
-			alerts.append({
-				'text': f"{pending_payments} ta talabada 30 kundan beri to'lov yo'q",
-				'variant': 'danger',
-			})
-
-		# Normalize recent activities for table: Vaqt, Talaba, Harakat, Xona
-		normalized_recent = []
-		for a in recent:
-			room = getattr(a.student, 'room', None)
-			local_dt = timezone.localtime(a.time)
-			normalized_recent.append({
-				'time': local_dt.strftime('%H:%M'),
-				'student': f"{a.student.first_name} {a.student.last_name}",
-				'action': a.get_action_display(),
-				'room': room.number if room else None,
-			})
-
-		data = {
-			'cards': cards,
-			'alerts': alerts,
-			'recent_activities': normalized_recent,
-			# Raw metrics for additional widgets/analytics
-			'metrics': {
-				'total_students': total_students,
-				'total_rooms': total_rooms,
-				'total_buildings': total_buildings,
-				'students_inside': students_inside,
-				'students_outside': students_outside,
-				'occupancy_rate': occupancy_rate,
-				'today_activity_count': today_activity_count,
-				'late_today_count': late_today_count,
-				'pending_payments': pending_payments,
-				'expiring_contracts_7_days': expiring_contracts_7_days,
-				'active_students_24h': active_students_24h,
-			},
-			# Extra detailed list for expiring contracts card
-			'expiring_contracts': expiring_list,
-		}
-
-		return Response(data)
+		return Response(dashboard_data(snapshot, recent_activities))
 
 
 # Bino va Xonalar sahifasi uchun alohida view (page-specific payload)
 class BinoXonalarView(APIView):
-	@swagger_auto_schema(operation_description="Bino va Xonalar sahifasi uchun ma'lumotlar (binolar kartalari va xonalar jadvali)")
+	@swagger_auto_schema(operation_description=(
+		"Bino va Xonalar sahifasi uchun ma'lumotlar (binolar kartalari va xonalar jadvali). "
+		"Javob keshlanadi va ETag bilan qaytadi; If-None-Match mos kelsa 304 (body siz)."
+	))
 	def get(self, request):
+		building_id = request.GET.get('building') # filter parametrlari
+		status_param = request.GET.get('status') # empty|partial|full
+		available = bool(request.GET.get('available'))
 
+		# Binolar: kartochkalar uchun qisqa ma'lumot (filterlarga bog'liq emas - bitta kesh yozuvi)
+		buildings_data, buildings_etag = caching.get_or_build(caching.ROOMS, ['buildings'], lambda: list(
+			BuildingSummarySerializer(Building.objects.all().annotate(rooms_total=Count('rooms')), many=True).data # har bir binoda xonalar soni bilan
+		))
 
-		# Binolar: kartochkalar uchun qisqa ma'lumot
-		buildings_qs = Building.objects.all().annotate(rooms_total=Count('rooms')) # har bir binoda xonalar soni bilan
-		buildings_data = BuildingSummarySerializer(buildings_qs, many=True).data 
+		# Xonalar: jadval uchun ma'lumot, optional filter: ?building=<id>&status=&available=1
+		def build_rooms():
+			rooms_qs = RoomListCreate.build_queryset(request.GET) # RoomListCreate bilan bir xil filterlar
+			return list(RoomListSerializer(rooms_qs, many=True).data) # serializatsiya
 
-		# Xonalar: jadval uchun ma'lumot, optional filter: ?building=<id>&status=
-		rooms_qs = Room.objects.all().annotate(occupied=Count('students')) # har bir xonada joylashgan talabalar soni bilan
-		building_id = request.GET.get('building') # filter parametrlari
-		status_param = request.GET.get('status') # empty|partial|full
-		if building_id:
-			rooms_qs = rooms_qs.filter(building_id=building_id) # binoga ko'ra filter
-		if status_param:
-			rooms_qs = rooms_qs.filter(status=status_param) # bandlik holatiga ko'ra filter
-		rooms_data = RoomListSerializer(rooms_qs, many=True).data # serializatsiya
+		rooms_data, rooms_etag = caching.get_or_build(
+			caching.ROOMS, ['rooms', building_id or '', status_param or '', int(available)], build_rooms,
+		)
 
+		etag = caching.make_etag([buildings_etag, rooms_etag])
+		if caching.etag_matches(request, etag):
+			return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
 		return Response({
 			'buildings': buildings_data,
 			'rooms': rooms_data,
-		})
+		}, headers={'ETag': etag})
 
 # Building CRUD
 class BuildingListCreate(APIView):
-	@swagger_auto_schema(
-		manual_parameters=[],
-		operation_description="Barcha binolar. Optional: ?name=substring",
-	)
-	def get(self, request):
-		qs = Building.objects.all().annotate(rooms_total=Count('rooms'))
-		name = request.GET.get('name')
-		if name:
-			qs = qs.filter(name__icontains=name)
-		serializer = BuildingSummarySerializer(qs, many=True)
-		return Response(serializer.data)
-
 	"""
 	get:
 	Barcha binolar ro'yxatini qaytaradi.
@@ -210,8 +184,9 @@ class BuildingListCreate(APIView):
 		GET: Barcha binolar ro'yxatini JSON ko'rinishida qaytaradi.
 		"""
 		buildings = Building.objects.all()
-		serializer = BuildingSerializer(buildings, many=True)
-		return Response(serializer.data)
+		return conditional.respond(
+			request, conditional.for_querysets(buildings), lambda: BuildingSerializer(buildings, many=True).data,
+		)
 
 	@swagger_auto_schema(
 		operation_description="Yangi bino qo'shish",
@@ -253,8 +228,7 @@ class BuildingDetail(APIView):
 		building = self.get_object(pk)
 		if not building:
 			return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
-		serializer = BuildingSerializer(building)
-		return Response(serializer.data)
+		return conditional.respond_object(request, building, lambda: BuildingSerializer(building).data)
 
 	"""
 	get:
@@ -287,19 +261,28 @@ class BuildingDetail(APIView):
 
 # Room CRUD
 class RoomListCreate(APIView):
+	@staticmethod
+	def build_queryset(params):
+		# sync/async view lar va BinoXonalarView uchun umumiy filterlar
+		qs = Room.objects.select_related('building') # bandlik Room.occupied ustunida saqlanadi (JOIN/GROUP BY siz)
+		building_id = params.get('building')
+		status_param = params.get('status')
+		if building_id:
+			qs = qs.filter(building_id=building_id) # binoga ko'ra filter
+		if status_param:
+			qs = qs.filter(status=status_param) # bandlik holatiga ko'ra filter
+		if params.get('available'):
+			qs = qs.filter(status__in=('empty', 'partial')) # bo'sh joyi bor xonalar (building, status indeksi)
+		return qs
+
 	@swagger_auto_schema(
-		operation_description="Barcha xonalar. Optional: ?building=<id>&status=empty|partial|full",
+		operation_description="Barcha xonalar. Optional: ?building=<id>&status=empty|partial|full&available=1 (status occupied/capacity dan avtomatik hisoblanadi)",
 	)
 	def get(self, request):
-		qs = Room.objects.all().annotate(occupied=Count('students'))
-		building_id = request.GET.get('building')
-		status_param = request.GET.get('status')
-		if building_id:
-			qs = qs.filter(building_id=building_id)
-		if status_param:
-			qs = qs.filter(status=status_param)
-		serializer = RoomListSerializer(qs, many=True)
-		return Response(serializer.data)
+		qs = self.build_queryset(request.GET)
+		# building_name binodan keladi - validatorga binolarning updated_at i ham kiradi
+		validators = conditional.for_querysets(qs, related=('building',))
+		return conditional.respond(request, validators, lambda: RoomListSerializer(qs, many=True).data)
 
 	"""
 	get:
@@ -322,11 +305,50 @@ class RoomListCreate(APIView):
 		"building": 1,
 		"number": "101",
 		"floor": 1,
-		"capacity": 6,
-		"status": "empty"
+		"capacity": 6
 	}
+	status (empty|partial|full) yuborilmaydi - bandlik va sig'imdan hisoblanadi.
 	"""
 
+class RoomAllocateView(APIView):
+	permission_classes = [IsAuthenticated, HasRequiredDjangoPerms]
+	permission_required = ["student.change_student"]
+
+	@swagger_auto_schema(
+		operation_description=(
+			"Xonasiz faol talabalarni bo'sh joylarga ommaviy joylashtirish (semestr boshi). "
+			"Body (hammasi ixtiyoriy): {\"students\": [pk, ...], \"buildings\": [id, ...], \"floors\": [2, 3], \"dry_run\": true}. "
+			"Bir guruh (fakultet + guruh) talabalari imkon qadar bir xonaga; floors - afzal qavatlar tartibi. "
+			"dry_run=true bo'lsa faqat reja qaytadi: {assigned, unassigned, assignments: [{student, room, room_number}], dry_run}"
+		),
+	)
+	def post(self, request):
+		data = request.data if isinstance(request.data, dict) else {}
+		params = {}
+		for name in ('students', 'buildings', 'floors'):
+			value = data.get(name)
+			if value is None:
+				continue
+			if not isinstance(value, list) or not all(isinstance(v, int) and not isinstance(v, bool) for v in value):
+				return Response({'error': f"'{name}' butun sonlar ro'yxati bo'lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+			params[name] = value
+		dry_run = bool(data.get('dry_run', False))
+		result = allocation.allocate(
+			student_ids=params.get('students'),
+			buildings=params.get('buildings'),
+			floors=params.get('floors'),
+			dry_run=dry_run,
+		)
+		return Response({
+			'assigned': len(result['assignments']),
+			'unassigned': result['unassigned'],
+			'assignments': [
+				{'student': pk, 'room': room_id, 'room_number': number}
+				for pk, room_id, number in result['assignments']
+			],
+			'dry_run': dry_run,
+		}, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
 class RoomDetail(APIView):
 	def get_object(self, pk):
 		try:
@@ -338,8 +360,7 @@ class RoomDetail(APIView):
 		room = self.get_object(pk)
 		if not room:
 			return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
-		serializer = RoomSerializer(room)
-		return Response(serializer.data)
+		return conditional.respond_object(request, room, lambda: RoomSerializer(room).data)
 
 	"""
 	get:
@@ -370,19 +391,80 @@ class RoomDetail(APIView):
 
 # Student CRUD
 class StudentListCreate(APIView):
-	@swagger_auto_schema(
-		operation_description="Talabalar. Optional: ?student_id=...&name=substring",
-	)
-	def get(self, request):
+	# Cursor rejimida saralash maydonlari noyob (id bilan) va NULL bo'lmasligi kerak
+	ORDERING_FIELDS = ('id', 'student_id', 'last_name', 'first_name')
+	PAGE_SIZE = 50
+	MAX_PAGE_SIZE = 500
+
+	@classmethod
+	def build_queryset(cls, params):
+		"""
+		Sync va async view lar uchun umumiy: (qs, order_by, fields).
+		Qidiruvda saralash berilmasa natijalar moslik darajasi bo'yicha: order_by = (-search_rank, id),
+		?page= va ?cursor= shu tartibda ishlaydi.
+		Noto'g'ri parametrda InvalidParameter.
+		"""
 		qs = Student.objects.all()
-		student_id = request.GET.get('student_id')
-		name = request.GET.get('name')
+		student_id = params.get('student_id')
+		name = params.get('name')
 		if student_id:
 			qs = qs.filter(student_id=student_id)
 		if name:
-			qs = qs.filter(first_name__icontains=name) | qs.filter(last_name__icontains=name)
-		serializer = StudentSerializer(qs, many=True)
-		return Response(serializer.data)
+			# ism/familiya/otasining ismi/ID prefiksi bo'yicha (kirill va lotinda), student/search.py
+			qs = search.filter_queryset(qs, name)
+
+		ordering = params.get('ordering')
+		if ordering and ordering.lstrip('-') not in cls.ORDERING_FIELDS:
+			raise InvalidParameter(f"ordering quyidagilardan biri bo'lishi kerak: {', '.join(cls.ORDERING_FIELDS)}")
+		if ordering:
+			order_by = (ordering,) if ordering.lstrip('-') == 'id' else (ordering, '-id' if ordering.startswith('-') else 'id')
+		elif name:
+			# cursor faqat ball va id ni olib yuradi (search_key - ism-familiya, cursorga chiqmasin)
+			order_by = ('-search_rank', 'id')
+		else:
+			order_by = ('id',)
+
+		# ?fields= : serializer ham, SQL ham faqat kerakli ustunlar bilan ishlaydi
+		fields = None
+		fields_param = params.get('fields')
+		if fields_param:
+			fields = [f.strip() for f in fields_param.split(',') if f.strip()]
+			unknown = set(fields) - set(StudentSerializer().fields)
+			if unknown:
+				raise InvalidParameter(f"Noma'lum maydonlar: {', '.join(sorted(unknown))}")
+			# search_rank - annotatsiya, ustun emas
+			qs = qs.only(*set(fields) | ({f.lstrip('-') for f in order_by} - {'search_rank'}) | {'updated_at'})
+		return qs, order_by, fields
+
+	@swagger_auto_schema(
+		operation_description=(
+			"Talabalar. Optional: ?student_id=...&name=<ism/familiya/ID boshi, kirill yoki lotin>"
+			"&fields=id,student_id,last_name (faqat shu maydonlar)"
+			"&ordering=last_name|-student_id|...&limit=. "
+			"name berilib ordering berilmasa - moslik darajasi bo'yicha. "
+			"Sahifalash: ?page=N (umumiy son bilan) yoki ?cursor= (keyset). "
+			"Javob: {results: [...], next: <cursor|null>} yoki {results, count, page, limit}"
+		),
+	)
+	def get(self, request):
+		try:
+			qs, order_by, fields = self.build_queryset(request.GET)
+		except InvalidParameter as exc:
+			return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+		if request.GET.get('page'):
+			page, meta = PagePagination(self.PAGE_SIZE, self.MAX_PAGE_SIZE).paginate_queryset(request, qs.order_by(*order_by))
+			return conditional.respond(request, conditional.for_objects(page, meta['count']), lambda: {
+				'results': StudentSerializer(page, many=True, fields=fields).data, **meta,
+			})
+
+		try:
+			page, next_cursor = KeysetPagination(order_by, self.PAGE_SIZE, self.MAX_PAGE_SIZE).paginate_queryset(request, qs)
+		except InvalidCursor as exc:
+			return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+		return conditional.respond(request, conditional.for_objects(page, next_cursor), lambda: {
+			'results': StudentSerializer(page, many=True, fields=fields).data, 'next': next_cursor,
+		})
 
 	"""
 	get:
@@ -410,6 +492,22 @@ class StudentListCreate(APIView):
 	}
 	"""
 
+class StudentSuggestView(APIView):
+	MAX_LIMIT = 50
+
+	@swagger_auto_schema(
+		operation_description=(
+			"Qo'riqchi posti uchun tezkor qidiruv (typeahead): ?q=<ism/familiya/ID boshi>&limit=10. "
+			"Xotiradagi indeksdan: [{id, student_id, full_name, room_number}]"
+		),
+	)
+	def get(self, request):
+		try:
+			limit = max(1, min(int(request.GET.get('limit', 10)), self.MAX_LIMIT))
+		except ValueError:
+			limit = 10
+		return Response(typeahead.index.suggest(request.GET.get('q', ''), limit))
+
 class StudentDetail(APIView):
 	def get_object(self, pk):
 		try:
@@ -421,8 +519,7 @@ class StudentDetail(APIView):
 		student = self.get_object(pk)
 		if not student:
 			return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
-		serializer = StudentSerializer(student)
-		return Response(serializer.data)
+		return conditional.respond_object(request, student, lambda: StudentSerializer(student).data)
 
 	"""
 	get:
@@ -453,16 +550,50 @@ class StudentDetail(APIView):
 
 # Activity CRUD
 class ActivityListCreate(APIView):
-	@swagger_auto_schema(
-		operation_description="Faolliklar. Optional: ?action=in|out|late_in|absent",
+	pagination = KeysetPagination(
+		ordering=('time', 'id'),
+		page_size=getattr(settings, 'ACTIVITY_PAGE_SIZE', 100),
+		max_page_size=getattr(settings, 'ACTIVITY_MAX_PAGE_SIZE', 1000),
 	)
-	def get(self, request):
+
+	@staticmethod
+	def build_queryset(params):
+		# sync va async view lar uchun umumiy filterlar; noto'g'ri vaqtda InvalidParameter
 		qs = Activity.objects.all()
-		action = request.GET.get('action')
+		action = params.get('action')
 		if action:
 			qs = qs.filter(action=action)
-		serializer = ActivitySerializer(qs, many=True)
-		return Response(serializer.data)
+		for param, lookup in (('since', 'time__gte'), ('until', 'time__lt')):
+			value = params.get(param)
+			if not value:
+				continue
+			try:
+				moment = parse_datetime(value)
+			except ValueError: # formati to'g'ri, lekin sana mavjud emas (2025-02-30)
+				moment = None
+			if moment is None:
+				raise InvalidParameter(f"Noto'g'ri {param} vaqti")
+			if timezone.is_naive(moment):
+				moment = timezone.make_aware(moment)
+			qs = qs.filter(**{lookup: moment})
+		return qs
+
+	@swagger_auto_schema(
+		operation_description=(
+			"Faolliklar (vaqt bo'yicha, cursor bilan sahifalangan). "
+			"Optional: ?action=in|out|late_in|absent&since=<ISO vaqt>&until=<ISO vaqt>&page_size=&cursor=. "
+			"Javob: {results: [...], next: <keyingi sahifa cursori yoki null>}"
+		),
+	)
+	def get(self, request):
+		try:
+			page, next_cursor = self.pagination.paginate_queryset(request, self.build_queryset(request.GET))
+		except (InvalidParameter, InvalidCursor) as exc:
+			return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+		# validator - sahifaning o'zi (katta jadval bo'yicha aggregate qilinmaydi)
+		return conditional.respond(request, conditional.for_objects(page, next_cursor), lambda: {
+			'results': ActivitySerializer(page, many=True).data, 'next': next_cursor,
+		})
 
 	"""
 	get:
@@ -488,6 +619,27 @@ class ActivityListCreate(APIView):
 	}
 	"""
 
+class ActivityBulkCreate(APIView):
+	@swagger_auto_schema(
+		operation_description=(
+			"Faolliklarni paket holida qo'shish (turniket/darvoza kontrollerlari uchun). "
+			"Body: {\"events\": [{\"student_id\": \"20250001\", \"action\": \"in\", \"time\": \"2025-09-19T12:00:00+05:00\"}, {\"student\": 5, \"action\": \"out\"}, ...]} "
+			"(time - voqea vaqti, ixtiyoriy; berilmasa qabul qilingan vaqt). "
+			"yoki to'g'ridan-to'g'ri ro'yxat. To'g'ri qatorlar saqlanadi, noto'g'rilari uchun index bo'yicha xatolar qaytadi: "
+			"{created: N, errors: [{index, errors}]}"
+		),
+	)
+	def post(self, request):
+		events = request.data.get('events') if isinstance(request.data, dict) else request.data
+		if not isinstance(events, list):
+			return Response({'error': "'events' ro'yxati kerak"}, status=status.HTTP_400_BAD_REQUEST)
+		max_events = getattr(settings, 'ACTIVITY_BULK_MAX_EVENTS', 5000)
+		if len(events) > max_events:
+			return Response({'error': f"Bir so'rovda ko'pi bilan {max_events} ta yozuv"}, status=status.HTTP_400_BAD_REQUEST)
+		created, errors = ingest.ingest(events)
+		response_status = status.HTTP_201_CREATED if created or not events else status.HTTP_400_BAD_REQUEST
+		return Response({'created': len(created), 'errors': errors}, status=response_status)
+
 class ActivityDetail(APIView):
 	def get_object(self, pk):
 		try:
@@ -499,8 +651,7 @@ class ActivityDetail(APIView):
 		activity = self.get_object(pk)
 		if not activity:
 			return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
-		serializer = ActivitySerializer(activity)
-		return Response(serializer.data)
+		return conditional.respond_object(request, activity, lambda: ActivitySerializer(activity).data)
 
 	"""
 	get:
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from student.models import Student
+from student.search import index_student, search_key
+
+
+class Command(BaseCommand):
+    help = "Talabalarning qidiruv kalitlari va tokenlarini (StudentSearchToken) qayta quradi"
+
+    def handle(self, *args, **options):
+        updated = 0
+        with transaction.atomic():
+            for student in Student.objects.iterator():
+                key = search_key(student)
+                if key != student.search_key:
+                    Student.objects.filter(pk=student.pk).update(search_key=key, updated_at=timezone.now())
+                    student.search_key = key
+                    updated += 1
+                index_student(student)
+        self.stdout.write(self.style.SUCCESS(f"Qidiruv indeksi qayta qurildi, yangilangan kalitlar: {updated}"))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory', '0010_hot_filter_indexes'),
+        ('student', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['contract_end'], name='student_contract_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentpaymentstory',
+            index=models.Index(fields=['student', '-date'], name='payment_student_date_idx'),
+        ),
+    ]
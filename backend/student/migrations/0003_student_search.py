@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from student.search import TOKEN_MAX_LENGTH, normalize
+
+
+def fill_search(apps, schema_editor):
+    # Mavjud talabalar uchun qidiruv kaliti va tokenlarini to'ldiramiz
+    Student = apps.get_model('student', 'Student')
+    StudentSearchToken = apps.get_model('student', 'StudentSearchToken')
+    students, tokens = [], []
+    for student in Student.objects.all().iterator():
+        parts = (student.last_name, student.first_name, student.third_name, student.student_id)
+        student.search_key = normalize(' '.join(p for p in parts if p))
+        students.append(student)
+        tokens.extend(
+            StudentSearchToken(student_id=student.pk, token=t)
+            for t in {t[:TOKEN_MAX_LENGTH] for t in student.search_key.split()}
+        )
+    Student.objects.bulk_update(students, ['search_key'], batch_size=1000)
+    StudentSearchToken.objects.bulk_create(tokens, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0002_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='search_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.CreateModel(
+            name='StudentSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=50)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='student.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'student'], name='search_token_prefix_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'token'), name='unique_student_search_token')],
+            },
+        ),
+        migrations.RunPython(fill_search, migrations.RunPython.noop),
+    ]
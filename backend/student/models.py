@@ -27,9 +27,48 @@ class Student(models.Model):  # Talaba modeli: yotoqxonadagi talabalar haqida
  department = models.CharField(max_length=100, null=True, blank=True)  # Fakultet
  group = models.CharField(max_length=100, null=True, blank=True)  # Guruh
  specialty = models.CharField(max_length=100, null=True, blank=True)  # Mutaxassislik
+ # Normallashtirilgan qidiruv kaliti (lotin, kichik harf): familiya ism otasining_ismi id. save() da yangilanadi
+ search_key = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
+ updated_at = models.DateTimeField(auto_now=True)  # Oxirgi o'zgarish (shartli GET uchun); UPDATE/bulk_update larda qo'lda beriladi
+
+ class Meta:
+  # room FK uchun indeks Django tomonidan avtomatik yaratiladi
+  indexes = [
+   models.Index(fields=['contract_end'], name='student_contract_end_idx'),  # tugayotgan shartnomalar
+  ]
+
  def __str__(self):
   return f"{self.last_name} {self.first_name}"
 
+ def save(self, *args, **kwargs):
+  from .search import index_student, search_key
+
+  key = search_key(self)
+  changed = key != self.search_key or self._state.adding
+  self.search_key = key
+  update_fields = kwargs.get('update_fields')
+  if update_fields is not None:
+   kwargs['update_fields'] = set(update_fields) | {'updated_at'} | ({'search_key'} if changed else set())
+  super().save(*args, **kwargs)
+  if changed:
+   index_student(self)
+
+
+class StudentSearchToken(models.Model):  # Qidiruv tokenlari: har bir talaba uchun normallashtirilgan so'zlar
+ student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='search_tokens')
+ token = models.CharField(max_length=50)
+
+ class Meta:
+  constraints = [
+   models.UniqueConstraint(fields=['student', 'token'], name='unique_student_search_token'),
+  ]
+  indexes = [
+   models.Index(fields=['token', 'student'], name='search_token_prefix_idx'),  # prefiks oraliq skani
+  ]
+
+ def __str__(self):
+  return self.token
+
 
 
 class StudentPaymentStory(models.Model):  # To'lovlar tarixi modeli: talabalar to'lovlari haqida
@@ -39,5 +78,10 @@ class StudentPaymentStory(models.Model):  # To'lovlar tarixi modeli: talabalar t
  date = models.DateField()  # To'lov sanasi
  notes = models.TextField(null=True, blank=True)  # Qo'shimcha eslatmalar
 
+ class Meta:
+  indexes = [
+   models.Index(fields=['student', '-date'], name='payment_student_date_idx'),  # talabaning oxirgi to'lovi
+  ]
+
  def __str__(self):
   return f"{self.student} - {self.amount} on {self.date}"
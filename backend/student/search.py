@@ -0,0 +1,91 @@
+"""
+Talabalarni ism/familiya/otasining ismi va ID bo'yicha qidirish.
+
+Har bir talaba uchun normallashtirilgan tokenlar (StudentSearchToken) saqlanadi:
+kichik harf, kirill -> lotin (o'zbek alifbosi), tutuq belgilari olib tashlangan.
+Qidiruv har bir so'z uchun token prefiksi bo'yicha indeksli oraliq so'rovidir
+(icontains kabi butun jadvalni skan qilmaydi).
+"""
+import re
+import unicodedata
+
+from django.db.models import Case, Exists, IntegerField, OuterRef, Q, Value, When
+
+# O'zbek kirill -> lotin (rasmiy imlo, tutuq belgilarisiz - ular baribir olib tashlanadi)
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo', 'ж': 'j',
+    'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o',
+    'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'x', 'ц': 'ts',
+    'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '', 'ы': 'i', 'ь': '', 'э': 'e', 'ю': 'yu',
+    'я': 'ya', 'ў': 'o', 'қ': 'q', 'ғ': 'g', 'ҳ': 'h',
+}
+# So'z boshidagi "е" - "ye" (Евгений -> Yevgeniy)
+_INITIAL_YE = re.compile(r'(?<![\w])е')
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+TOKEN_MAX_LENGTH = 50
+
+
+def normalize(text):
+    """'Ғуломов Ўткир' -> 'gulomov otkir', "G'ulomov O‘tkir" -> 'gulomov otkir'."""
+    if not text:
+        return ''
+    text = _INITIAL_YE.sub('ye', text.lower())
+    text = ''.join(CYRILLIC_TO_LATIN.get(ch, ch) for ch in text)
+    # diakritikalarni olib tashlash (ö -> o), keyin harf/raqamdan boshqa hamma narsa bo'shliq
+    text = ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+    text = text.replace("'", '').replace('ʻ', '').replace('ʼ', '').replace('‘', '').replace('’', '').replace('`', '')
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def terms(query):
+    """Qidiruv so'rovini normallashtirilgan so'zlarga ajratadi."""
+    return [t[:TOKEN_MAX_LENGTH] for t in normalize(query).split()]
+
+
+def search_key(student):
+    """Talabaning to'liq qidiruv kaliti: 'familiya ism otasining_ismi id'."""
+    parts = (student.last_name, student.first_name, student.third_name, student.student_id)
+    return normalize(' '.join(p for p in parts if p))
+
+
+def index_student(student):
+    """Talabaning tokenlarini search_key dan qayta yozadi."""
+    from .models import StudentSearchToken
+
+    tokens = {t[:TOKEN_MAX_LENGTH] for t in (student.search_key or '').split()}
+    StudentSearchToken.objects.filter(student=student).exclude(token__in=tokens).delete()
+    existing = set(StudentSearchToken.objects.filter(student=student).values_list('token', flat=True))
+    StudentSearchToken.objects.bulk_create(
+        [StudentSearchToken(student=student, token=t) for t in tokens - existing]
+    )
+
+
+def _prefix(term, field='token'):
+    # [term, term+'zzz..'] oralig'i indeks bo'yicha skan qilinadi; startswith aniqlikni kafolatlaydi
+    upper = term + 'z' * (TOKEN_MAX_LENGTH - len(term))
+    return Q(**{f'{field}__gte': term, f'{field}__lte': upper, f'{field}__startswith': term})
+
+
+def filter_queryset(queryset, query):
+    """
+    Talabalar querysetini qidiruv so'rovi bo'yicha filtrlaydi (har bir so'z biror token prefiksi bo'lishi kerak)
+    va `search_rank` bilan annotatsiya qiladi: to'liq mos token 2 ball, prefiks 1 ball, ID to'liq mos kelsa 6 ball.
+    """
+    from .models import StudentSearchToken
+
+    words = terms(query)
+    if not words:
+        return queryset.none().annotate(search_rank=Value(0))  # saralash search_rank bo'yicha bo'lishi mumkin
+    rank = Value(0)
+    for term in words:
+        # token indeksi bo'yicha topilgan talabalar (semi-join), keyin faqat ular uchun ball hisoblanadi
+        queryset = queryset.filter(pk__in=StudentSearchToken.objects.filter(_prefix(term)).values('student_id'))
+        matches = StudentSearchToken.objects.filter(student=OuterRef('pk'))
+        rank = rank + Case(
+            When(Q(student_id__iexact=term), then=Value(6)),
+            When(Exists(matches.filter(token=term)), then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    return queryset.annotate(search_rank=rank)
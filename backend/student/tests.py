@@ -1,3 +1,42 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Student, StudentSearchToken
+from .search import filter_queryset, normalize, terms
+
+
+class NormalizeTests(TestCase):
+    def test_cyrillic_and_apostrophes(self):
+        self.assertEqual(normalize("Ғуломов Ўткир"), 'gulomov otkir')
+        self.assertEqual(normalize("G‘ulomov O'tkir"), 'gulomov otkir')
+        self.assertEqual(normalize("Евгений"), 'yevgeniy')
+        self.assertEqual(terms("  Шоҳрух,  ALI-vali "), ['shohrux', 'ali', 'vali'])
+
+
+class StudentSearchTests(TestCase):
+    def setUp(self):
+        self.gulomov = Student.objects.create(student_id='2025001', first_name='Ўткир', last_name='Ғуломов', third_name='Азизович')
+        self.gulomova = Student.objects.create(student_id='2025002', first_name='Otabek', last_name='Gulomova')
+        self.valiyev = Student.objects.create(student_id='77', first_name='Ali', last_name='Valiyev')
+
+    def search(self, query):
+        qs = filter_queryset(Student.objects.all(), query).order_by('-search_rank', 'id')
+        return [student.student_id for student in qs]
+
+    def test_prefix_in_both_scripts(self):
+        self.assertEqual(self.search('gulomov'), ['2025001', '2025002'])
+        self.assertEqual(self.search("ғулом о"), ['2025001', '2025002'])
+        self.assertEqual(self.search('aziz'), ['2025001'])
+        self.assertEqual(self.search('2025'), ['2025001', '2025002'])
+        self.assertEqual(self.search('77'), ['77'])
+        self.assertEqual(self.search(''), [])
+
+    def test_tokens_follow_saves(self):
+        self.assertEqual(self.valiyev.search_key, 'valiyev ali 77')
+        self.valiyev.first_name = 'Zafar'
+        self.valiyev.save()
+        self.assertEqual(self.search('zaf'), ['77'])
+        self.assertEqual(self.search('ali'), [])
+        self.assertEqual(
+            set(StudentSearchToken.objects.filter(student=self.valiyev).values_list('token', flat=True)),
+            {'valiyev', 'zafar', '77'},
+        )